@@ -0,0 +1,138 @@
+"""
+Analysis cache keyed by a perceptual hash of the decoded image.
+
+dhash() reduces a grayscale image to 64 bits (is each pixel of a 9x8
+thumbnail brighter than its right-hand neighbour), so re-encoded, slightly
+shifted or re-lit copies of a frame land a few bits apart. Lookups find the
+closest stored hash within max_distance bits using a multi-index hash
+table: the hash is split into max_distance + 1 bands, and by the pigeonhole
+principle any hash within max_distance bits matches at least one band
+exactly, so only entries sharing a band are compared.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from lazy_imports import lazy_import
+
+# OpenCV is imported on first use, keeping it off the startup path
+cv2 = lazy_import('cv2')
+
+HASH_BITS = 64
+
+
+def dhash(gray):
+    """64-bit difference hash of a grayscale image"""
+    thumb = cv2.resize(gray, (9, 8), interpolation=cv2.INTER_AREA)
+    bits = (thumb[:, 1:] > thumb[:, :-1]).ravel()
+    return int.from_bytes(np.packbits(bits).tobytes(), 'big')
+
+
+def hamming(a, b):
+    return bin(a ^ b).count('1')
+
+
+class _Entry:
+    __slots__ = ('key', 'value', 'stored_at', 'compute_seconds')
+
+    def __init__(self, key, value, stored_at, compute_seconds):
+        self.key = key
+        self.value = value
+        self.stored_at = stored_at
+        self.compute_seconds = compute_seconds
+
+
+class AnalysisCache:
+    """LRU + TTL cache of analysis dicts, looked up by nearest perceptual hash.
+
+    Each entry remembers how long its analysis took, so the time hits saved
+    is reported alongside the hit rate. max_entries bounds memory (an entry
+    is a small dict plus one index slot per band, well under 1 KB).
+    """
+
+    def __init__(self, max_entries=1024, ttl_seconds=60, max_distance=4):
+        if not 0 <= max_distance < HASH_BITS:
+            raise ValueError(f"max_distance must be in [0, {HASH_BITS})")
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_distance = max_distance
+        bands = max_distance + 1
+        widths = [HASH_BITS // bands + (1 if i < HASH_BITS % bands else 0) for i in range(bands)]
+        self._bands = []
+        shift = HASH_BITS
+        for width in widths:
+            shift -= width
+            self._bands.append((shift, (1 << width) - 1))
+        self._entries = OrderedDict()
+        self._index = [{} for _ in self._bands]
+        self._lock = threading.Lock()
+        self._counters = dict.fromkeys(['hits', 'exact_hits', 'misses', 'evictions', 'expired'], 0)
+        self.saved_seconds = 0.0
+
+    def _band_keys(self, key):
+        return [(key >> shift) & mask for shift, mask in self._bands]
+
+    def get(self, key):
+        """Cached analysis (a copy) whose hash is nearest key within max_distance, or None"""
+        now = time.time()
+        with self._lock:
+            best = None
+            best_distance = self.max_distance + 1
+            for band, band_key in zip(self._index, self._band_keys(key)):
+                for candidate in band.get(band_key, ()):
+                    distance = hamming(key, candidate)
+                    if distance < best_distance:
+                        best, best_distance = candidate, distance
+            if best is not None:
+                entry = self._entries[best]
+                if now - entry.stored_at > self.ttl_seconds:
+                    self._remove(best)
+                    self._counters['expired'] += 1
+                    best = None
+            if best is None:
+                self._counters['misses'] += 1
+                return None
+            self._entries.move_to_end(best)
+            self._counters['hits'] += 1
+            if best_distance == 0:
+                self._counters['exact_hits'] += 1
+            self.saved_seconds += entry.compute_seconds
+            return dict(entry.value)
+
+    def put(self, key, value, compute_seconds=0.0):
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = _Entry(key, dict(value), time.time(), compute_seconds)
+            for band, band_key in zip(self._index, self._band_keys(key)):
+                band.setdefault(band_key, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+                self._counters['evictions'] += 1
+
+    def _remove(self, key):
+        del self._entries[key]
+        for band, band_key in zip(self._index, self._band_keys(key)):
+            bucket = band[band_key]
+            bucket.discard(key)
+            if not bucket:
+                del band[band_key]
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._counters)
+            stats['entries'] = len(self._entries)
+            saved = self.saved_seconds
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = round(stats['hits'] / lookups, 4) if lookups else 0.0
+        stats['saved_seconds'] = round(saved, 3)
+        stats['max_entries'] = self.max_entries
+        stats['ttl_seconds'] = self.ttl_seconds
+        stats['max_distance'] = self.max_distance
+        return stats
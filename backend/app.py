@@ -1,21 +1,45 @@
 
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify, make_response, g
 from flask_cors import CORS
-import requests
 import os
-import cv2
+import json
+import secrets
 import numpy as np
-from tensorflow.keras.models import load_model
-import pickle
 from dotenv import load_dotenv
-import tempfile
 import logging
+import threading
+import time
+from inference_batcher import MicroBatcher, BatcherClosed
+from tmdb_client import get_client
+from candidate_index import CandidateRefresher, TMDBPageSource, FixturePageSource, movie_record
+from ranking import catalog_from_index
+from similarity import SimilarityIndex
+from tmdb_api import TMDBApi, movie_page, MAX_PAGE
+from http_responses import json_response
+from model_registry import ModelRegistry, process_memory
+from inference_pool import InferenceClient, authkey_from_env
+from image_io import decode_grayscale, DebugSink
+from live_session import SessionStore
+from face_detection import create_detector
+from analysis_cache import AnalysisCache, dhash
+from group_analysis import group_profile
+from recommendation_table import RecommendationTableRefresher
+from load_shedding import OverloadController, RecentAnalyses, TIER_NAMES, NO_AGE_GENDER, REUSE_EMOTION, NO_TMDB, REJECT
+from lazy_imports import lazy_import
+from warmup import Warmup
+from metrics import MetricsRegistry
+from profiler import SamplingProfiler, profile_path
+
+# OpenCV is imported on first use, keeping it off the startup path
+cv2 = lazy_import('cv2')
 
 # Load environment variables
 load_dotenv()
 
+CORS_ORIGINS = ["http://localhost:5173", "http://127.0.0.1:5173"]
+
 app = Flask(__name__)
-CORS(app, origins=["http://localhost:5173", "http://127.0.0.1:5173"])
+CORS(app, origins=CORS_ORIGINS, expose_headers=['X-Analysis-Token', 'X-Quality-Tier'])
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -23,163 +47,919 @@ logger = logging.getLogger(__name__)
 
 # TMDB Configuration
 TMDB_BEARER_TOKEN = os.getenv('TMDB_BEARER_TOKEN')
-TMDB_BASE_URL = 'https://api.themoviedb.org/3'
 
-# Global variables for models
-emotion_model = None
-age_gender_model = None
+# Total time a request waits on its concurrent TMDB genre queries, retries included
+TMDB_FETCH_BUDGET_SECONDS = float(os.getenv('TMDB_FETCH_BUDGET_SECONDS', '8'))
+
+# Upper bound on images accepted by /api/recommend/batch
+MAX_BATCH_IMAGES = int(os.getenv('MAX_BATCH_IMAGES', '32'))
+
+# Server-side micro-batching of concurrent inference calls (opt-in)
+INFERENCE_BATCHING = os.getenv('INFERENCE_BATCHING', '0') == '1'
+INFERENCE_BATCH_WINDOW_MS = float(os.getenv('INFERENCE_BATCH_WINDOW_MS', '5'))
+INFERENCE_MAX_BATCH = int(os.getenv('INFERENCE_MAX_BATCH', '32'))
+# How long a request waits on the batchers before running its own forward pass
+INFERENCE_BATCH_TIMEOUT = float(os.getenv('INFERENCE_BATCH_TIMEOUT', '10'))
+
+# Local genre -> movie candidate index, refreshed in the background
+CANDIDATE_INDEX = os.getenv('CANDIDATE_INDEX', '1') == '1'
+CANDIDATE_INDEX_PAGES = int(os.getenv('CANDIDATE_INDEX_PAGES', '3'))
+CANDIDATE_INDEX_REFRESH_SECONDS = float(os.getenv('CANDIDATE_INDEX_REFRESH_SECONDS', '1800'))
+CANDIDATE_INDEX_PATH = os.getenv('CANDIDATE_INDEX_PATH', 'candidate_index.json')
+CANDIDATE_FIXTURES_DIR = os.getenv('CANDIDATE_FIXTURES_DIR')
+
+# Content-based re-ranking over the candidate index
+RANKING = os.getenv('RANKING', '1') == '1'
+RANKING_TFIDF = os.getenv('RANKING_TFIDF', '0') == '1'
+
+# "More like this" vector index; a prebuilt index directory is memory-mapped, otherwise
+# one is built from the candidate index
+SIMILARITY_INDEX_PATH = os.getenv('SIMILARITY_INDEX_PATH')
+SIMILARITY_MODE = os.getenv('SIMILARITY_MODE', 'exact')
+SIMILARITY_NPROBE = int(os.getenv('SIMILARITY_NPROBE', '8'))
+
+# Uploads are decoded in memory; JPEGs whose longer side is at least 2x this are
+# decoded at 1/2, 1/4 or 1/8 scale (0 disables reduced decoding)
+DECODE_MAX_SIDE = int(os.getenv('DECODE_MAX_SIDE', '960'))
+
+# Opt-in sampled dump of raw uploads for debugging
+DEBUG_DUMP_DIR = os.getenv('DEBUG_DUMP_DIR')
+DEBUG_DUMP_SAMPLE_RATE = float(os.getenv('DEBUG_DUMP_SAMPLE_RATE', '0.01'))
+
+# Live webcam sessions: full face detection every N frames, frames whose
+# thumbnail changed less than the threshold (mean abs grey level) are skipped
+LIVE_DETECT_EVERY = int(os.getenv('LIVE_DETECT_EVERY', '10'))
+LIVE_DELTA_THRESHOLD = float(os.getenv('LIVE_DELTA_THRESHOLD', '4'))
+LIVE_EMA_ALPHA = float(os.getenv('LIVE_EMA_ALPHA', '0.3'))
+LIVE_SESSION_IDLE_SECONDS = float(os.getenv('LIVE_SESSION_IDLE_SECONDS', '60'))
+LIVE_STREAM_MAX_SECONDS = float(os.getenv('LIVE_STREAM_MAX_SECONDS', '600'))
+
+# 'preload' loads models at import (in the gunicorn master when preload_app is on),
+# 'background' loads them in each worker's warm-up thread while it already serves
+# /api/live, 'lazy' loads each model on first use
+MODEL_LOAD_MODE = os.getenv('MODEL_LOAD_MODE', 'preload')
+
+# Inference backend: 'keras', 'tflite' or 'onnx' (artifacts from convert_models.py)
+INFERENCE_BACKEND = os.getenv('INFERENCE_BACKEND', 'keras')
+
+# Face detector: 'haar', 'yunet' or 'ssd' (DNN model files read from FACE_DETECTOR_MODEL_DIR);
+# detection runs on a copy downscaled so its longer side is at most FACE_DETECT_MAX_SIDE
+FACE_DETECTOR = os.getenv('FACE_DETECTOR', 'haar')
+FACE_DETECTOR_MODEL_DIR = os.getenv('FACE_DETECTOR_MODEL_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'face_models'))
+FACE_DETECT_MAX_SIDE = int(os.getenv('FACE_DETECT_MAX_SIDE', '640'))
+
+# Unix socket of a shared inference pool (python inference_pool.py serve); when set,
+# this process runs no models itself and sends face batches to the pool instead
+INFERENCE_POOL_ADDRESS = os.getenv('INFERENCE_POOL_ADDRESS')
+INFERENCE_POOL_TIMEOUT = float(os.getenv('INFERENCE_POOL_TIMEOUT', '30'))
+
+# Browser/CDN freshness of the TMDB proxy responses; the TMDB cache has its own TTLs
+SEARCH_MAX_AGE_SECONDS = int(os.getenv('SEARCH_MAX_AGE_SECONDS', '60'))
+LISTS_MAX_AGE_SECONDS = int(os.getenv('LISTS_MAX_AGE_SECONDS', '300'))
+
+# Reuse the analysis of a recent image whose perceptual hash is within
+# ANALYSIS_CACHE_MAX_DISTANCE bits (of 64) of the upload, e.g. repeated kiosk frames
+ANALYSIS_CACHE = os.getenv('ANALYSIS_CACHE', '0') == '1'
+ANALYSIS_CACHE_MAX_ENTRIES = int(os.getenv('ANALYSIS_CACHE_MAX_ENTRIES', '1024'))
+ANALYSIS_CACHE_TTL_SECONDS = float(os.getenv('ANALYSIS_CACHE_TTL_SECONDS', '60'))
+ANALYSIS_CACHE_MAX_DISTANCE = int(os.getenv('ANALYSIS_CACHE_MAX_DISTANCE', '4'))
+
+# Precomputed recommendations for every (emotion, age bracket), rebuilt whenever the
+# candidate index changes and shared by the workers through an mmapped file
+RECOMMENDATION_TABLE = os.getenv('RECOMMENDATION_TABLE', '1') == '1'
+RECOMMENDATION_TABLE_PATH = os.getenv('RECOMMENDATION_TABLE_PATH', 'recommendation_table.bin')
+RECOMMENDATION_TABLE_CHECK_SECONDS = float(os.getenv('RECOMMENDATION_TABLE_CHECK_SECONDS', '5'))
+
+# Overload control for /api/recommend: step down through quality tiers (skip age/gender,
+# reuse the session's analysis, no TMDB calls, reject) as requests in flight reach each
+# of LOAD_SHED_INFLIGHT_LIMITS or recent p95 latency exceeds LOAD_SHED_TARGET_MS
+LOAD_SHEDDING = os.getenv('LOAD_SHEDDING', '0') == '1'
+LOAD_SHED_INFLIGHT_LIMITS = [int(n) for n in os.getenv('LOAD_SHED_INFLIGHT_LIMITS', '4,8,12,16').split(',')]
+LOAD_SHED_TARGET_MS = float(os.getenv('LOAD_SHED_TARGET_MS', '1000'))
+LOAD_SHED_COOLDOWN_SECONDS = float(os.getenv('LOAD_SHED_COOLDOWN_SECONDS', '5'))
+LOAD_SHED_RETRY_AFTER_SECONDS = int(os.getenv('LOAD_SHED_RETRY_AFTER_SECONDS', '1'))
+
+# Group mode (/api/recommend/group) analyzes at most this many faces, largest first
+GROUP_MAX_FACES = int(os.getenv('GROUP_MAX_FACES', '10'))
+
+# Per-stage histograms and error counters on /metrics (per worker process)
+METRICS = os.getenv('METRICS', '1') == '1'
+
+# Requests sent with 'X-Profile: 1' get a sampled stack profile written to
+# PROFILE_DIR in collapsed (flamegraph) format; ignored unless enabled
+PROFILE_REQUESTS = os.getenv('PROFILE_REQUESTS', '0') == '1'
+PROFILE_DIR = os.getenv('PROFILE_DIR', 'profiles')
+PROFILE_INTERVAL_MS = float(os.getenv('PROFILE_INTERVAL_MS', '2'))
+
+metrics = MetricsRegistry(enabled=METRICS)
+STAGE_SECONDS = metrics.histogram('recommender_stage_seconds', 'Time spent in each request stage', ['stage'])
+REQUEST_SECONDS = metrics.histogram('recommender_http_request_seconds', 'HTTP request latency', ['route', 'status'])
+NO_FACE = metrics.counter('recommender_no_face_total', 'Images in which no face was detected')
+MODEL_ERRORS = metrics.counter('recommender_model_errors_total', 'Failed model predictions', ['model'])
+TMDB_FAILURES = metrics.counter('recommender_tmdb_failures_total', 'Failed TMDB genre queries')
+RECOMMENDATION_SOURCE = metrics.counter('recommender_recommendations_total', 'Recommendation lists served', ['source'])
+ANALYSIS_CACHE_LOOKUPS = metrics.counter('recommender_analysis_cache_total', 'Analysis cache lookups', ['result'])
+
+models = ModelRegistry(os.path.dirname(os.path.abspath(__file__)), backend=INFERENCE_BACKEND)
+inference_pool = InferenceClient(
+    INFERENCE_POOL_ADDRESS,
+    authkey=authkey_from_env(),
+    timeout=INFERENCE_POOL_TIMEOUT
+) if INFERENCE_POOL_ADDRESS else None
+face_detector = create_detector(FACE_DETECTOR, FACE_DETECTOR_MODEL_DIR, FACE_DETECT_MAX_SIDE)
+overload = OverloadController(
+    LOAD_SHED_INFLIGHT_LIMITS,
+    target_ms=LOAD_SHED_TARGET_MS,
+    cooldown_seconds=LOAD_SHED_COOLDOWN_SECONDS,
+    enabled=LOAD_SHEDDING
+)
+recent_analyses = RecentAnalyses()
+analysis_cache = AnalysisCache(
+    ANALYSIS_CACHE_MAX_ENTRIES,
+    ANALYSIS_CACHE_TTL_SECONDS,
+    ANALYSIS_CACHE_MAX_DISTANCE
+) if ANALYSIS_CACHE else None
 
 def load_models():
-    global emotion_model, age_gender_model
-    try:
-        if os.path.exists('facial_emotion_detection_model.h5'):
-            emotion_model = load_model('facial_emotion_detection_model.h5')
-            logger.info("✅ Emotion detection model loaded successfully")
-        else:
-            logger.warning("⚠️ Emotion model file not found: facial_emotion_detection_model.h5")
+    models.load()
 
-        if os.path.exists('model.pkl'):
-            with open('model.pkl', 'rb') as f:
-                age_gender_model = pickle.load(f)
-            logger.info("✅ Age/Gender model loaded successfully")
-        else:
-            logger.warning("⚠️ Age/Gender model file not found: model.pkl")
+def _predictor(name):
+    """Inference backend for a model: the shared inference pool when configured, else in-process"""
+    if inference_pool is not None:
+        return inference_pool.predictor(name)
+    return models.predictor(name)
 
-    except Exception as e:
-        logger.error(f"❌ Error loading models: {str(e)}")
+def _model_loaded(name):
+    if inference_pool is not None:
+        return inference_pool.predictor(name) is not None
+    return models.is_loaded(name)
+
+EMOTION_LABELS = ['angry', 'disgust', 'fear', 'happy', 'neutral', 'sad', 'surprise']
+
+def _unknown_analysis():
+    return {
+        'emotion': 'unknown',
+        'age': 0,
+        'gender': 'unknown',
+        'confidence': 0.0
+    }
+
+def _detect_faces(gray):
+    """Return (x, y, w, h) boxes of every face detected in a grayscale image"""
+    with STAGE_SECONDS.time('face_detect'):
+        return face_detector.detect(gray)
+
+def _largest_face(gray):
+    """Return the grayscale crop of the largest detected face, or None"""
+    faces = _detect_faces(gray)
+    if len(faces) == 0:
+        return None
+    x, y, w, h = max(faces, key=lambda x: x[2] * x[3])
+    return gray[y:y + h, x:x + w]
+
+def _stack_faces(face_imgs, size):
+    """Resize face crops and stack them into a single (N, size, size, 1) float32 tensor"""
+    batch = np.empty((len(face_imgs), size, size, 1), dtype='float32')
+    for i, face_img in enumerate(face_imgs):
+        batch[i, :, :, 0] = cv2.resize(face_img, (size, size))
+    batch /= 255.0
+    return batch
 
-def detect_face_and_emotion(image_path):
+def _predict_emotion_probs(face_imgs):
+    """One emotion model forward pass over all crops; returns an (N, 7) probability array"""
+    with STAGE_SECONDS.time('emotion_predict'):
+        return _predictor('emotion').predict(_stack_faces(face_imgs, 48))
+
+def _predict_age_gender(face_imgs):
+    """One age/gender model forward pass over all crops; returns (gender, age) per face"""
+    with STAGE_SECONDS.time('age_gender_predict'):
+        prediction = _predictor('age_gender').predict(_stack_faces(face_imgs, 128))
+    return [
+        ('female' if round(prediction[0][i][0]) == 1 else 'male', int(round(prediction[1][i][0])))
+        for i in range(len(face_imgs))
+    ]
+
+_batchers = None
+_batchers_lock = threading.Lock()
+
+def get_batchers():
+    """Lazily start the micro-batchers so their threads are created after a gunicorn fork"""
+    global _batchers
+    if _batchers is None:
+        with _batchers_lock:
+            if _batchers is None:
+                _batchers = {
+                    'emotion': MicroBatcher(_predict_emotion_probs, INFERENCE_MAX_BATCH,
+                                            INFERENCE_BATCH_WINDOW_MS, name='emotion'),
+                    'age_gender': MicroBatcher(_predict_age_gender, INFERENCE_MAX_BATCH,
+                                               INFERENCE_BATCH_WINDOW_MS, name='age_gender'),
+                }
+    return _batchers
+
+def _submit_batched(name, face_imgs):
+    """Queue face crops on a micro-batcher; None if it is closed (the caller runs the model directly)"""
     try:
-        img = cv2.imread(image_path)
-        if img is None:
-            raise ValueError("Could not read image file")
-
-        cv2.imwrite("debug_input.jpg", img)  # Save image for debugging
-
-        img_rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
-        face_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
-        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-        faces = face_cascade.detectMultiScale(gray, 1.3, 5)
-
-        if len(faces) == 0:
-            logger.warning("⚠️ No face detected in image")
-            return {
-                'emotion': 'unknown',
-                'age': 0,
-                'gender': 'unknown',
-                'confidence': 0.0
-            }
-
-        face = max(faces, key=lambda x: x[2] * x[3])
-        x, y, w, h = face
-        face_img = gray[y:y + h, x:x + w]
-
-        results = {
-            'emotion': 'neutral',
-            'age': 25,
-            'gender': 'unknown',
-            'confidence': 0.85
-        }
+        return get_batchers()[name].submit_many(face_imgs)
+    except BatcherClosed:
+        return None
 
-        if emotion_model is not None:
-            try:
-                emotion_face = cv2.resize(face_img, (48, 48))
-                emotion_face = emotion_face.astype('float32') / 255.0
-                emotion_face = np.expand_dims(emotion_face, axis=0)
-                emotion_face = np.expand_dims(emotion_face, axis=-1)
-                emotion_pred = emotion_model.predict(emotion_face)
-                emotions = ['angry', 'disgust', 'fear', 'happy', 'neutral', 'sad', 'surprise']
-                emotion_idx = np.argmax(emotion_pred[0])
-                results['emotion'] = emotions[emotion_idx]
-                results['confidence'] = float(emotion_pred[0][emotion_idx])
-                logger.info(f"🎭 Detected emotion: {results['emotion']} (confidence: {results['confidence']:.2f})")
-            except Exception as e:
-                logger.error(f"❌ Emotion prediction error: {str(e)}")
+def _batched_results(name, futures, predict_fn, face_imgs):
+    """Results of batcher futures, falling back to a direct forward pass if the batcher
+    doesn't answer within INFERENCE_BATCH_TIMEOUT or was closed with the crops queued"""
+    deadline = time.monotonic() + INFERENCE_BATCH_TIMEOUT
+    try:
+        return [f.result(timeout=max(0.0, deadline - time.monotonic())) for f in futures]
+    except (TimeoutError, BatcherClosed) as e:
+        logger.warning(f"⚠️ {name} batcher gave no result ({type(e).__name__}), running the model directly")
+        return predict_fn(face_imgs)
+
+def analyze_faces(face_imgs, age_gender=True):
+    """Run emotion and age/gender models on a list of face crops, one forward pass per model.
+
+    With INFERENCE_BATCHING enabled the crops are queued on the shared
+    micro-batchers instead, so concurrent requests share forward passes.
+    age_gender=False skips the age/gender model (the defaults are returned).
+    """
+    return _analyze_faces(face_imgs, age_gender)[0]
+
+def _analyze_faces(face_imgs, age_gender=True):
+    """analyze_faces plus the (N, 7) emotion probabilities (None if the model didn't run)"""
+    results = [{
+        'emotion': 'neutral',
+        'age': 25,
+        'gender': 'unknown',
+        'confidence': 0.85
+    } for _ in face_imgs]
 
+    emotion_probs = None
+    if not face_imgs:
+        return results, emotion_probs
+
+    emotion_model = _predictor('emotion')
+    age_gender_model = _predictor('age_gender') if age_gender else None
+
+    emotion_futures = age_gender_futures = None
+    if INFERENCE_BATCHING:
+        if emotion_model is not None:
+            emotion_futures = _submit_batched('emotion', face_imgs)
         if age_gender_model is not None:
-            try:
-                ag_face = cv2.resize(face_img, (128, 128))
-                ag_face = ag_face.astype('float32') / 255.0
-                ag_face = ag_face.reshape(1, 128, 128, 1)
-                prediction = age_gender_model.predict(ag_face)
-                gender = 'female' if round(prediction[0][0][0]) == 1 else 'male'
-                age = int(round(prediction[1][0][0]))
-                results['gender'] = gender
-                results['age'] = age
+            age_gender_futures = _submit_batched('age_gender', face_imgs)
+
+    if emotion_model is not None:
+        try:
+            if emotion_futures is not None:
+                emotion_probs = np.stack(_batched_results('emotion', emotion_futures,
+                                                          _predict_emotion_probs, face_imgs))
+            else:
+                emotion_probs = _predict_emotion_probs(face_imgs)
+            for result, pred in zip(results, emotion_probs):
+                emotion_idx = int(np.argmax(pred))
+                result['emotion'] = EMOTION_LABELS[emotion_idx]
+                result['confidence'] = float(pred[emotion_idx])
+                logger.info(f"🎭 Detected emotion: {result['emotion']} (confidence: {result['confidence']:.2f})")
+        except Exception as e:
+            emotion_probs = None
+            MODEL_ERRORS.inc('emotion')
+            logger.error(f"❌ Emotion prediction error: {str(e)}")
+
+    if age_gender_model is not None:
+        try:
+            if age_gender_futures is not None:
+                age_genders = _batched_results('age_gender', age_gender_futures,
+                                               _predict_age_gender, face_imgs)
+            else:
+                age_genders = _predict_age_gender(face_imgs)
+            for result, (gender, age) in zip(results, age_genders):
+                result['gender'] = gender
+                result['age'] = age
                 logger.info(f"👤 Detected: {gender}, age {age}")
-            except Exception as e:
-                logger.error(f"❌ Age/Gender prediction error: {str(e)}")
+        except Exception as e:
+            MODEL_ERRORS.inc('age_gender')
+            logger.error(f"❌ Age/Gender prediction error: {str(e)}")
 
-        return results
+    return results, emotion_probs
+
+_debug_sink = None
+_debug_sink_lock = threading.Lock()
+
+def get_debug_sink():
+    """Sampled upload dumper, started on first use (after any gunicorn fork); None unless DEBUG_DUMP_DIR is set"""
+    global _debug_sink
+    if DEBUG_DUMP_DIR and _debug_sink is None:
+        with _debug_sink_lock:
+            if _debug_sink is None:
+                _debug_sink = DebugSink(DEBUG_DUMP_DIR, DEBUG_DUMP_SAMPLE_RATE)
+    return _debug_sink
+
+def load_grayscale(image):
+    """Grayscale image from upload bytes, a file path or an already decoded array"""
+    if isinstance(image, np.ndarray):
+        return image if image.ndim == 2 else cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    if isinstance(image, str):
+        with open(image, 'rb') as f:
+            image = f.read()
+    sink = get_debug_sink()
+    if sink is not None:
+        sink.maybe_dump(image)
+    with STAGE_SECONDS.time('decode'):
+        gray, _ = decode_grayscale(image, DECODE_MAX_SIDE)
+    if gray is None:
+        raise ValueError("Could not read image file")
+    return gray
+
+def _analyze_gray(gray, age_gender=True):
+    face_img = _largest_face(gray)
+
+    if face_img is None:
+        NO_FACE.inc()
+        logger.warning("⚠️ No face detected in image")
+        return _unknown_analysis()
+
+    return analyze_faces([face_img], age_gender)[0]
+
+def _cached_analysis(gray, age_gender=True):
+    """_analyze_gray behind the perceptual-hash cache"""
+    key = dhash(gray)
+    analysis = analysis_cache.get(key)
+    if analysis is not None:
+        ANALYSIS_CACHE_LOOKUPS.inc('hit')
+        return analysis
+    ANALYSIS_CACHE_LOOKUPS.inc('miss')
+    start = time.perf_counter()
+    analysis = _analyze_gray(gray, age_gender)
+    if age_gender:
+        # Analyses degraded by load shedding are not worth reusing
+        analysis_cache.put(key, analysis, time.perf_counter() - start)
+    return analysis
+
+def detect_face_and_emotion(image, age_gender=True):
+    try:
+        gray = load_grayscale(image)
+        if analysis_cache is not None:
+            return _cached_analysis(gray, age_gender)
+        return _analyze_gray(gray, age_gender)
 
     except Exception as e:
         logger.error(f"❌ Face detection error: {str(e)}")
-        return {
-            'emotion': 'unknown',
-            'age': 0,
-            'gender': 'unknown',
-            'confidence': 0.0
-        }
+        return _unknown_analysis()
 
-def get_movie_recommendations(emotion, age, gender):
-    emotion_genres = {
-        'happy': [35, 10751, 16],
-        'sad': [18, 10749],
-        'angry': [28, 53, 80],
-        'fear': [27, 9648],
-        'surprise': [12, 878],
-        'disgust': [99, 36],
-        'neutral': [18, 35, 28]
-    }
+def detect_faces_and_emotions(images):
+    """Batched variant of detect_face_and_emotion: detect faces in every image,
+    then run each model once over all the crops"""
+    analyses = [None] * len(images)
+    face_imgs = []
+    face_owners = []
+
+    for i, image in enumerate(images):
+        try:
+            face_img = _largest_face(load_grayscale(image))
+        except Exception as e:
+            logger.error(f"❌ Face detection error: {str(e)}")
+            face_img = None
+
+        if face_img is None:
+            NO_FACE.inc()
+            logger.warning(f"⚠️ No face detected in image {i}")
+            analyses[i] = _unknown_analysis()
+        else:
+            face_imgs.append(face_img)
+            face_owners.append(i)
+
+    for i, result in zip(face_owners, analyze_faces(face_imgs)):
+        analyses[i] = result
+
+    return analyses
+
+def analyze_group(gray):
+    """Analyze every detected face (up to GROUP_MAX_FACES, largest first) in one
+    analyze_faces call; returns (group profile, per-face analyses)"""
+    boxes = sorted(
+        ((int(x), int(y), int(w), int(h)) for x, y, w, h in _detect_faces(gray)),
+        key=lambda box: box[2] * box[3], reverse=True
+    )[:GROUP_MAX_FACES]
+    if not boxes:
+        NO_FACE.inc()
+        logger.warning("⚠️ No face detected in image")
+        return _unknown_analysis(), []
 
+    # Crops are views into the frame; they are only copied when resized into the model batches
+    crops = [gray[y:y + h, x:x + w] for x, y, w, h in boxes]
+    faces, emotion_probs = _analyze_faces(crops)
+    for face, box in zip(faces, boxes):
+        face['box'] = list(box)
+
+    profile = group_profile(faces, boxes, emotion_probs, EMOTION_LABELS)
+    logger.info(f"👥 Group of {len(faces)}: {profile['emotion']}, youngest {profile['age']}, {profile['gender']}")
+    return profile, faces
+
+EMOTION_GENRES = {
+    'happy': [35, 10751, 16],
+    'sad': [18, 10749],
+    'angry': [28, 53, 80],
+    'fear': [27, 9648],
+    'surprise': [12, 878],
+    'disgust': [99, 36],
+    'neutral': [18, 35, 28]
+}
+CHILD_GENRES = [16, 10751]
+TEEN_GENRES = [12, 16, 35, 10751]
+YOUNG_ADULT_DEFAULT_GENRES = [28, 35, 878]
+ADULT_DEFAULT_GENRES = [18, 53, 36]
+
+# Every genre get_movie_recommendations can ask for, used to build the candidate index
+ALL_GENRE_IDS = sorted({
+    genre_id
+    for genres in [*EMOTION_GENRES.values(), CHILD_GENRES, TEEN_GENRES,
+                   YOUNG_ADULT_DEFAULT_GENRES, ADULT_DEFAULT_GENRES]
+    for genre_id in genres
+})
+
+def age_bracket(age):
     if age < 13:
-        genres = [16, 10751]
+        return 'child'
     elif age < 18:
-        genres = [12, 16, 35, 10751]
+        return 'teen'
     elif age < 30:
-        genres = emotion_genres.get(emotion, [28, 35, 878])
+        return 'young_adult'
+    return 'adult'
+
+# One age inside each bracket, for building the recommendation table
+AGE_BRACKET_EXAMPLES = {'child': 8, 'teen': 15, 'young_adult': 25, 'adult': 40}
+
+def genres_for(emotion, age):
+    if age < 13:
+        return CHILD_GENRES
+    elif age < 18:
+        return TEEN_GENRES
+    elif age < 30:
+        return EMOTION_GENRES.get(emotion, YOUNG_ADULT_DEFAULT_GENRES)
     else:
-        genres = emotion_genres.get(emotion, [18, 53, 36])
+        return EMOTION_GENRES.get(emotion, ADULT_DEFAULT_GENRES)
+
+def _candidate_source():
+    if CANDIDATE_FIXTURES_DIR:
+        return FixturePageSource(CANDIDATE_FIXTURES_DIR)
+    return TMDBPageSource(get_client)
 
-    headers = {
-        'Authorization': f'Bearer {TMDB_BEARER_TOKEN}',
-        'Content-Type': 'application/json'
+candidate_refresher = CandidateRefresher(
+    _candidate_source(),
+    ALL_GENRE_IDS,
+    pages=CANDIDATE_INDEX_PAGES,
+    interval=CANDIDATE_INDEX_REFRESH_SECONDS,
+    snapshot_path=CANDIDATE_INDEX_PATH or None
+) if CANDIDATE_INDEX else None
+
+def _recommendation(record):
+    return {
+        'title': record['title'],
+        'overview': record['overview'],
+        'rating': record['rating'],
+        'release_date': record['release_date'],
+        'poster_url': record['poster_url'],
+        'genres': record['genre_ids'] or []
     }
 
+_ranking_catalog = (None, None)
+_ranking_catalog_lock = threading.Lock()
+
+def get_ranking_catalog(index):
+    """MovieCatalog for the current candidate index, rebuilt (by one thread) whenever the index is"""
+    global _ranking_catalog
+    built_at, catalog = _ranking_catalog
+    if catalog is not None and built_at == index.built_at:
+        return catalog
+    with _ranking_catalog_lock:
+        built_at, catalog = _ranking_catalog
+        if catalog is None or built_at != index.built_at:
+            catalog = catalog_from_index(index, use_text=RANKING_TFIDF)
+            _ranking_catalog = (index.built_at, catalog)
+    return catalog
+
+def _discover_params(genre_id):
+    return {
+        'with_genres': genre_id,
+        'sort_by': 'popularity.desc',
+        'page': 1
+    }
+
+def live_movies(data):
+    return [_recommendation(movie_record(movie)) for movie in data.get('results', [])[:5]]
+
+def submit_discover(genre_id):
+    """Start one genre's TMDB discover query; its latency and failure are recorded when it completes"""
+    series = STAGE_SECONDS.labels('tmdb_fetch')
+    start = time.perf_counter()
+
+    def record(future):
+        series.observe(time.perf_counter() - start)
+        if future.cancelled() or future.exception() is not None:
+            TMDB_FAILURES.inc()
+
+    future = get_client().submit('/discover/movie', _discover_params(genre_id))
+    future.add_done_callback(record)
+    return future
+
+def _fetch_live_recommendations(genres):
+    # Fan the genre queries out concurrently instead of one round trip after another
+    pending = [(genre_id, submit_discover(genre_id)) for genre_id in genres]
+
+    deadline = time.monotonic() + TMDB_FETCH_BUDGET_SECONDS
     movies = []
 
-    for genre_id in genres[:2]:
+    for genre_id, future in pending:
         try:
-            response = requests.get(
-                f'{TMDB_BASE_URL}/discover/movie',
-                headers=headers,
-                params={
-                    'with_genres': genre_id,
-                    'sort_by': 'popularity.desc',
-                    'page': 1
-                },
-                timeout=10
-            )
-            logger.info(f"TMDB response for genre {genre_id}: {response.status_code}")
-            data = response.json()
-            for movie in data.get('results', [])[:5]:
-                movies.append({
-                    'title': movie.get('title', 'Unknown'),
-                    'overview': movie.get('overview', 'No description available'),
-                    'rating': movie.get('vote_average', 7.0),
-                    'release_date': movie.get('release_date', '2023-01-01'),
-                    'poster_url': f"https://image.tmdb.org/t/p/w500{movie.get('poster_path', '')}" if movie.get('poster_path') else None,
-                    'genres': [genre_id]
-                })
+            movies.extend(live_movies(future.result(timeout=max(0.0, deadline - time.monotonic()))))
         except Exception as e:
             logger.error(f"❌ Error fetching genre {genre_id}: {str(e)}")
 
-    logger.info(f"✅ Sending {len(movies)} recommendations")
+    return movies
+
+def local_recommendations(emotion, age):
+    """Recommendations served from the candidate index, or None if it can't cover these genres yet"""
+    preferred_genres = genres_for(emotion, age)
+    genres = preferred_genres[:2]
+
+    index = None
+    if candidate_refresher is not None:
+        candidate_refresher.ensure_started()
+        index = candidate_refresher.index
+
+    if index is None or not index.covers(genres):
+        return None
+    if RANKING:
+        # Minors only get titles from their bracket's genres, as with the genre queries
+        required_genres = preferred_genres if age < 18 else None
+        catalog = get_ranking_catalog(index)
+        return [
+            _recommendation(record)
+            for record in catalog.top_k(preferred_genres, 10, emotion, required_genres)
+        ]
+    return [
+        _recommendation(record)
+        for genre_id in genres
+        for record in index.top(genre_id, 5)
+    ]
+
+def popular_recommendations(genre_ids):
+    """The most popular titles across the given genres of the candidate index"""
+    if candidate_refresher is None:
+        return []
+    index = candidate_refresher.index
+    records = {record['id']: record for genre_id in genre_ids for record in index.top(genre_id, 10)}
+    top = sorted(records.values(), key=lambda record: record['popularity'] or 0.0, reverse=True)[:10]
+    return [_recommendation(record) for record in top]
 
+def offline_recommendations(emotion, age):
+    """Recommendations that never wait on TMDB: the candidate index, else the most popular
+    indexed titles in any of the bracket's genres"""
+    movies = local_recommendations(emotion, age)
+    if movies is None:
+        movies = popular_recommendations(genres_for(emotion, age))
+    return movies[:10]
+
+def live_genres(emotion, age):
+    """The genres asked of TMDB directly while the candidate index can't cover them"""
+    return genres_for(emotion, age)[:2]
+
+def sending(movies):
+    logger.info(f"✅ Sending {len(movies)} recommendations")
     return movies[:10] if movies else []
 
+def get_movie_recommendations(emotion, age, gender):
+    movies = local_recommendations(emotion, age)
+    if movies is None:
+        # Cold start: the index hasn't been built yet, ask TMDB directly
+        RECOMMENDATION_SOURCE.inc('tmdb')
+        movies = _fetch_live_recommendations(live_genres(emotion, age))
+    else:
+        RECOMMENDATION_SOURCE.inc('index')
+
+    return sending(movies)
+
+def _table_recommendations(emotion, age):
+    movies = local_recommendations(emotion, age)
+    return movies[:10] if movies is not None else None
+
+recommendation_table = RecommendationTableRefresher(
+    [(emotion, bracket, age)
+     for emotion in EMOTION_LABELS + ['unknown']
+     for bracket, age in AGE_BRACKET_EXAMPLES.items()],
+    _table_recommendations,
+    lambda: candidate_refresher.index.built_at,
+    path=RECOMMENDATION_TABLE_PATH or None,
+    interval=RECOMMENDATION_TABLE_CHECK_SECONDS
+) if RECOMMENDATION_TABLE and candidate_refresher is not None else None
+
+def recommendation_json(emotion, age):
+    """Serialized recommendations from the precomputed table, or None when it isn't current"""
+    if recommendation_table is None:
+        return None
+    recommendation_table.ensure_started()
+    return recommendation_table.get_json(emotion, age_bracket(age))
+
+def recommendation_response_body(analysis, recommendations_json, message):
+    """Response JSON with the table's pre-serialized recommendations spliced in as-is"""
+    return b''.join([
+        b'{"analysis":', json.dumps(analysis).encode('utf-8'),
+        b',"message":', json.dumps(message).encode('utf-8'),
+        b',"recommendations":', recommendations_json, b'}'
+    ])
+
+_similarity_index = (None, None)
+_similarity_index_lock = threading.Lock()
+
+def get_similarity_index():
+    """SimilarityIndex for the current candidate index. One thread rebuilds it when the index
+    changes while the others keep serving the previous one (they wait only for the first build)."""
+    global _similarity_index
+    built_at, index = _similarity_index
+    if SIMILARITY_INDEX_PATH and os.path.isdir(SIMILARITY_INDEX_PATH):
+        if index is None:
+            index = SimilarityIndex.load(SIMILARITY_INDEX_PATH, mmap=True)
+            _similarity_index = ('prebuilt', index)
+        return index
+
+    if candidate_refresher is None:
+        return None
+    candidate_refresher.ensure_started()
+    candidates = candidate_refresher.index
+    if not candidates.genres:
+        return None
+    if index is not None and built_at == candidates.built_at:
+        return index
+    if not _similarity_index_lock.acquire(blocking=index is None):
+        return index
+    try:
+        built_at, index = _similarity_index
+        if index is None or built_at != candidates.built_at:
+            records = [record for records in candidates.genres.values() for record in records]
+            index = SimilarityIndex.build(records)
+            _similarity_index = (candidates.built_at, index)
+        return index
+    finally:
+        _similarity_index_lock.release()
+
+@app.route('/api/similar/<int:movie_id>', methods=['GET'])
+def similar_movies(movie_id):
+    k = max(1, min(request.args.get('k', 10, type=int), 50))
+    mode = request.args.get('mode', SIMILARITY_MODE)
+    if mode not in ('exact', 'approx'):
+        return jsonify({'error': "mode must be 'exact' or 'approx'"}), 400
+
+    try:
+        index = get_similarity_index()
+        if index is not None and movie_id in index:
+            results = []
+            for record, similarity in index.similar(movie_id, k, mode, SIMILARITY_NPROBE):
+                movie = _recommendation(record)
+                movie['id'] = record['id']
+                movie['similarity'] = round(similarity, 4)
+                results.append(movie)
+            return jsonify({'movie_id': movie_id, 'mode': mode, 'source': 'local', 'results': results})
+
+        # Not in the local catalog: ask TMDB
+        data = TMDBApi().get_movie_recommendations(movie_id)
+        results = []
+        for movie in data.get('results', [])[:k]:
+            record = movie_record(movie)
+            result = _recommendation(record)
+            result['id'] = record['id']
+            results.append(result)
+        return jsonify({'movie_id': movie_id, 'mode': 'tmdb', 'source': 'tmdb', 'results': results})
+
+    except Exception as e:
+        logger.error(f"❌ Similar movies error: {str(e)}")
+        return jsonify({'error': str(e), 'message': 'Failed to find similar movies'}), 500
+
+def _page_arg():
+    return max(1, min(request.args.get('page', 1, type=int), MAX_PAGE))
+
+@app.route('/api/search', methods=['GET'])
+def search_movies():
+    query = request.args.get('q', '').strip()
+    if not query:
+        return jsonify({'error': 'Missing search query', 'message': "Pass the query as ?q="}), 400
+    try:
+        data = TMDBApi().search_movies(query, _page_arg())
+        return json_response(movie_page(data), SEARCH_MAX_AGE_SECONDS)
+    except Exception as e:
+        logger.error(f"❌ Search error: {str(e)}")
+        return jsonify({'error': str(e), 'message': 'Failed to search movies'}), 500
+
+@app.route('/api/trending/movies', methods=['GET'])
+def trending_movies():
+    time_window = request.args.get('window', 'week')
+    if time_window not in ('day', 'week'):
+        return jsonify({'error': "window must be 'day' or 'week'"}), 400
+    try:
+        data = TMDBApi().get_trending('movie', time_window, _page_arg())
+        return json_response(movie_page(data), LISTS_MAX_AGE_SECONDS)
+    except Exception as e:
+        logger.error(f"❌ Trending movies error: {str(e)}")
+        return jsonify({'error': str(e), 'message': 'Failed to fetch trending movies'}), 500
+
+@app.route('/api/popular/movies', methods=['GET'])
+def popular_movies():
+    try:
+        data = TMDBApi().get_popular(_page_arg())
+        return json_response(movie_page(data), LISTS_MAX_AGE_SECONDS)
+    except Exception as e:
+        logger.error(f"❌ Popular movies error: {str(e)}")
+        return jsonify({'error': str(e), 'message': 'Failed to fetch popular movies'}), 500
+
+class LivePipeline:
+    """Hooks a LiveSession uses to run detection, inference and recommendations"""
+
+    emotion_labels = EMOTION_LABELS
+
+    def detect_faces(self, gray):
+        return _detect_faces(gray)
+
+    def predict_emotion_probs(self, face_imgs):
+        if _predictor('emotion') is None:
+            return None
+        return _predict_emotion_probs(face_imgs)
+
+    def predict_age_gender(self, face_imgs):
+        if _predictor('age_gender') is None:
+            return None
+        return _predict_age_gender(face_imgs)
+
+    def recommendation_key(self, analysis):
+        return analysis['emotion'], age_bracket(analysis['age']), analysis['gender']
+
+    def recommend(self, emotion, age, gender):
+        return get_movie_recommendations(emotion, age, gender)
+
+live_sessions = SessionStore(
+    LivePipeline(),
+    idle_seconds=LIVE_SESSION_IDLE_SECONDS,
+    detect_every=LIVE_DETECT_EVERY,
+    delta_threshold=LIVE_DELTA_THRESHOLD,
+    ema_alpha=LIVE_EMA_ALPHA
+)
+
+def _live_session_id():
+    return request.args.get('session_id') or request.form.get('session_id') or request.headers.get('X-Session-Id')
+
+@app.route('/api/stream/frame', methods=['POST'])
+@app.route('/api/stream/<session_id>/frame', methods=['POST'])
+def stream_frame(session_id=None):
+    try:
+        file = request.files.get('file')
+        if file is None or file.filename == '':
+            return jsonify({'error': 'No frame uploaded'}), 400
+
+        gray = load_grayscale(file.read())
+        session = live_sessions.get_or_create(session_id or _live_session_id())
+        state, changed = session.process(gray)
+        state['recommendations_changed'] = changed
+        state['message'] = 'Analysis complete'
+        return jsonify(state)
+
+    except ValueError as e:
+        return jsonify({'error': str(e), 'message': 'Failed to decode frame'}), 400
+    except Exception as e:
+        logger.error(f"❌ Stream frame error: {str(e)}")
+        return jsonify({'error': str(e), 'message': 'Failed to process frame'}), 500
+
+@app.route('/api/stream/<session_id>/events', methods=['GET'])
+def stream_events(session_id):
+    """Server-sent events: pushes the session state whenever a frame updates it"""
+    session = live_sessions.get(session_id)
+    if session is None:
+        return jsonify({'error': 'Unknown session'}), 404
+
+    def events():
+        # Ends when the session is stopped or idle, or after LIVE_STREAM_MAX_SECONDS (clients reconnect),
+        # so a stream whose client went away does not hold a worker indefinitely
+        version = -1
+        deadline = time.time() + LIVE_STREAM_MAX_SECONDS
+        while live_sessions.get(session_id) is session:
+            now = time.time()
+            idle_left = session.last_seen + LIVE_SESSION_IDLE_SECONDS - now
+            if now >= deadline or idle_left <= 0:
+                break
+            state = session.wait_for_update(version, timeout=min(15, deadline - now, idle_left))
+            if state['version'] == version:
+                yield ': keep-alive\n\n'
+                continue
+            version = state['version']
+            yield f"data: {json.dumps(state)}\n\n"
+
+    return Response(events(), mimetype='text/event-stream', headers={'Cache-Control': 'no-cache'})
+
+def _missing_session_id():
+    return jsonify({'error': 'No session id', 'message': 'Pass session_id or an X-Session-Id header'}), 400
+
+@app.route('/live_data', methods=['GET'])
+def live_data():
+    session_id = _live_session_id()
+    if not session_id:
+        return _missing_session_id()
+    session = live_sessions.get(session_id)
+    if session is None:
+        return jsonify({'emotion': None, 'gender': None, 'age': None, 'recommendations': []})
+    state = session.state()
+    return jsonify({
+        'session_id': state['session_id'],
+        'emotion': state['analysis']['emotion'],
+        'gender': state['analysis']['gender'],
+        'age': state['analysis']['age'],
+        'confidence': state['analysis']['confidence'],
+        'recommendations': state['recommendations']
+    })
+
+@app.route('/stop_camera', methods=['GET', 'POST'])
+def stop_camera():
+    session_id = _live_session_id()
+    if not session_id:
+        return _missing_session_id()
+    stopped = live_sessions.stop(session_id)
+    return jsonify({'stopped': stopped})
+
+def overloaded_body():
+    return {'error': 'Server overloaded', 'message': 'Too many requests in flight, retry shortly'}
+
+def remember_analysis(token, analysis, recent):
+    """Keep a fresh analysis for reuse under load; returns the token to hand back to the client"""
+    if analysis['emotion'] == 'unknown':
+        return None
+    # Tokens are issued here and never chosen by the client, so only the client
+    # that received one can have its analysis reused
+    token = token if recent is not None else secrets.token_urlsafe(16)
+    recent_analyses.put(token, analysis)
+    return token
+
+def recommend_upload(data, analysis_token, tier):
+    """The /api/recommend pipeline.
+
+    Analyzes the uploaded image bytes (or, under load, reuses the analysis
+    behind analysis_token, a token an earlier response issued) at the given
+    quality tier. Returns the serialized response body and the token to
+    send back in X-Analysis-Token (None when nothing was stored).
+    """
+    analysis, token, recommendations_json, recommendations = prepare_upload(data, analysis_token, tier)
+    if recommendations_json is None and recommendations is None:
+        recommendations = sending(_fetch_live_recommendations(live_genres(analysis['emotion'], analysis['age'])))
+    return recommendation_body(analysis, recommendations_json, recommendations), token
+
+def prepare_upload(data, analysis_token, tier):
+    """Everything in recommend_upload that doesn't wait on TMDB: the analysis and whatever
+    recommendations the table or candidate index can serve.
+
+    Returns (analysis, token, recommendations_json, recommendations); both
+    recommendation fields are None on a cold start, when the caller fetches
+    live_genres() from TMDB itself. The ASGI app runs this on its CPU pool
+    and awaits TMDB on the event loop.
+
+    A client without a stored analysis always gets the age/gender model, so
+    what is stored and reused is never the made-up default age, which would
+    skip the under-18 genre filter.
+    """
+    recent = recent_analyses.get(analysis_token) if analysis_token else None
+    if recent is not None and tier >= REUSE_EMOTION:
+        analysis, token = recent, analysis_token
+    else:
+        analysis = detect_face_and_emotion(data, tier < NO_AGE_GENDER or recent is None)
+        if tier >= NO_AGE_GENDER and recent is not None:
+            # The age/gender model was skipped: keep the client's known age and gender
+            analysis.update(age=recent['age'], gender=recent['gender'])
+        token = remember_analysis(analysis_token, analysis, recent)
+
+    emotion, age = analysis['emotion'], analysis['age']
+    recommendations_json = recommendation_json(emotion, age)
+    if recommendations_json is not None:
+        RECOMMENDATION_SOURCE.inc('table')
+        return analysis, token, recommendations_json, None
+    if tier >= NO_TMDB:
+        RECOMMENDATION_SOURCE.inc('offline')
+        return analysis, token, None, offline_recommendations(emotion, age)
+    movies = local_recommendations(emotion, age)
+    if movies is None:
+        # Cold start: the index hasn't been built yet, the caller asks TMDB directly
+        RECOMMENDATION_SOURCE.inc('tmdb')
+        return analysis, token, None, None
+    RECOMMENDATION_SOURCE.inc('index')
+    return analysis, token, None, sending(movies)
+
+def recommendation_body(analysis, recommendations_json, recommendations):
+    """The /api/recommend response body, from the table's serialized recommendations or a list"""
+    with STAGE_SECONDS.time('serialize'):
+        if recommendations_json is None:
+            recommendations_json = json.dumps(recommendations, separators=(',', ':')).encode('utf-8')
+        return recommendation_response_body(analysis, recommendations_json, 'Analysis complete')
+
 @app.route('/api/recommend', methods=['POST'])
 def recommend_movies():
+    with overload.request() as tier:
+        if tier == REJECT:
+            return jsonify(overloaded_body()), 503, {'Retry-After': str(LOAD_SHED_RETRY_AFTER_SECONDS)}
+        response = make_response(_recommend_movies(tier))
+        response.headers['X-Quality-Tier'] = TIER_NAMES[tier]
+        return response
+
+def _recommend_movies(tier):
     try:
         if 'file' not in request.files:
             return jsonify({'error': 'No file uploaded'}), 400
@@ -188,47 +968,186 @@ def recommend_movies():
         if file.filename == '':
             return jsonify({'error': 'No file selected'}), 400
 
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.jpg') as tmp_file:
-            file.save(tmp_file.name)
-            temp_path = tmp_file.name
+        with STAGE_SECONDS.time('upload_read'):
+            data = file.read()
+        body, token = recommend_upload(data, request.headers.get('X-Analysis-Token'), tier)
+        response = Response(body, mimetype='application/json')
+        if token:
+            response.headers['X-Analysis-Token'] = token
+        return response
 
-        try:
-            analysis = detect_face_and_emotion(temp_path)
-            recommendations = get_movie_recommendations(
-                analysis['emotion'], analysis['age'], analysis['gender']
-            )
-            response = {
-                'analysis': analysis,
-                'recommendations': recommendations,
-                'message': 'Analysis complete'
-            }
+    except Exception as e:
+        logger.error(f"❌ Recommendation error: {str(e)}")
+        return jsonify({'error': str(e), 'message': 'Failed to process image'}), 500
+
+@app.route('/api/recommend/group', methods=['POST'])
+def recommend_movies_group():
+    try:
+        if 'file' not in request.files:
+            return jsonify({'error': 'No file uploaded'}), 400
+
+        file = request.files['file']
+        if file.filename == '':
+            return jsonify({'error': 'No file selected'}), 400
+
+        with STAGE_SECONDS.time('upload_read'):
+            data = file.read()
+        profile, faces = analyze_group(load_grayscale(data))
+        recommendations = get_movie_recommendations(
+            profile['emotion'], profile['age'], profile['gender']
+        )
+        response = {
+            'analysis': profile,
+            'faces': faces,
+            'recommendations': recommendations,
+            'message': 'Group analysis complete'
+        }
+        with STAGE_SECONDS.time('serialize'):
             return jsonify(response)
-        finally:
-            try:
-                os.unlink(temp_path)
-            except:
-                pass
 
     except Exception as e:
-        logger.error(f"❌ Recommendation error: {str(e)}")
+        logger.error(f"❌ Group recommendation error: {str(e)}")
         return jsonify({'error': str(e), 'message': 'Failed to process image'}), 500
 
+@app.route('/api/recommend/batch', methods=['POST'])
+def recommend_movies_batch():
+    try:
+        files = [f for f in request.files.getlist('files') + request.files.getlist('file') if f.filename]
+        if not files:
+            return jsonify({'error': 'No files uploaded'}), 400
+        if len(files) > MAX_BATCH_IMAGES:
+            return jsonify({'error': f'Too many files (max {MAX_BATCH_IMAGES})'}), 400
+
+        analyses = detect_faces_and_emotions([file.read() for file in files])
+
+        # Identical analyses share one recommendation lookup
+        recommendations_by_key = {}
+        results = []
+        for file, analysis in zip(files, analyses):
+            key = (analysis['emotion'], analysis['age'], analysis['gender'])
+            if key not in recommendations_by_key:
+                recommendations_by_key[key] = get_movie_recommendations(*key)
+            results.append({
+                'filename': file.filename,
+                'analysis': analysis,
+                'recommendations': recommendations_by_key[key]
+            })
+
+        return jsonify({
+            'results': results,
+            'count': len(results),
+            'message': 'Analysis complete'
+        })
+
+    except Exception as e:
+        logger.error(f"❌ Batch recommendation error: {str(e)}")
+        return jsonify({'error': str(e), 'message': 'Failed to process images'}), 500
+
+def _inference_pool_status():
+    try:
+        return inference_pool.status()
+    except (OSError, RuntimeError) as e:
+        return {'error': str(e)}
+
+def health_status():
+    tmdb_cache = get_client().cache
+    return {
+        'status': 'healthy',
+        'emotion_model': _model_loaded('emotion'),
+        'age_gender_model': _model_loaded('age_gender'),
+        'tmdb_token': TMDB_BEARER_TOKEN is not None,
+        'tmdb_cache': tmdb_cache.stats() if tmdb_cache is not None else None,
+        'model_registry': models.status(),
+        'face_detector': face_detector.name,
+        'memory': process_memory(),
+        'live_sessions': len(live_sessions),
+        'candidate_index': candidate_refresher.stats() if candidate_refresher is not None else None,
+        'inference_batching': {
+            name: batcher.stats() for name, batcher in (_batchers or {}).items()
+        } if INFERENCE_BATCHING else None,
+        'inference_pool': _inference_pool_status() if inference_pool is not None else None,
+        'analysis_cache': analysis_cache.stats() if analysis_cache is not None else None,
+        'recommendation_table': recommendation_table.stats() if recommendation_table is not None else None,
+        'load_shedding': overload.stats(),
+        'warmup': warmup.stats()
+    }
+
 @app.route('/api/health', methods=['GET'])
 def health_check():
-    return jsonify({
-        'status': 'healthy',
-        'emotion_model': emotion_model is not None,
-        'age_gender_model': age_gender_model is not None,
-        'tmdb_token': TMDB_BEARER_TOKEN is not None
-    })
+    return jsonify(health_status())
+
+@app.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+@app.before_request
+def _start_request_timer():
+    g.request_start = time.perf_counter()
+    if PROFILE_REQUESTS and request.headers.get('X-Profile') == '1':
+        g.profiler = SamplingProfiler(threading.get_ident(), PROFILE_INTERVAL_MS / 1000.0).start()
+
+@app.after_request
+def _record_request(response):
+    start = g.get('request_start')
+    if start is not None:
+        route = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+        REQUEST_SECONDS.observe(route, str(response.status_code), value=time.perf_counter() - start)
+    profiler = g.pop('profiler', None)
+    if profiler is not None:
+        profiler.stop()
+        path = profiler.write(profile_path(PROFILE_DIR, request.path))
+        response.headers['X-Profile-File'] = path
+        logger.info(f"🔥 Profile with {profiler.samples} samples written to {path}")
+    return response
+
+@app.route('/api/live', methods=['GET'])
+def liveness():
+    return jsonify({'status': 'alive'})
+
+@app.route('/api/ready', methods=['GET'])
+def readiness():
+    # 503 while warming up and when degraded (a model or another warm-up step failed)
+    return jsonify(warmup.stats()), 200 if warmup.healthy else 503
 
 @app.route('/')
 def index():
     return jsonify({'message': '✅ Flask backend is running.'})
 
+def _warm_model(name, size):
+    """One dummy forward pass so the first request doesn't pay for graph tracing"""
+    predictor = _predictor(name)
+    if predictor is None:
+        raise RuntimeError(f'{name} model is not available')
+    predictor.predict(np.zeros((1, size, size, 1), dtype='float32'))
+
+def _warmup_steps():
+    steps = []
+    if MODEL_LOAD_MODE == 'background' and inference_pool is None:
+        steps.append(('load_models', load_models))
+    steps += [
+        ('emotion_predict', lambda: _warm_model('emotion', 48)),
+        ('age_gender_predict', lambda: _warm_model('age_gender', 128)),
+        ('face_detect', lambda: face_detector.detect(np.zeros((FACE_DETECT_MAX_SIDE, FACE_DETECT_MAX_SIDE), dtype='uint8'))),
+    ]
+    if candidate_refresher is not None:
+        steps.append(('candidate_index', candidate_refresher.ensure_started))
+    if recommendation_table is not None:
+        steps.append(('recommendation_table', recommendation_table.ensure_started))
+    return steps
+
+# Started per worker (gunicorn post_worker_init, or the first request) rather than
+# here, so its thread and the TensorFlow state it creates live in the serving process
+warmup = Warmup(_warmup_steps(), enabled=MODEL_LOAD_MODE != 'lazy')
+
+@app.before_request
+def _ensure_warmup():
+    warmup.ensure_started()
+
+if MODEL_LOAD_MODE == 'preload' and inference_pool is None:
+    load_models()
+
 if __name__ == '__main__':
     logger.info("🚀 Starting Flask server...")
-    load_models()
     if TMDB_BEARER_TOKEN:
         logger.info("✅ TMDB Bearer Token configured")
     else:
@@ -0,0 +1,135 @@
+"""
+Async (ASGI) serving mode.
+
+    gunicorn -c gunicorn.conf.py -k uvicorn.workers.UvicornWorker asgi_app:app
+
+/api/recommend and /api/health are served natively on the event loop:
+uploads are received there, the CPU-bound part of the /api/recommend
+pipeline (app.prepare_upload: decode, detection, inference, local
+recommendations) runs on a bounded CPUPool (503 once ASYNC_MAX_PENDING calls
+are in flight), and cold-start TMDB queries are awaited on the event loop,
+so slow TMDB calls never hold a CPU pool thread. Every
+other route is passed through to the Flask app unchanged. Needs the
+packages in requirements-async.txt (starlette, python-multipart, uvicorn;
+a2wsgi is used for the Flask pass-through when installed).
+"""
+
+import os
+import asyncio
+import logging
+
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+try:
+    from a2wsgi import WSGIMiddleware
+except ImportError:
+    from starlette.middleware.wsgi import WSGIMiddleware
+
+from app import (
+    app as flask_app, CORS_ORIGINS, health_status, overload, overloaded_body, prepare_upload,
+    recommendation_body, submit_discover, live_genres, live_movies, sending,
+    STAGE_SECONDS, LOAD_SHED_RETRY_AFTER_SECONDS, TMDB_FETCH_BUDGET_SECONDS,
+)
+from load_shedding import TIER_NAMES, REJECT
+from cpu_pool import CPUPool, Overloaded
+
+logger = logging.getLogger(__name__)
+
+# Threads running the recommendation pipeline per worker, and how many calls may be
+# running or queued before requests are rejected with 503
+ASYNC_CPU_WORKERS = int(os.getenv('ASYNC_CPU_WORKERS', '2'))
+ASYNC_MAX_PENDING = int(os.getenv('ASYNC_MAX_PENDING', '16'))
+
+cpu_pool = CPUPool(ASYNC_CPU_WORKERS, ASYNC_MAX_PENDING)
+
+
+async def _fetch_genre(genre_id):
+    data = await asyncio.wait_for(asyncio.wrap_future(submit_discover(genre_id)), TMDB_FETCH_BUDGET_SECONDS)
+    return live_movies(data)
+
+
+async def fetch_live_recommendations(genres):
+    """app._fetch_live_recommendations awaited on the event loop: the genre queries run
+    concurrently on the TMDB client's pool and share the TMDB_FETCH_BUDGET_SECONDS budget"""
+    results = await asyncio.gather(*(_fetch_genre(genre_id) for genre_id in genres), return_exceptions=True)
+    movies = []
+    for genre_id, result in zip(genres, results):
+        if isinstance(result, Exception):
+            logger.error(f"❌ Error fetching genre {genre_id}: {str(result) or type(result).__name__}")
+        else:
+            movies.extend(result)
+    return movies
+
+
+def _overloaded():
+    return JSONResponse(
+        overloaded_body(), status_code=503, headers={'Retry-After': str(LOAD_SHED_RETRY_AFTER_SECONDS)}
+    )
+
+
+async def recommend_movies(request):
+    with overload.request() as tier:
+        if tier == REJECT:
+            return _overloaded()
+        response = await _recommend_movies(request, tier)
+        response.headers['X-Quality-Tier'] = TIER_NAMES[tier]
+        return response
+
+
+async def _recommend_movies(request, tier):
+    try:
+        form = await request.form()
+        if 'file' not in form:
+            return JSONResponse({'error': 'No file uploaded'}, status_code=400)
+
+        file = form['file']
+        if not getattr(file, 'filename', None):
+            return JSONResponse({'error': 'No file selected'}, status_code=400)
+
+        with STAGE_SECONDS.time('upload_read'):
+            data = await file.read()
+        analysis, token, recommendations_json, recommendations = await cpu_pool.run(
+            prepare_upload, data, request.headers.get('X-Analysis-Token'), tier
+        )
+        if recommendations_json is None and recommendations is None:
+            genres = live_genres(analysis['emotion'], analysis['age'])
+            recommendations = sending(await fetch_live_recommendations(genres))
+        body = recommendation_body(analysis, recommendations_json, recommendations)
+        return Response(body, media_type='application/json', headers={'X-Analysis-Token': token} if token else None)
+
+    except Overloaded:
+        return _overloaded()
+    except Exception as e:
+        logger.error(f"❌ Recommendation error: {str(e)}")
+        return JSONResponse({'error': str(e), 'message': 'Failed to process image'}, status_code=500)
+
+
+async def health_check(request):
+    status = health_status()
+    status['serving'] = {'mode': 'async', 'cpu_pool': cpu_pool.stats()}
+    return JSONResponse(status)
+
+
+async_routes = Starlette(
+    routes=[
+        Route('/api/recommend', recommend_movies, methods=['POST']),
+        Route('/api/health', health_check, methods=['GET']),
+    ],
+    middleware=[Middleware(CORSMiddleware, allow_origins=CORS_ORIGINS, allow_methods=['*'], allow_headers=['*'],
+                          expose_headers=['X-Analysis-Token', 'X-Quality-Tier'])]
+)
+ASYNC_PATHS = {route.path for route in async_routes.routes}
+
+flask_routes = WSGIMiddleware(flask_app)
+
+
+async def app(scope, receive, send):
+    """Dispatch the async routes to Starlette and everything else to Flask"""
+    if scope['type'] != 'http' or scope['path'] in ASYNC_PATHS:
+        await async_routes(scope, receive, send)
+    else:
+        await flask_routes(scope, receive, send)
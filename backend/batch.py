@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+"""
+Offline bulk scoring of image archives.
+
+    python batch.py score <dir> --out results.jsonl [--workers N] [--batch-size 64]
+    python batch.py score <dir> --out results.parquet      # needs pyarrow
+
+Images are streamed from a directory walk through a spawned process pool
+that reads, decodes and runs face detection (only the largest face crop
+comes back), then through the models in batches of --batch-size crops in
+this process. Recommendations are looked up once per (emotion, age bracket),
+the only inputs they depend on. Rows are written as each batch completes
+and the processed paths are committed to a SQLite checkpoint after the rows
+are flushed, so an interrupted run resumes where it stopped (rows of the
+last uncommitted batch may be written twice; a Parquet file is only
+readable once closed, so a killed rather than interrupted run loses its
+Parquet part while JSONL keeps every flushed row). Faces that got no
+recommendations (a failed TMDB call) are not checkpointed, so a resume
+scores them again. Only --window images are
+in flight at once, so memory does not grow with the archive.
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import time
+import logging
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+import multiprocessing
+
+logger = logging.getLogger(__name__)
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp', '.webp')
+
+
+def iter_images(root):
+    """Image paths under root in a stable order, without listing the whole tree up front"""
+    for directory, subdirs, files in os.walk(root):
+        subdirs.sort()
+        for name in sorted(files):
+            if name.lower().endswith(IMAGE_EXTENSIONS):
+                yield os.path.join(directory, name)
+
+
+class Checkpoint:
+    """Paths (relative to the archive root) already scored, kept on disk so resuming
+    costs no memory per processed file"""
+
+    def __init__(self, path):
+        self.path = path
+        self._conn = sqlite3.connect(path)
+        self._conn.execute('CREATE TABLE IF NOT EXISTS processed (path TEXT PRIMARY KEY)')
+
+    def __contains__(self, path):
+        return self._conn.execute('SELECT 1 FROM processed WHERE path = ?', (path,)).fetchone() is not None
+
+    def __len__(self):
+        return self._conn.execute('SELECT COUNT(*) FROM processed').fetchone()[0]
+
+    def mark(self, paths):
+        with self._conn:
+            self._conn.executemany('INSERT OR IGNORE INTO processed (path) VALUES (?)', ((p,) for p in paths))
+
+    def close(self):
+        self._conn.close()
+
+
+class JSONLWriter:
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'a', encoding='utf-8')
+
+    def write(self, rows):
+        for row in rows:
+            self._file.write(json.dumps(row, ensure_ascii=False) + '\n')
+
+    def flush(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self):
+        self._file.close()
+
+
+class ParquetWriter:
+    """One row group per flushed batch; recommendations are stored as a JSON string column"""
+
+    def __init__(self, path):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        self._pa = pa
+        self.schema = pa.schema([
+            ('path', pa.string()), ('status', pa.string()), ('error', pa.string()),
+            ('emotion', pa.string()), ('confidence', pa.float64()), ('age', pa.int64()),
+            ('gender', pa.string()), ('recommendations', pa.string()),
+        ])
+        # Parquet files can't be appended to: a resumed run writes the next part file
+        stem, ext = os.path.splitext(path)
+        part = 0
+        while os.path.exists(path):
+            part += 1
+            path = f'{stem}.part{part}{ext}'
+        self.path = path
+        self._writer = pq.ParquetWriter(path, self.schema)
+        self._pending = []
+
+    def write(self, rows):
+        for row in rows:
+            row = dict(row)
+            row['recommendations'] = json.dumps(row.get('recommendations'), ensure_ascii=False)
+            self._pending.append(row)
+
+    def flush(self):
+        if self._pending:
+            self._writer.write_table(self._pa.Table.from_pylist(self._pending, schema=self.schema))
+            self._pending = []
+
+    def close(self):
+        self.flush()
+        self._writer.close()
+
+
+def open_writer(path):
+    if path.endswith('.parquet'):
+        return ParquetWriter(path)
+    return JSONLWriter(path)
+
+
+# Per-process detection state, set up once by _init_worker in each pool process
+_worker = {}
+
+
+def _init_worker(detector_kind, detector_model_dir, detect_max_side, decode_max_side):
+    from face_detection import create_detector
+    _worker['detector'] = create_detector(detector_kind, detector_model_dir, detect_max_side)
+    _worker['decode_max_side'] = decode_max_side
+
+
+def _detect(path):
+    """(path, largest face crop or None, error message or None); runs in a pool process"""
+    from image_io import decode_grayscale
+    try:
+        with open(path, 'rb') as f:
+            gray, _ = decode_grayscale(f.read(), _worker['decode_max_side'])
+        if gray is None:
+            return path, None, 'Could not read image file'
+        faces = _worker['detector'].detect(gray)
+        if len(faces) == 0:
+            return path, None, None
+        x, y, w, h = max(faces, key=lambda f: f[2] * f[3])
+        return path, gray[y:y + h, x:x + w].copy(), None
+    except Exception as e:
+        return path, None, str(e)
+
+
+class Progress:
+    def __init__(self, total, interval=10.0):
+        self.total = total
+        self.interval = interval
+        self.done = 0
+        self.faces = 0
+        self.started = time.perf_counter()
+        self._last_report = self.started
+
+    def add(self, images, faces):
+        self.done += images
+        self.faces += faces
+        now = time.perf_counter()
+        if now - self._last_report >= self.interval:
+            self._last_report = now
+            self.report()
+
+    def report(self):
+        elapsed = time.perf_counter() - self.started
+        rate = self.done / elapsed if elapsed else 0.0
+        eta = f"{(self.total - self.done) / rate:.0f}s" if rate and self.total is not None else '?'
+        total = self.total if self.total is not None else '?'
+        logger.info(f"📈 {self.done}/{total} images ({self.faces} faces), {rate:.1f} images/s, ETA {eta}")
+
+
+def score(root, out, checkpoint_path=None, workers=None, batch_size=64, window=None,
+          count_first=True, progress_interval=10.0, index_wait=60.0):
+    """Score every image under root into out; returns the number of images processed in this run"""
+    import app
+
+    workers = workers or max(1, (os.cpu_count() or 2) - 1)
+    window = window or workers * 8
+    checkpoint = Checkpoint(checkpoint_path or f'{out}.checkpoint.sqlite3')
+    already = len(checkpoint)
+    if already:
+        logger.info(f"↩️ Resuming: {already} images already scored")
+
+    total = None
+    if count_first:
+        total = sum(1 for path in iter_images(root) if os.path.relpath(path, root) not in checkpoint)
+        logger.info(f"🗂️ {total} images to score")
+    progress = Progress(total, progress_interval)
+
+    if app.candidate_refresher is not None:
+        # Recommendations should come from the candidate index, not from per-key cold-start TMDB calls
+        app.candidate_refresher.ensure_started()
+        deadline = time.time() + index_wait
+        while not app.candidate_refresher.index.genres and time.time() < deadline:
+            time.sleep(0.5)
+        if not app.candidate_refresher.index.genres:
+            logger.warning(f"⚠️ Candidate index not ready after {index_wait:.0f}s; asking TMDB directly")
+
+    recommendation_cache = {}
+
+    def recommendations(emotion, age, gender):
+        key = (emotion, app.age_bracket(age))
+        if key not in recommendation_cache:
+            movies = app.get_movie_recommendations(emotion, age, gender)
+            if not movies:
+                # Most likely a failed cold-start TMDB call: retry for the next image instead
+                return movies
+            recommendation_cache[key] = movies
+        return recommendation_cache[key]
+
+    writer = open_writer(out)
+    rows, crops, crop_rows = [], [], []
+
+    def flush():
+        if crops:
+            for row, analysis in zip(crop_rows, app.analyze_faces(crops)):
+                row.update(analysis)
+                row['recommendations'] = recommendations(analysis['emotion'], analysis['age'], analysis['gender'])
+        writer.write(rows)
+        writer.flush()
+        # Faces left without recommendations (TMDB failed) are scored again on resume
+        checkpoint.mark(row['path'] for row in rows if row['status'] != 'ok' or row['recommendations'])
+        progress.add(len(rows), len(crops))
+        rows.clear()
+        crops.clear()
+        crop_rows.clear()
+
+    context = multiprocessing.get_context('spawn')
+    initargs = (app.FACE_DETECTOR, app.FACE_DETECTOR_MODEL_DIR, app.FACE_DETECT_MAX_SIDE, app.DECODE_MAX_SIDE)
+    paths = (path for path in iter_images(root) if os.path.relpath(path, root) not in checkpoint)
+    try:
+        with ProcessPoolExecutor(workers, mp_context=context, initializer=_init_worker, initargs=initargs) as pool:
+            in_flight = set()
+            exhausted = False
+            while in_flight or not exhausted:
+                while not exhausted and len(in_flight) < window:
+                    path = next(paths, None)
+                    if path is None:
+                        exhausted = True
+                    else:
+                        in_flight.add(pool.submit(_detect, path))
+                if not in_flight:
+                    break
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    path, crop, error = future.result()
+                    row = {'path': os.path.relpath(path, root)}
+                    rows.append(row)
+                    if crop is not None:
+                        row.update(status='ok', error=None)
+                        crops.append(crop)
+                        crop_rows.append(row)
+                    else:
+                        row.update(_unknown_row(error))
+                if len(crops) >= batch_size or len(rows) >= batch_size * 4:
+                    flush()
+            flush()
+    finally:
+        writer.close()
+        checkpoint.close()
+        progress.report()
+    return progress.done
+
+
+def _unknown_row(error):
+    return {
+        'status': 'error' if error else 'no_face',
+        'error': error,
+        'emotion': 'unknown',
+        'confidence': 0.0,
+        'age': 0,
+        'gender': 'unknown',
+        'recommendations': None
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    run = subparsers.add_parser('score', help='score every image under a directory')
+    run.add_argument('root')
+    run.add_argument('--out', required=True, help='.jsonl or .parquet output (appended to when resuming)')
+    run.add_argument('--checkpoint', help='checkpoint database (default: <out>.checkpoint.sqlite3)')
+    run.add_argument('--workers', type=int, help='decode/detection processes (default: CPUs - 1)')
+    run.add_argument('--batch-size', type=int, default=64, help='face crops per model forward pass')
+    run.add_argument('--window', type=int, help='images in flight at once (default: 8 per worker)')
+    run.add_argument('--no-count', action='store_true', help="skip the counting pass (no ETA)")
+    run.add_argument('--progress-interval', type=float, default=10.0, help='seconds between progress lines')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    if not os.path.isdir(args.root):
+        sys.exit(f"❌ Not a directory: {args.root}")
+    # Per-face model logs would drown the progress lines
+    logging.getLogger('app').setLevel(logging.WARNING)
+    score(args.root, args.out, args.checkpoint, args.workers, args.batch_size, args.window,
+          count_first=not args.no_count, progress_interval=args.progress_interval)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Hit rate and CPU saved by the perceptual-hash analysis cache.
+
+Builds a kiosk-like stream from the input image: --scenes distinct frames
+(mirrored, cropped and rotated variants of the image, standing in for
+different visitors) each sent --repeats times with the jitter of a webcam
+retry (JPEG re-encode at random quality, brightness change, sensor noise,
+a pixel or two of shift). The stream goes through detect_face_and_emotion
+with the cache off and on; stub models stand in for missing ones. Also
+reports the largest hash distance between repeats of one scene and the
+smallest between different scenes, which bound a safe
+ANALYSIS_CACHE_MAX_DISTANCE.
+
+Usage (from the backend directory):
+    python benchmarks/bench_analysis_cache.py [image] --scenes 8 --repeats 10 --out cache.json
+"""
+
+import argparse
+import itertools
+import os
+import random
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.chdir(BACKEND_DIR)
+
+import cv2
+import numpy as np
+
+import stub_models
+from analysis_cache import AnalysisCache, dhash, hamming
+from bench_report import summarize, write_report
+
+
+def scene(image, i):
+    """A distinct frame derived from image: mirrored, cropped and rotated by i"""
+    h, w = image.shape[:2]
+    if i % 2:
+        image = cv2.flip(image, 1)
+    crop = 0.04 * (i // 2)
+    image = image[int(h * crop):h - int(h * crop / 2), int(w * crop / 2):w - int(w * crop)]
+    h, w = image.shape[:2]
+    rotation = cv2.getRotationMatrix2D((w / 2, h / 2), 3 * (i % 5) - 6, 1.0)
+    return cv2.warpAffine(image, rotation, (w, h), borderMode=cv2.BORDER_REPLICATE)
+
+
+def jitter(image, rng):
+    """The same frame as a webcam would resend it"""
+    shift = np.float32([[1, 0, rng.randint(-2, 2)], [0, 1, rng.randint(-2, 2)]])
+    image = cv2.warpAffine(image, shift, (image.shape[1], image.shape[0]), borderMode=cv2.BORDER_REPLICATE)
+    image = cv2.convertScaleAbs(image, alpha=rng.uniform(0.95, 1.05), beta=rng.uniform(-6, 6))
+    noise = np.random.default_rng(rng.randint(0, 1 << 30)).normal(0, 2, image.shape)
+    image = np.clip(image + noise, 0, 255).astype('uint8')
+    ok, data = cv2.imencode('.jpg', image, [cv2.IMWRITE_JPEG_QUALITY, rng.randint(60, 95)])
+    return data.tobytes()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('image', nargs='?', default=os.path.join(BACKEND_DIR, 'debug_input.jpg'))
+    parser.add_argument('--scenes', type=int, default=8)
+    parser.add_argument('--repeats', type=int, default=10)
+    parser.add_argument('--max-distance', type=int, default=4)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--out', help='write JSON results here')
+    args = parser.parse_args()
+
+    os.environ.update(TMDB_CACHE='off', CANDIDATE_INDEX='0', ANALYSIS_CACHE='0')
+    os.environ.setdefault('TMDB_BEARER_TOKEN', 'stub')
+    import app
+    stub_models.install(app.models)
+
+    rng = random.Random(args.seed)
+    base = cv2.imread(args.image)
+    stream = [(i, jitter(scene(base, i), rng)) for i in range(args.scenes) for _ in range(args.repeats)]
+
+    hashes = {}
+    for i, data in stream:
+        hashes.setdefault(i, []).append(dhash(app.load_grayscale(data)))
+    within = max(hamming(a, b) for h in hashes.values() for a, b in itertools.combinations(h, 2))
+    between = min(hamming(a, b) for x, y in itertools.combinations(hashes, 2) for a in hashes[x] for b in hashes[y])
+
+    results = {}
+    app.detect_face_and_emotion(stream[0][1])
+    for label, cache in (('off', None), ('on', AnalysisCache(max_distance=args.max_distance))):
+        app.analysis_cache = cache
+        samples = []
+        start = time.perf_counter()
+        for _, data in stream:
+            t = time.perf_counter()
+            app.detect_face_and_emotion(data)
+            samples.append((time.perf_counter() - t) * 1000)
+        results[f'analyze/cache_{label}'] = summarize(samples, seconds=time.perf_counter() - start)
+        if cache is not None:
+            results['cache'] = cache.stats()
+
+    off, on, stats = results['analyze/cache_off'], results['analyze/cache_on'], results['cache']
+    cpu_saved = (1 - on['mean_ms'] / off['mean_ms']) * 100
+    results['cache'].update(within_scene_max_distance=within, between_scene_min_distance=between,
+                            cpu_saved_pct=round(cpu_saved, 2))
+
+    print(f"{len(stream)} frames, {args.scenes} scenes x {args.repeats} repeats")
+    print(f"hash distance: repeats of a scene <= {within}, different scenes >= {between} "
+          f"(max_distance {args.max_distance})")
+    print(f"cache off: mean {off['mean_ms']:.1f} ms, p95 {off['p95_ms']:.1f} ms")
+    print(f"cache on:  mean {on['mean_ms']:.1f} ms, p95 {on['p95_ms']:.1f} ms")
+    print(f"hit rate {stats['hit_rate']:.1%}, saved {stats['saved_seconds']:.2f}s, CPU saved {cpu_saved:.1f}%")
+
+    write_report(args.out, 'analysis_cache', vars(args), results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Load test of /api/recommend: sync gunicorn workers vs. the async (ASGI) mode.
+
+Starts the local TMDB stub with --latency-ms, then for each mode launches
+gunicorn on a free port with the candidate index and TMDB cache disabled
+(so every request really waits on TMDB), drives it with --concurrency
+client threads for --duration seconds and reports throughput, latency
+percentiles and 503s. Both modes get the same number of worker processes.
+
+Usage (from the backend directory):
+    python benchmarks/bench_async_serving.py [image] --concurrency 16 --duration 15 --latency-ms 200
+"""
+
+import argparse
+import os
+import sys
+from collections import Counter
+
+import numpy as np
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import tmdb_stub
+from load_test import free_port, start_server, run_load
+
+MODES = {
+    'sync': ['app:app'],
+    'async': ['-k', 'uvicorn.workers.UvicornWorker', 'asgi_app:app'],
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('image', nargs='?', default=os.path.join(BACKEND_DIR, 'debug_input.jpg'))
+    parser.add_argument('--modes', nargs='+', choices=list(MODES), default=list(MODES))
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--duration', type=float, default=15)
+    parser.add_argument('--latency-ms', type=float, default=200)
+    parser.add_argument('--workers', type=int, default=1)
+    args = parser.parse_args()
+
+    with open(args.image, 'rb') as f:
+        image = f.read()
+    stub, tmdb_url = tmdb_stub.start(latency_ms=args.latency_ms)
+
+    print(f"{args.concurrency} clients, {args.duration:.0f}s, {args.workers} worker(s), TMDB latency {args.latency_ms:.0f} ms")
+    print(f"{'mode':<8}{'req/s':>8}{'ok':>7}{'503':>7}{'errors':>8}{'p50 ms':>10}{'p99 ms':>10}")
+    for mode in args.modes:
+        port = free_port()
+        server = start_server(MODES[mode], port, {
+            'WEB_CONCURRENCY': str(args.workers),
+            'TMDB_BASE_URL': tmdb_url,
+            'TMDB_BEARER_TOKEN': 'stub',
+            'TMDB_CACHE': 'off',
+            'CANDIDATE_INDEX': '0',
+            'MODEL_LOAD_MODE': 'lazy',
+        })
+        try:
+            results = run_load(f'http://127.0.0.1:{port}/api/recommend', image, args.concurrency, args.duration)
+        finally:
+            server.terminate()
+            server.wait()
+        statuses = Counter(status for status, _ in results)
+        ok = [ms for status, ms in results if status == 200]
+        p50, p99 = np.percentile(ok, [50, 99]) if ok else (float('nan'), float('nan'))
+        errors = len(results) - statuses[200] - statuses[503]
+        print(f"{mode:<8}{len(ok) / args.duration:>8.1f}{statuses[200]:>7}{statuses[503]:>7}{errors:>8}{p50:>10.1f}{p99:>10.1f}")
+
+    stub.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Accuracy-vs-latency comparison of the Keras, TFLite and ONNX inference backends.
+
+Crops the largest face from every image in image_dir, runs each available
+backend on the crops and compares its predictions against Keras, which is
+treated as ground truth.
+
+Usage (from the backend directory):
+    python benchmarks/bench_backends.py image_dir [--rounds 20]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+os.chdir(BACKEND_DIR)
+
+from model_registry import ModelRegistry
+from inference_backends import BACKENDS, KerasBackend, create_backend
+from convert_models import load_face_crops, face_batch
+
+
+def latency_ms(backend, batch, rounds):
+    backend.predict(batch)  # warm-up
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        backend.predict(batch)
+        timings.append((time.perf_counter() - start) * 1000)
+    return np.percentile(timings, 50), np.percentile(timings, 99)
+
+
+def agreement(name, reference, predicted):
+    if name == 'emotion':
+        top1 = np.mean(np.argmax(reference, axis=1) == np.argmax(predicted, axis=1))
+        return f"top-1 agreement {top1:.3f}, mean |dp| {np.abs(reference - predicted).mean():.4f}"
+    gender = np.mean(np.round(reference[0]) == np.round(predicted[0]))
+    age_mae = np.abs(reference[1] - predicted[1]).mean()
+    return f"gender agreement {gender:.3f}, age MAE {age_mae:.2f}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('image_dir')
+    parser.add_argument('--rounds', type=int, default=20)
+    args = parser.parse_args()
+
+    crops = load_face_crops(args.image_dir)
+    if not crops:
+        raise SystemExit(f"No images found in {args.image_dir}")
+    registry = ModelRegistry('.')
+
+    for name, size in (('emotion', 48), ('age_gender', 128)):
+        keras_model = registry.get(name)
+        if keras_model is None:
+            print(f"⚠️  {name}: Keras model unavailable, skipping")
+            continue
+        batch = face_batch(crops, size)
+        reference = KerasBackend(keras_model).predict(batch)
+
+        print(f"\n{name} ({len(crops)} faces)")
+        for backend_name in BACKENDS:
+            backend = create_backend(backend_name, name, registry.compiled_dir, lambda: keras_model)
+            if backend_name != 'keras' and isinstance(backend, KerasBackend):
+                continue  # artifact or runtime missing; create_backend fell back to Keras
+            single = latency_ms(backend, batch[:1], args.rounds)
+            full = latency_ms(backend, batch, args.rounds)
+            print(f"  {backend_name:<8} batch=1 p50 {single[0]:7.2f} ms | batch={len(batch)} p50 {full[0]:7.2f} ms "
+                  f"({len(batch) / full[0] * 1000:7.1f} faces/s) | {agreement(name, reference, backend.predict(batch))}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Compare images/second of the single-image and batched face analysis paths.
+
+Usage (from the backend directory):
+    python benchmarks/bench_batch_inference.py [image_dir] --batch-size 16 --rounds 5
+"""
+
+import argparse
+import glob
+import os
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+os.chdir(BACKEND_DIR)
+
+import app
+
+
+def collect_images(image_dir, batch_size):
+    """Return batch_size image paths, cycling through the directory if needed"""
+    if image_dir:
+        paths = sorted(
+            p for ext in ('*.jpg', '*.jpeg', '*.png')
+            for p in glob.glob(os.path.join(image_dir, ext))
+        )
+    else:
+        paths = [os.path.join(BACKEND_DIR, 'debug_input.jpg')]
+    if not paths:
+        raise SystemExit(f"No images found in {image_dir}")
+    return [paths[i % len(paths)] for i in range(batch_size)]
+
+
+def bench(fn, rounds):
+    fn()  # warm-up, excludes graph tracing from the measurement
+    start = time.perf_counter()
+    for _ in range(rounds):
+        fn()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('image_dir', nargs='?', default=None)
+    parser.add_argument('--batch-size', type=int, default=16)
+    parser.add_argument('--rounds', type=int, default=5)
+    args = parser.parse_args()
+
+    app.load_models()
+    paths = collect_images(args.image_dir, args.batch_size)
+    total = len(paths) * args.rounds
+
+    single = bench(lambda: [app.detect_face_and_emotion(p) for p in paths], args.rounds)
+    batched = bench(lambda: app.detect_faces_and_emotions(paths), args.rounds)
+
+    print(f"images per round: {len(paths)}, rounds: {args.rounds}")
+    print(f"single-image: {total / single:8.1f} images/s")
+    print(f"batched:      {total / batched:8.1f} images/s")
+    print(f"speed-up:     {single / batched:8.2f}x")
+
+
+if __name__ == '__main__':
+    main()
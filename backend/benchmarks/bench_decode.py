@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Per-request cost of the upload decode path: the old temp-file round trip vs. in-memory decode.
+
+The old path saved the upload to a NamedTemporaryFile, read it back with
+cv2.imread, wrote debug_input.jpg and converted to RGB and grayscale. The
+new path decodes the request bytes straight to grayscale, at reduced scale
+for large JPEGs. Read/write syscalls come from /proc/self/io (Linux).
+
+Usage (from the backend directory):
+    python benchmarks/bench_decode.py [image] --rounds 50 --upscale 4
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import cv2
+import numpy as np
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from image_io import decode_grayscale
+
+
+def io_syscalls():
+    try:
+        with open('/proc/self/io') as f:
+            fields = dict(line.split(': ') for line in f.read().splitlines())
+        return int(fields['syscr']) + int(fields['syscw'])
+    except OSError:
+        return 0
+
+
+def old_path(data, debug_path):
+    with tempfile.NamedTemporaryFile(delete=False, suffix='.jpg') as tmp_file:
+        tmp_file.write(data)
+        temp_path = tmp_file.name
+    try:
+        img = cv2.imread(temp_path)
+        cv2.imwrite(debug_path, img)
+        cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+        return cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+    finally:
+        os.unlink(temp_path)
+
+
+def bench(fn, rounds):
+    fn()
+    syscalls_before = io_syscalls()
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return np.percentile(timings, 50), np.percentile(timings, 99), (io_syscalls() - syscalls_before) / rounds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('image', nargs='?', default=os.path.join(BACKEND_DIR, 'debug_input.jpg'))
+    parser.add_argument('--rounds', type=int, default=50)
+    parser.add_argument('--upscale', type=int, default=4, help='also test an upload this many times larger')
+    parser.add_argument('--max-side', type=int, default=960)
+    args = parser.parse_args()
+
+    with open(args.image, 'rb') as f:
+        original = f.read()
+    uploads = {'original': original}
+    if args.upscale > 1:
+        img = cv2.imdecode(np.frombuffer(original, np.uint8), cv2.IMREAD_COLOR)
+        big = cv2.resize(img, None, fx=args.upscale, fy=args.upscale)
+        uploads[f'x{args.upscale}'] = cv2.imencode('.jpg', big)[1].tobytes()
+
+    with tempfile.TemporaryDirectory() as scratch:
+        debug_path = os.path.join(scratch, 'debug_input.jpg')
+        print(f"{'upload':<10}{'path':<22}{'p50 ms':>10}{'p99 ms':>10}{'io syscalls':>14}{'decoded':>14}")
+        for label, data in uploads.items():
+            paths = {
+                'tempfile + imread': lambda: old_path(data, debug_path),
+                'imdecode grayscale': lambda: decode_grayscale(data)[0],
+                'imdecode reduced': lambda: decode_grayscale(data, args.max_side)[0],
+            }
+            for name, fn in paths.items():
+                p50, p99, syscalls = bench(fn, args.rounds)
+                shape = 'x'.join(map(str, fn().shape[:2]))
+                print(f"{label:<10}{name:<22}{p50:>10.2f}{p99:>10.2f}{syscalls:>14.1f}{shape:>14}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Face detection throughput and recall against the original full-resolution Haar baseline.
+
+The baseline is the old per-request path: a fresh CascadeClassifier parsed
+from disk and detectMultiScale(gray, 1.3, 5) on the full image. Every other
+configuration reuses its detector and runs at a bounded working resolution;
+recall is the fraction of baseline boxes it finds (IoU >= --iou). YuNet and
+SSD are included when their model files are present in --model-dir.
+
+Usage (from the backend directory):
+    python benchmarks/bench_face_detection.py [image_dir] --max-side 640 --rounds 3
+"""
+
+import argparse
+import glob
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from face_detection import FaceDetector, HaarDetector, create_backend
+
+IMAGE_PATTERNS = ('*.jpg', '*.jpeg', '*.png')
+
+
+def baseline_detect(gray):
+    cascade = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
+    return np.asarray(cascade.detectMultiScale(gray, 1.3, 5), dtype='int32').reshape(-1, 4)
+
+
+def iou(a, b):
+    x0, y0 = max(a[0], b[0]), max(a[1], b[1])
+    x1, y1 = min(a[0] + a[2], b[0] + b[2]), min(a[1] + a[3], b[1] + b[3])
+    inter = max(0, x1 - x0) * max(0, y1 - y0)
+    return inter / float(a[2] * a[3] + b[2] * b[3] - inter)
+
+
+def matched(reference, boxes, threshold):
+    return sum(1 for ref in reference if any(iou(ref, box) >= threshold for box in boxes))
+
+
+def run(detect, images, rounds):
+    results = [detect(gray) for gray in images]
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for gray in images:
+            detect(gray)
+    elapsed = time.perf_counter() - start
+    return results, len(images) * rounds / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('image_dir', nargs='?', default=BACKEND_DIR)
+    parser.add_argument('--max-side', type=int, default=640)
+    parser.add_argument('--model-dir', default=os.path.join(BACKEND_DIR, 'face_models'))
+    parser.add_argument('--rounds', type=int, default=3)
+    parser.add_argument('--iou', type=float, default=0.5)
+    parser.add_argument('--limit', type=int)
+    args = parser.parse_args()
+
+    paths = sorted(p for pattern in IMAGE_PATTERNS for p in glob.glob(os.path.join(args.image_dir, pattern)))
+    images = [img for img in (cv2.imread(p, cv2.IMREAD_GRAYSCALE) for p in paths[:args.limit]) if img is not None]
+    if not images:
+        sys.exit(f"❌ No images found in {args.image_dir}")
+
+    configs = {
+        'haar per-request (baseline)': baseline_detect,
+        'haar cached, full res': FaceDetector(HaarDetector(), max_side=None).detect,
+        f'haar cached, {args.max_side}px': FaceDetector(HaarDetector(), args.max_side).detect,
+    }
+    for kind in ('yunet', 'ssd'):
+        try:
+            configs[f'{kind}, {args.max_side}px'] = FaceDetector(create_backend(kind, args.model_dir), args.max_side).detect
+        except (FileNotFoundError, cv2.error) as e:
+            print(f"⚠️  Skipping {kind}: {str(e)}")
+
+    print(f"{len(images)} images, {args.rounds} rounds")
+    print(f"{'detector':<30}{'images/s':>10}{'faces':>8}{'recall':>8}")
+    reference = None
+    for name, detect in configs.items():
+        results, rate = run(detect, images, args.rounds)
+        if reference is None:
+            reference = results
+        found = sum(len(boxes) for boxes in results)
+        expected = sum(len(boxes) for boxes in reference)
+        hits = sum(matched(ref, boxes, args.iou) for ref, boxes in zip(reference, results))
+        recall = f'{hits / expected:.3f}' if expected else 'n/a'
+        print(f"{name:<30}{rate:>10.1f}{found:>8}{recall:>8}")
+
+
+if __name__ == '__main__':
+    main()
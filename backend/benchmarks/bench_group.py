@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Group-mode latency as the number of faces in the frame grows.
+
+Cuts the largest face out of the input image and tiles 1..--max-faces
+copies onto a 1280x720 frame (slightly varied in size and brightness).
+For each face count it times analyze_group() on the frame (one detection
+pass plus one forward pass per model over all faces) against analysing the
+same crops one face at a time, as repeated single-face requests would.
+Stub models stand in for missing ones; their per-item cost is set with
+--emotion-ms / --age-gender-ms, so with stubs inference grows linearly by
+construction. The summary reports how end-to-end group latency scales from
+1 to N faces, split into inference and the rest (detection, crops), which
+also grows with the number of faces the cascade has to confirm.
+
+Usage (from the backend directory):
+    python benchmarks/bench_group.py [image] --max-faces 10 --repeats 10 --out group.json
+"""
+
+import argparse
+import os
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.chdir(BACKEND_DIR)
+
+import cv2
+import numpy as np
+
+import stub_models
+from bench_report import summarize, write_report
+
+
+def group_frame(face, count, width=1280, height=720, columns=5):
+    """A frame with count copies of face laid out on a grid"""
+    frame = np.full((height, width), 90, dtype='uint8')
+    rows = 2
+    cell_w, cell_h = width // columns, height // rows
+    for i in range(count):
+        side = int(min(cell_w, cell_h) * (0.8 + 0.03 * (i % 5)))
+        tile = cv2.resize(face, (side, side))
+        tile = cv2.convertScaleAbs(tile, alpha=1.0, beta=(i % 3) * 8)
+        x = (i % columns) * cell_w + (cell_w - side) // 2
+        y = (i // columns % rows) * cell_h + (cell_h - side) // 2
+        frame[y:y + side, x:x + side] = tile
+    return frame
+
+
+def timed(fn, repeats):
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return summarize(samples), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('image', nargs='?', default=os.path.join(BACKEND_DIR, 'debug_input.jpg'))
+    parser.add_argument('--max-faces', type=int, default=10)
+    parser.add_argument('--repeats', type=int, default=10)
+    parser.add_argument('--emotion-ms', type=float, default=2.0, help='stub emotion model cost per face')
+    parser.add_argument('--age-gender-ms', type=float, default=6.0, help='stub age/gender model cost per face')
+    parser.add_argument('--out', help='write JSON results here')
+    args = parser.parse_args()
+
+    os.environ.update(TMDB_CACHE='off', CANDIDATE_INDEX='0', MODEL_LOAD_MODE='lazy')
+    os.environ.setdefault('TMDB_BEARER_TOKEN', 'stub')
+    os.environ.setdefault('GROUP_MAX_FACES', str(args.max_faces))
+    import app
+    stub_models.install(app.models, emotion_ms=args.emotion_ms, age_gender_ms=args.age_gender_ms)
+
+    gray = app.load_grayscale(args.image)
+    face = app._largest_face(gray)
+    if face is None:
+        sys.exit(f"❌ No face found in {args.image}")
+
+    results = {}
+    print(f"{'faces':<7}{'found':>6}{'group ms':>10}{'inference ms':>14}{'detect+crop ms':>16}{'per-face ms':>13}")
+    for count in range(1, args.max_faces + 1):
+        frame = group_frame(face, count)
+        group, (profile, faces) = timed(lambda: app.analyze_group(frame), args.repeats)
+        boxes = [f['box'] for f in faces]
+        crops = [frame[y:y + h, x:x + w] for x, y, w, h in boxes]
+        batched, _ = timed(lambda: app.analyze_faces(crops), args.repeats)
+        per_face, _ = timed(lambda: [app.analyze_faces([crop]) for crop in crops], args.repeats)
+        results[f'group/{count}_faces'] = dict(group, faces_found=len(faces))
+        results[f'inference_batched/{count}_faces'] = batched
+        results[f'inference_per_face/{count}_faces'] = per_face
+        other_ms = group['p50_ms'] - batched['p50_ms']
+        print(f"{count:<7}{len(faces):>6}{group['p50_ms']:>10.1f}{batched['p50_ms']:>14.1f}{other_ms:>16.1f}"
+              f"{per_face['p50_ms']:>13.1f}")
+
+    first, last = results['group/1_faces'], results[f'group/{args.max_faces}_faces']
+    results['scaling'] = {
+        'group_p50_ms': [first['p50_ms'], last['p50_ms']],
+        'faces_found': [first['faces_found'], last['faces_found']],
+        'ratio': round(last['p50_ms'] / first['p50_ms'], 2),
+    }
+    print(f"end to end: {first['p50_ms']:.1f} ms for 1 face, {last['p50_ms']:.1f} ms for {last['faces_found']} faces "
+          f"({results['scaling']['ratio']}x)")
+
+    write_report(args.out, 'group', vars(args), results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Frames/second of one live session against re-running the full pipeline per frame.
+
+Synthesises a webcam clip by jittering and slightly shifting a face image,
+then feeds it through LiveSession (tracking, frame skipping, EMA) and through
+detect_face_and_emotion + get_movie_recommendations for every frame, which
+is what polling /api/recommend did. Uses the real models when available.
+
+Usage (from the backend directory):
+    python benchmarks/bench_live_stream.py [image] --frames 300
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+os.chdir(BACKEND_DIR)
+
+import app
+from live_session import LiveSession
+
+
+def synthetic_clip(image_path, frames, seed=0):
+    gray = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
+    gray = cv2.resize(gray, (640, 480))
+    rng = np.random.default_rng(seed)
+    clip = []
+    for i in range(frames):
+        # Slow drift plus sensor noise; every 30th frame a bigger head movement
+        dx = int(3 * np.sin(i / 15)) + (12 if i % 30 == 0 else 0)
+        shifted = np.roll(gray, dx, axis=1)
+        noise = rng.normal(0, 2, gray.shape)
+        clip.append(np.clip(shifted + noise, 0, 255).astype('uint8'))
+    return clip
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('image', nargs='?', default=os.path.join(BACKEND_DIR, 'debug_input.jpg'))
+    parser.add_argument('--frames', type=int, default=300)
+    args = parser.parse_args()
+
+    clip = synthetic_clip(args.image, args.frames)
+
+    session = LiveSession('bench', app.LivePipeline(), detect_every=app.LIVE_DETECT_EVERY,
+                          delta_threshold=app.LIVE_DELTA_THRESHOLD, ema_alpha=app.LIVE_EMA_ALPHA)
+    start = time.perf_counter()
+    for frame in clip:
+        session.process(frame)
+    live_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for frame in clip:
+        analysis = app.detect_face_and_emotion(frame)
+        app.get_movie_recommendations(analysis['emotion'], analysis['age'], analysis['gender'])
+    full_seconds = time.perf_counter() - start
+
+    print(f"frames: {len(clip)}")
+    print(f"live session:  {len(clip) / live_seconds:7.1f} fps  {session.counters}")
+    print(f"full pipeline: {len(clip) / full_seconds:7.1f} fps")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Load test of /api/recommend with and without adaptive load shedding.
+
+Starts the local TMDB stub with --tmdb-latency-ms, then for LOAD_SHEDDING=0
+and 1 launches one async (ASGI) worker with the candidate index and TMDB
+cache disabled (every full-quality request waits on TMDB) and a CPU pool
+queue large enough that it never rejects on its own. Each --concurrency
+level runs for --duration seconds with closed-loop clients that send back
+the X-Analysis-Token of their previous response, like returning users.
+Every client is first seeded with one unmeasured request, so the reuse tier
+has an analysis to reuse (a client's first request always runs the models).
+Reports throughput, p50/p99 latency, status counts and how many requests
+the controller admitted at each quality tier (from /api/health).
+
+Usage (from the backend directory):
+    python benchmarks/bench_load_shedding.py [image] --concurrency 1 4 8 16 32 --duration 15 --out shedding.json
+"""
+
+import argparse
+import os
+import sys
+
+import requests
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import tmdb_stub
+from bench_report import write_report
+from load_test import SERVER_ARGS, free_port, start_server, run_load, level_result
+from load_shedding import TIER_NAMES
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('image', nargs='?', default=os.path.join(BACKEND_DIR, 'debug_input.jpg'))
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 4, 8, 16, 32])
+    parser.add_argument('--duration', type=float, default=15)
+    parser.add_argument('--tmdb-latency-ms', type=float, default=200)
+    parser.add_argument('--inflight-limits', default='4,8,12,16', help='LOAD_SHED_INFLIGHT_LIMITS for the shedding run')
+    parser.add_argument('--target-ms', type=float, default=1000, help='LOAD_SHED_TARGET_MS for the shedding run')
+    parser.add_argument('--out', help='write JSON results here')
+    args = parser.parse_args()
+
+    with open(args.image, 'rb') as f:
+        image = f.read()
+    stub, tmdb_url = tmdb_stub.start(latency_ms=args.tmdb_latency_ms)
+
+    results = {}
+    print(f"{'shedding':<10}{'clients':>8}{'req/s':>8}{'ok':>7}{'503':>6}{'p50 ms':>10}{'p99 ms':>10}  tiers")
+    try:
+        for shedding in ('0', '1'):
+            port = free_port()
+            server = start_server(SERVER_ARGS['async'], port, {
+                'WEB_CONCURRENCY': '1',
+                'TMDB_BASE_URL': tmdb_url,
+                'TMDB_BEARER_TOKEN': 'stub',
+                'TMDB_CACHE': 'off',
+                'CANDIDATE_INDEX': '0',
+                'MODEL_LOAD_MODE': 'lazy',
+                'ASYNC_MAX_PENDING': '1000',
+                'LOAD_SHEDDING': shedding,
+                'LOAD_SHED_INFLIGHT_LIMITS': args.inflight_limits,
+                'LOAD_SHED_TARGET_MS': str(args.target_ms),
+            })
+            health_url = f'http://127.0.0.1:{port}/api/health'
+            recommend_url = f'http://127.0.0.1:{port}/api/recommend'
+            tokens = {}
+            try:
+                for concurrency in args.concurrency:
+                    for i in range(concurrency):
+                        if i not in tokens:
+                            response = requests.post(recommend_url, files={'file': ('face.jpg', image, 'image/jpeg')},
+                                                     timeout=60)
+                            tokens[i] = response.headers.get('X-Analysis-Token')
+                    before = requests.get(health_url, timeout=10).json()['load_shedding']['requests_by_tier']
+                    result = level_result(
+                        run_load(recommend_url, image, concurrency, args.duration, analysis_tokens=tokens),
+                        args.duration
+                    )
+                    after = requests.get(health_url, timeout=10).json()['load_shedding']['requests_by_tier']
+                    result['tiers'] = {tier: after[tier] - before[tier] for tier in TIER_NAMES}
+                    results[f'shedding_{shedding}/c{concurrency}'] = result
+
+                    p50, p99 = (result[key] or float('nan') for key in ('p50_ms', 'p99_ms'))
+                    rejected = result['statuses'].get('503', 0)
+                    tiers = ' '.join(f'{tier}={n}' for tier, n in result['tiers'].items() if n)
+                    print(f"{shedding:<10}{concurrency:>8}{result['throughput_per_s']:>8.1f}{result['n']:>7}"
+                          f"{rejected:>6}{p50:>10.1f}{p99:>10.1f}  {tiers}")
+            finally:
+                server.terminate()
+                server.wait()
+    finally:
+        stub.shutdown()
+
+    write_report(args.out, 'load_shedding', vars(args), results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Time MovieCatalog.top_k over a synthetic catalog.
+
+Usage (from the backend directory):
+    python benchmarks/bench_ranking.py --movies 100000 --queries 1000 [--tfidf]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from ranking import MovieCatalog, GENRE_VOCAB, EMOTION_KEYWORDS
+
+WORDS = ' '.join(EMOTION_KEYWORDS.values()).split() + ['city', 'night', 'young', 'man', 'woman', 'town']
+
+
+def synthetic_records(n, seed=0):
+    rng = np.random.default_rng(seed)
+    records = []
+    for i in range(n):
+        genre_ids = rng.choice(GENRE_VOCAB, size=rng.integers(1, 4), replace=False).tolist()
+        records.append({
+            'id': i,
+            'title': f'Movie {i}',
+            'overview': ' '.join(rng.choice(WORDS, size=20)),
+            'rating': float(rng.uniform(3, 9)),
+            'popularity': float(rng.pareto(1.5) * 10),
+            'release_date': f'{rng.integers(1960, 2026)}-01-01',
+            'poster_url': None,
+            'genre_ids': genre_ids,
+        })
+    return records
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--movies', type=int, default=100000)
+    parser.add_argument('--queries', type=int, default=1000)
+    parser.add_argument('--k', type=int, default=10)
+    parser.add_argument('--tfidf', action='store_true')
+    args = parser.parse_args()
+
+    records = synthetic_records(args.movies)
+    start = time.perf_counter()
+    catalog = MovieCatalog(records, use_text=args.tfidf)
+    build_ms = (time.perf_counter() - start) * 1000
+
+    emotions = list(EMOTION_KEYWORDS)
+    rng = np.random.default_rng(1)
+    queries = [
+        (rng.choice(GENRE_VOCAB, size=3, replace=False).tolist(), emotions[i % len(emotions)])
+        for i in range(args.queries)
+    ]
+
+    catalog.top_k(queries[0][0], args.k, queries[0][1])  # warm-up
+    timings = []
+    for genres, emotion in queries:
+        start = time.perf_counter()
+        catalog.top_k(genres, args.k, emotion)
+        timings.append((time.perf_counter() - start) * 1000)
+
+    timings = np.array(timings)
+    print(f"catalog: {len(catalog)} movies, tfidf={args.tfidf}")
+    print(f"build:   {build_ms:.0f} ms")
+    print(f"top-{args.k}:  p50 {np.percentile(timings, 50):.3f} ms, p99 {np.percentile(timings, 99):.3f} ms, "
+          f"{1000 / timings.mean():.0f} queries/s")
+
+
+if __name__ == '__main__':
+    main()
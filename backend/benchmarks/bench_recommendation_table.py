@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Cost of recommendation assembly with and without the precomputed table.
+
+Builds the candidate index from the local TMDB stub, then for every
+(emotion, age bracket) key times: ranking the index per call
+(get_movie_recommendations) plus jsonify of the result, against a lookup of
+the table's pre-serialized bytes. Also reports the table build time and
+file size.
+
+Usage (from the backend directory):
+    python benchmarks/bench_recommendation_table.py --calls 2000 --out table.json
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.chdir(BACKEND_DIR)
+
+import tmdb_stub
+from bench_report import summarize, write_report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--calls', type=int, default=2000)
+    parser.add_argument('--out', help='write JSON results here')
+    args = parser.parse_args()
+
+    stub, tmdb_url = tmdb_stub.start(latency_ms=0)
+    table_path = os.path.join(tempfile.mkdtemp(), 'recommendation_table.bin')
+    os.environ.update(TMDB_BASE_URL=tmdb_url, TMDB_CACHE='off', CANDIDATE_INDEX='1', CANDIDATE_INDEX_PATH='',
+                      RECOMMENDATION_TABLE='1', RECOMMENDATION_TABLE_PATH=table_path, MODEL_LOAD_MODE='lazy')
+    os.environ.setdefault('TMDB_BEARER_TOKEN', 'stub')
+
+    import app
+    app.candidate_refresher.refresh()
+    table = app.recommendation_table.refresh()
+    stub.shutdown()
+
+    keys = [(emotion, age) for emotion, _, age in app.recommendation_table.keys]
+
+    def per_call_us(fn):
+        samples = []
+        for i in range(args.calls):
+            emotion, age = keys[i % len(keys)]
+            start = time.perf_counter()
+            fn(emotion, age)
+            samples.append((time.perf_counter() - start) * 1e6)
+        return summarize(samples)
+
+    with app.app.app_context():
+        assembly = per_call_us(lambda emotion, age: app.jsonify(app.get_movie_recommendations(emotion, age, 'unknown')))
+    lookup = per_call_us(app.recommendation_json)
+
+    # summarize() labels its percentiles in ms; these samples are microseconds
+    print(f"table: {len(table)} keys, {table.size_bytes} bytes, built in {table.build_seconds * 1000:.1f} ms")
+    print(f"assembly + jsonify  p50 {assembly['p50_ms']:.1f} us, p99 {assembly['p99_ms']:.1f} us")
+    print(f"table lookup        p50 {lookup['p50_ms']:.1f} us, p99 {lookup['p99_ms']:.1f} us")
+
+    results = {
+        'recommend/assembly_us': assembly,
+        'recommend/table_lookup_us': lookup,
+        'table': {'keys': len(table), 'size_bytes': table.size_bytes, 'build_seconds': table.build_seconds},
+    }
+    write_report(args.out, 'recommendation_table', vars(args), results)
+
+
+if __name__ == '__main__':
+    main()
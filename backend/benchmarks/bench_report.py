@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Machine-readable benchmark results, comparable across commits.
+
+bench_suite.py and load_test.py write one JSON document per run:
+    {"suite": ..., "meta": {git commit, host, ...}, "config": {...},
+     "results": {name: {"n", "mean_ms", "p50_ms", "p95_ms", "p99_ms", "throughput_per_s", ...}}}
+
+Compare two runs (from the backend directory):
+    python benchmarks/bench_report.py compare before.json after.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def summarize(samples_ms, seconds=None):
+    """Latency percentiles of samples_ms; throughput is per wall-clock second if given, else per busy second"""
+    samples = np.asarray(samples_ms, dtype='float64')
+    if samples.size == 0:
+        return {'n': 0, 'mean_ms': None, 'p50_ms': None, 'p95_ms': None, 'p99_ms': None, 'throughput_per_s': 0.0}
+    p50, p95, p99 = np.percentile(samples, [50, 95, 99])
+    seconds = seconds or samples.sum() / 1000.0
+    return {
+        'n': int(samples.size),
+        'mean_ms': round(float(samples.mean()), 3),
+        'p50_ms': round(float(p50), 3),
+        'p95_ms': round(float(p95), 3),
+        'p99_ms': round(float(p99), 3),
+        'throughput_per_s': round(samples.size / seconds, 2) if seconds else None,
+    }
+
+
+def _git(*args):
+    try:
+        return subprocess.run(['git', *args], cwd=BACKEND_DIR, capture_output=True, text=True, timeout=10).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def metadata():
+    return {
+        'git_commit': _git('rev-parse', 'HEAD'),
+        'git_dirty': bool(_git('status', '--porcelain', '--untracked-files=no')),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+    }
+
+
+def write_report(path, suite, config, results):
+    report = {'suite': suite, 'meta': metadata(), 'config': config, 'results': results}
+    if path:
+        with open(path, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"📝 Results written to {path}")
+    return report
+
+
+def compare(before_path, after_path):
+    with open(before_path) as f:
+        before = json.load(f)
+    with open(after_path) as f:
+        after = json.load(f)
+    print(f"{before['meta'].get('git_commit', '?')[:10]} -> {after['meta'].get('git_commit', '?')[:10]}")
+    print(f"{'benchmark':<36}{'p50 ms':>18}{'p99 ms':>18}{'throughput/s':>20}")
+    for name, new in after['results'].items():
+        old = before['results'].get(name)
+        if old is None:
+            continue
+        columns = []
+        for key in ('p50_ms', 'p99_ms', 'throughput_per_s'):
+            if old.get(key) and new.get(key) is not None:
+                change = (new[key] - old[key]) / old[key] * 100
+                columns.append(f"{new[key]:.2f} ({change:+.0f}%)")
+            else:
+                columns.append('n/a')
+        print(f"{name:<36}{columns[0]:>18}{columns[1]:>18}{columns[2]:>20}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    compare_parser = subparsers.add_parser('compare', help='compare two result files')
+    compare_parser.add_argument('before')
+    compare_parser.add_argument('after')
+    args = parser.parse_args()
+    if args.command == 'compare':
+        compare(args.before, args.after)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
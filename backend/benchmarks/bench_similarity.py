@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Recall@k vs. latency of exact and IVF search in SimilarityIndex.
+
+Usage (from the backend directory):
+    python benchmarks/bench_similarity.py --movies 100000 --queries 200 --k 10
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from similarity import SimilarityIndex
+from bench_ranking import synthetic_records
+
+
+def timed_search(index, queries, k, mode, nprobe=None):
+    results = []
+    timings = []
+    for query in queries:
+        start = time.perf_counter()
+        rows, _ = index.search(query, k, mode, nprobe or 1)
+        timings.append((time.perf_counter() - start) * 1000)
+        results.append(set(int(index.ids[row]) for row in rows))
+    return results, np.array(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--movies', type=int, default=100000)
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--k', type=int, default=10)
+    parser.add_argument('--clusters', type=int, default=None)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    built = SimilarityIndex.build(synthetic_records(args.movies), args.clusters)
+    print(f"build: {len(built)} movies, dim {built.embeddings.shape[1]}, "
+          f"{len(built.centroids)} clusters in {time.perf_counter() - start:.1f} s")
+
+    with tempfile.TemporaryDirectory() as path:
+        built.save(path)
+        start = time.perf_counter()
+        index = SimilarityIndex.load(path, mmap=True)
+        print(f"mmap load: {(time.perf_counter() - start) * 1000:.1f} ms")
+
+        rng = np.random.default_rng(2)
+        queries = [np.asarray(index.embeddings[row]) for row in rng.choice(len(index), args.queries, replace=False)]
+
+        exact, timings = timed_search(index, queries, args.k, 'exact')
+        print(f"{'mode':<14}{'recall@' + str(args.k):>10}{'p50 ms':>10}{'p99 ms':>10}")
+        print(f"{'exact':<14}{1.0:>10.3f}{np.percentile(timings, 50):>10.3f}{np.percentile(timings, 99):>10.3f}")
+
+        for nprobe in (1, 2, 4, 8, 16, 32):
+            if nprobe >= len(index.centroids):
+                break
+            approx, timings = timed_search(index, queries, args.k, 'approx', nprobe)
+            recall = np.mean([len(a & e) / len(e) for a, e in zip(approx, exact)])
+            print(f"{'ivf nprobe=' + str(nprobe):<14}{recall:>10.3f}"
+                  f"{np.percentile(timings, 50):>10.3f}{np.percentile(timings, 99):>10.3f}")
+        del index
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Cold-start time of a gunicorn worker in each MODEL_LOAD_MODE.
+
+Launches gunicorn (one worker, real app; --stub uses benchmarks/stub_app.py)
+and polls it from the moment the process is spawned: time to first response
+is the first 200 from /api/live, time to ready the first 200 from
+/api/ready. 'preload' loads the models in the master before any worker
+answers, 'background' answers /api/live at once and loads them in the
+worker's warm-up thread, 'lazy' is ready at once and loads them on the
+first request. Each mode is started --runs times; the TMDB stub stands in
+for TMDB so the candidate index build is local.
+
+Usage (from the backend directory):
+    python benchmarks/bench_startup.py --modes preload background lazy --runs 3 --out startup.json
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+import requests
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import tmdb_stub
+from bench_report import summarize, write_report
+from load_test import free_port, SERVER_ARGS
+
+
+def _wait_for(url, started, server, deadline):
+    while time.perf_counter() < deadline:
+        try:
+            if requests.get(url, timeout=1).status_code == 200:
+                return (time.perf_counter() - started) * 1000
+        except requests.RequestException:
+            pass
+        if server.poll() is not None:
+            sys.exit(f"❌ Server exited with code {server.returncode}")
+        time.sleep(0.02)
+    return None
+
+
+def cold_start(mode, app_args, env, timeout):
+    """Spawn one server; returns (ms to first /api/live 200, ms to first /api/ready 200)"""
+    port = free_port()
+    base_url = f'http://127.0.0.1:{port}'
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', *app_args],
+        cwd=BACKEND_DIR, env=dict(os.environ, PORT=str(port), MODEL_LOAD_MODE=mode, **env),
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        deadline = started + timeout
+        first_response = _wait_for(f'{base_url}/api/live', started, server, deadline)
+        ready = _wait_for(f'{base_url}/api/ready', started, server, deadline)
+    finally:
+        server.terminate()
+        server.wait()
+    return first_response, ready
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--modes', nargs='+', choices=['preload', 'background', 'lazy'],
+                        default=['preload', 'background', 'lazy'])
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--stub', action='store_true', help='serve benchmarks/stub_app.py instead of app.py')
+    parser.add_argument('--timeout', type=float, default=300)
+    parser.add_argument('--out', help='write JSON results here')
+    args = parser.parse_args()
+
+    stub, tmdb_url = tmdb_stub.start(latency_ms=0)
+    env = {
+        'WEB_CONCURRENCY': '1',
+        'TMDB_BASE_URL': tmdb_url,
+        'TMDB_BEARER_TOKEN': 'stub',
+        'TMDB_CACHE': 'off',
+        'CANDIDATE_INDEX_PATH': '',
+    }
+    app_args = SERVER_ARGS['sync'] if args.stub else ['app:app']
+
+    results = {}
+    print(f"{'mode':<12}{'first response ms':>19}{'ready ms':>12}")
+    try:
+        for mode in args.modes:
+            runs = [cold_start(mode, app_args, env, args.timeout) for _ in range(args.runs)]
+            first = summarize([live for live, _ in runs if live is not None])
+            ready = summarize([ready for _, ready in runs if ready is not None])
+            results[f'{mode}/first_response'] = first
+            results[f'{mode}/ready'] = ready
+            print(f"{mode:<12}{first['p50_ms'] or float('nan'):>19.0f}{ready['p50_ms'] or float('nan'):>12.0f}")
+    finally:
+        stub.shutdown()
+
+    write_report(args.out, 'startup', vars(args), results)
+
+
+if __name__ == '__main__':
+    main()
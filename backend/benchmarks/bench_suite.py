@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmarks for each stage of a recommendation request.
+
+Stages: upload decode, face detection, each model's predict (batch of 1
+and --batch-size), the whole detect_face_and_emotion call, and
+recommendation assembly from the candidate index (ranking), from live TMDB
+queries and through get_movie_recommendations. TMDB is the local stub
+(tmdb_stub.py) with --tmdb-latency-ms / --tmdb-error-rate, and models that
+cannot be loaded are replaced by stub_models.py (--stub-models force
+replaces the real ones too).
+
+Usage (from the backend directory):
+    python benchmarks/bench_suite.py [image] --iterations 50 --out results.json
+    python benchmarks/bench_report.py compare before.json results.json
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.chdir(BACKEND_DIR)
+
+import tmdb_stub
+import stub_models
+from bench_report import summarize, write_report
+
+
+def timed(fn, iterations, warmup=2):
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return summarize(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('image', nargs='?', default=os.path.join(BACKEND_DIR, 'debug_input.jpg'))
+    parser.add_argument('--iterations', type=int, default=50)
+    parser.add_argument('--batch-size', type=int, default=8)
+    parser.add_argument('--upscale', type=int, default=4, help='also decode an upload this many times larger')
+    parser.add_argument('--tmdb-latency-ms', type=float, default=50)
+    parser.add_argument('--tmdb-error-rate', type=float, default=0.0)
+    parser.add_argument('--stub-models', choices=['auto', 'force', 'off'], default='auto')
+    parser.add_argument('--out', help='write JSON results here')
+    args = parser.parse_args()
+
+    stub, tmdb_url = tmdb_stub.start(latency_ms=args.tmdb_latency_ms, error_rate=args.tmdb_error_rate)
+    os.environ.update(TMDB_BASE_URL=tmdb_url, TMDB_CACHE='off', CANDIDATE_INDEX='1', CANDIDATE_INDEX_PATH='')
+    os.environ.setdefault('TMDB_BEARER_TOKEN', 'stub')
+
+    import app
+    from image_io import decode_grayscale
+
+    stubbed = [] if args.stub_models == 'off' else stub_models.install(app.models, force=args.stub_models == 'force')
+
+    with open(args.image, 'rb') as f:
+        upload = f.read()
+    uploads = {'original': upload}
+    if args.upscale > 1:
+        img = cv2.imdecode(np.frombuffer(upload, np.uint8), cv2.IMREAD_COLOR)
+        big = cv2.resize(img, None, fx=args.upscale, fy=args.upscale)
+        uploads[f'x{args.upscale}'] = cv2.imencode('.jpg', big)[1].tobytes()
+
+    results = {}
+    for label, data in uploads.items():
+        results[f'decode/{label}'] = timed(lambda: decode_grayscale(data, app.DECODE_MAX_SIDE), args.iterations)
+
+    gray = app.load_grayscale(upload)
+    results[f'face_detection/{app.face_detector.name}'] = timed(lambda: app._detect_faces(gray), args.iterations)
+
+    face = app._largest_face(gray)
+    if face is None:
+        face = gray
+    predictions = {'emotion': app._predict_emotion_probs, 'age_gender': app._predict_age_gender}
+    for name, predict in predictions.items():
+        if app._predictor(name) is None:
+            print(f"⚠️  Skipping {name}: model unavailable")
+            continue
+        for batch_size in sorted({1, args.batch_size}):
+            crops = [face] * batch_size
+            result = timed(lambda: predict(crops), args.iterations)
+            result['items_per_s'] = round(result['throughput_per_s'] * batch_size, 2)
+            results[f'predict/{name}/batch{batch_size}'] = result
+
+    results['analyze/detect_face_and_emotion'] = timed(lambda: app.detect_face_and_emotion(upload), args.iterations)
+
+    analysis = app.detect_face_and_emotion(upload)
+    emotion, age, gender = analysis['emotion'], analysis['age'], analysis['gender']
+    app.candidate_refresher.refresh()
+    results['recommend/index'] = timed(lambda: app.local_recommendations(emotion, age), args.iterations)
+    genres = app.genres_for(emotion, age)[:2]
+    results['recommend/live_tmdb'] = timed(lambda: app._fetch_live_recommendations(genres), args.iterations)
+    results['recommend/get_movie_recommendations'] = timed(
+        lambda: app.get_movie_recommendations(emotion, age, gender), args.iterations
+    )
+    stub.shutdown()
+
+    print(f"{'benchmark':<40}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'ops/s':>10}")
+    for name, result in results.items():
+        print(f"{name:<40}{result['p50_ms']:>10.2f}{result['p95_ms']:>10.2f}{result['p99_ms']:>10.2f}{result['throughput_per_s']:>10.1f}")
+
+    config = dict(vars(args), stubbed_models=stubbed, face_detector=app.face_detector.name,
+                  inference_backend=app.INFERENCE_BACKEND, decode_max_side=app.DECODE_MAX_SIDE)
+    write_report(args.out, 'micro', config, results)
+
+
+if __name__ == '__main__':
+    main()
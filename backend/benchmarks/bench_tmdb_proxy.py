@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Payload size and latency of the TMDB proxy routes against relaying raw TMDB JSON.
+
+For /api/trending/movies, /api/popular/movies and /api/search it compares,
+through Flask's test client and the local TMDB stub (with the TMDB cache
+on, as in production): the raw TMDB page relayed with jsonify, the compact
+page uncompressed, gzip- and brotli-encoded (when brotli is installed),
+and a revalidation with If-None-Match answered by 304. Reports response
+bytes and p50/p95 time per variant.
+
+Usage (from the backend directory):
+    python benchmarks/bench_tmdb_proxy.py --requests 200 --out proxy.json
+"""
+
+import argparse
+import os
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.chdir(BACKEND_DIR)
+
+import tmdb_stub
+from bench_report import summarize, write_report
+
+ROUTES = {
+    'trending': ('/api/trending/movies', '/trending/movie/week', None),
+    'popular': ('/api/popular/movies', '/movie/popular', None),
+    'search': ('/api/search?q=stub', '/search/movie', {'query': 'stub', 'page': 1}),
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--out', help='write JSON results here')
+    args = parser.parse_args()
+
+    stub, tmdb_url = tmdb_stub.start(latency_ms=0)
+    os.environ.update(TMDB_BASE_URL=tmdb_url, TMDB_CACHE='memory', CANDIDATE_INDEX='0', MODEL_LOAD_MODE='lazy')
+    os.environ.setdefault('TMDB_BEARER_TOKEN', 'stub')
+
+    import app
+    from http_responses import ENCODERS
+    from tmdb_client import get_client
+
+    raw_app = app.Flask('raw_relay')
+
+    @raw_app.route('/raw/<path:path>')
+    def relay(path):
+        return app.jsonify(get_client().get(f'/{path}', dict(app.request.args) or None))
+
+    client = app.app.test_client()
+    raw_client = raw_app.test_client()
+
+    def measure(fetch):
+        fetch()
+        samples = []
+        for _ in range(args.requests):
+            start = time.perf_counter()
+            response = fetch()
+            samples.append((time.perf_counter() - start) * 1000)
+        result = summarize(samples)
+        result['status'] = response.status_code
+        result['bytes'] = len(response.get_data())
+        return result
+
+    results = {}
+    print(f"{'variant':<26}{'status':>7}{'bytes':>9}{'p50 ms':>9}{'p95 ms':>9}")
+    for name, (route, tmdb_path, params) in ROUTES.items():
+        query = '&'.join(f'{k}={v}' for k, v in (params or {}).items())
+        variants = {'raw_relay': lambda: raw_client.get(f'/raw{tmdb_path}' + (f'?{query}' if query else ''))}
+        variants['compact'] = lambda: client.get(route)
+        for coding in ENCODERS:
+            variants[f'compact_{coding}'] = lambda coding=coding: client.get(route, headers={'Accept-Encoding': coding})
+        etag = client.get(route, headers={'Accept-Encoding': 'gzip'}).headers['ETag']
+        variants['revalidate_304'] = lambda: client.get(route, headers={'Accept-Encoding': 'gzip', 'If-None-Match': etag})
+
+        for variant, fetch in variants.items():
+            result = measure(fetch)
+            results[f'{name}/{variant}'] = result
+            print(f"{name + '/' + variant:<26}{result['status']:>7}{result['bytes']:>9}"
+                  f"{result['p50_ms']:>9.2f}{result['p95_ms']:>9.2f}")
+
+    stub.shutdown()
+    write_report(args.out, 'tmdb_proxy', vars(args), results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Compare per-worker memory of gunicorn with preloaded vs. lazily loaded models.
+
+Starts gunicorn once per MODEL_LOAD_MODE, sends a few /api/recommend requests
+so every worker has used the models, then reads /proc/<pid>/smaps_rollup of
+the master and each worker. PSS splits shared pages between the processes
+mapping them, so total PSS is the real memory cost of the deployment.
+Linux only.
+
+Usage (from the backend directory):
+    python benchmarks/bench_worker_memory.py --workers 4
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+import requests
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def smaps_rollup(pid):
+    fields = {}
+    with open(f'/proc/{pid}/smaps_rollup') as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 2 and parts[0].endswith(':') and parts[1].isdigit():
+                fields[parts[0][:-1]] = int(parts[1]) / 1024.0
+    return fields
+
+
+def children(pid):
+    with open(f'/proc/{pid}/task/{pid}/children') as f:
+        return [int(child) for child in f.read().split()]
+
+
+def wait_until_up(url, timeout=300):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            requests.get(f'{url}/api/health', timeout=2)
+            return
+        except requests.RequestException:
+            time.sleep(0.5)
+    raise RuntimeError('gunicorn did not come up')
+
+
+def measure(mode, workers, port, image):
+    env = dict(os.environ, MODEL_LOAD_MODE=mode, WEB_CONCURRENCY=str(workers), PORT=str(port))
+    proc = subprocess.Popen([sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'app:app'],
+                            cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        url = f'http://127.0.0.1:{port}'
+        wait_until_up(url)
+        for _ in range(workers * 4):
+            with open(image, 'rb') as f:
+                requests.post(f'{url}/api/recommend', files={'file': f}, timeout=120)
+        time.sleep(1)
+        rows = [('master', smaps_rollup(proc.pid))]
+        rows += [(f'worker {pid}', smaps_rollup(pid)) for pid in children(proc.pid)]
+    finally:
+        proc.terminate()
+        proc.wait(timeout=30)
+
+    print(f"\nMODEL_LOAD_MODE={mode}")
+    print(f"{'process':<16}{'RSS MB':>10}{'PSS MB':>10}{'shared MB':>12}{'private MB':>12}")
+    for name, fields in rows:
+        shared = fields.get('Shared_Clean', 0) + fields.get('Shared_Dirty', 0)
+        private = fields.get('Private_Clean', 0) + fields.get('Private_Dirty', 0)
+        print(f"{name:<16}{fields.get('Rss', 0):>10.1f}{fields.get('Pss', 0):>10.1f}{shared:>12.1f}{private:>12.1f}")
+    total_pss = sum(fields.get('Pss', 0) for _, fields in rows)
+    print(f"{'total PSS':<16}{'':>10}{total_pss:>10.1f}")
+    return total_pss
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--port', type=int, default=5055)
+    parser.add_argument('--image', default=os.path.join(BACKEND_DIR, 'debug_input.jpg'))
+    args = parser.parse_args()
+
+    preload = measure('preload', args.workers, args.port, args.image)
+    lazy = measure('lazy', args.workers, args.port, args.image)
+    print(f"\npreload saves {lazy - preload:.1f} MB PSS across {args.workers} workers")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+End-to-end load generator for /api/recommend.
+
+Without --url it starts the local TMDB stub (--tmdb-latency-ms,
+--tmdb-error-rate) and a gunicorn server running benchmarks/stub_app.py
+(real app, stub models where the real ones are missing) in --mode sync or
+async, then runs each --concurrency level for --duration seconds with
+closed-loop clients posting the image. With --url it only generates load.
+Reports throughput, status counts and p50/p95/p99 latency per level.
+
+Usage (from the backend directory):
+    python benchmarks/load_test.py [image] --concurrency 1 8 32 --duration 20 --out load.json
+    python benchmarks/load_test.py --url http://127.0.0.1:5000 --concurrency 16
+"""
+
+import argparse
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+from collections import Counter
+
+import requests
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import tmdb_stub
+from bench_report import summarize, write_report
+
+SERVER_ARGS = {
+    'sync': ['--pythonpath', 'benchmarks', 'stub_app:app'],
+    'async': ['--pythonpath', 'benchmarks', '-k', 'uvicorn.workers.UvicornWorker', 'stub_app:asgi'],
+}
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def start_server(app_args, port, env):
+    """Launch gunicorn from the backend directory and wait for /api/health"""
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', *app_args],
+        cwd=BACKEND_DIR, env=dict(os.environ, PORT=str(port), **env),
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    deadline = time.time() + 120
+    while time.time() < deadline:
+        try:
+            requests.get(f'http://127.0.0.1:{port}/api/health', timeout=1)
+            return server
+        except requests.RequestException:
+            if server.poll() is not None:
+                sys.exit(f"❌ Server {' '.join(app_args)} exited with code {server.returncode}")
+            time.sleep(0.5)
+    server.terminate()
+    sys.exit(f"❌ Server {' '.join(app_args)} did not become ready")
+
+
+def run_load(url, image, concurrency, duration, analysis_tokens=None):
+    """Closed-loop clients posting image to url; returns (status, latency_ms) per request.
+    With an analysis_tokens dict, client i sends back the X-Analysis-Token its previous
+    response returned (kept in analysis_tokens[i]), like a returning user."""
+    results = []
+    lock = threading.Lock()
+    stop_at = time.perf_counter() + duration
+
+    def client(i):
+        session = requests.Session()
+        while time.perf_counter() < stop_at:
+            headers = {}
+            if analysis_tokens is not None and analysis_tokens.get(i):
+                headers['X-Analysis-Token'] = analysis_tokens[i]
+            start = time.perf_counter()
+            try:
+                response = session.post(url, files={'file': ('face.jpg', image, 'image/jpeg')},
+                                        headers=headers, timeout=60)
+                status = response.status_code
+                if analysis_tokens is not None and response.headers.get('X-Analysis-Token'):
+                    analysis_tokens[i] = response.headers['X-Analysis-Token']
+            except requests.RequestException:
+                status = 'error'
+            with lock:
+                results.append((status, (time.perf_counter() - start) * 1000))
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def level_result(results, duration):
+    """Latency summary over successful requests plus status counts for one load level"""
+    result = summarize([ms for status, ms in results if status == 200], seconds=duration)
+    result['statuses'] = {str(status): count for status, count in Counter(status for status, _ in results).items()}
+    result['requests'] = len(results)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('image', nargs='?', default=os.path.join(BACKEND_DIR, 'debug_input.jpg'))
+    parser.add_argument('--url', help='existing server to load (skips the stub TMDB and server)')
+    parser.add_argument('--mode', choices=list(SERVER_ARGS), default='sync')
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 8, 32])
+    parser.add_argument('--duration', type=float, default=20)
+    parser.add_argument('--tmdb-latency-ms', type=float, default=100)
+    parser.add_argument('--tmdb-error-rate', type=float, default=0.0)
+    parser.add_argument('--candidate-index', choices=['0', '1'], default='0',
+                        help='1 serves recommendations from the local index instead of per-request TMDB calls')
+    parser.add_argument('--out', help='write JSON results here')
+    args = parser.parse_args()
+
+    with open(args.image, 'rb') as f:
+        image = f.read()
+
+    stub = server = None
+    base_url = args.url
+    if base_url is None:
+        stub, tmdb_url = tmdb_stub.start(latency_ms=args.tmdb_latency_ms, error_rate=args.tmdb_error_rate)
+        port = free_port()
+        server = start_server(SERVER_ARGS[args.mode], port, {
+            'WEB_CONCURRENCY': str(args.workers),
+            'TMDB_BASE_URL': tmdb_url,
+            'TMDB_BEARER_TOKEN': 'stub',
+            'TMDB_CACHE': 'off',
+            'CANDIDATE_INDEX': args.candidate_index,
+            'CANDIDATE_INDEX_PATH': '',
+        })
+        base_url = f'http://127.0.0.1:{port}'
+
+    results = {}
+    print(f"{'clients':<9}{'req/s':>8}{'ok':>7}{'non-200':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    try:
+        for concurrency in args.concurrency:
+            result = level_result(run_load(f'{base_url.rstrip("/")}/api/recommend', image, concurrency, args.duration),
+                                  args.duration)
+            results[f'recommend/c{concurrency}'] = result
+            failed = result['requests'] - result['n']
+            p50, p95, p99 = (result[key] or float('nan') for key in ('p50_ms', 'p95_ms', 'p99_ms'))
+            print(f"{concurrency:<9}{result['throughput_per_s']:>8.1f}{result['n']:>7}{failed:>9}{p50:>10.1f}{p95:>10.1f}{p99:>10.1f}")
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+        if stub is not None:
+            stub.shutdown()
+
+    write_report(args.out, 'load', vars(args), results)
+
+
+if __name__ == '__main__':
+    main()
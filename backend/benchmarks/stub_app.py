@@ -0,0 +1,31 @@
+"""
+gunicorn entry point for load tests: the real app, with stub models filling
+in for any model that cannot be loaded (STUB_MODELS=force stubs all of them).
+
+    gunicorn -c gunicorn.conf.py --pythonpath benchmarks stub_app:app      # sync
+    gunicorn -c gunicorn.conf.py --pythonpath benchmarks \
+        -k uvicorn.workers.UvicornWorker stub_app:asgi                     # async
+"""
+
+import os
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+import app as backend
+import stub_models
+
+stubbed = stub_models.install(backend.models, force=os.getenv('STUB_MODELS') == 'force')
+if stubbed:
+    backend.logger.info(f"🧪 Using stub models: {', '.join(stubbed)}")
+
+app = backend.app
+
+
+def __getattr__(name):
+    # Import the ASGI app only when asked for, so the sync mode needs no starlette
+    if name == 'asgi':
+        import asgi_app
+        return asgi_app.app
+    raise AttributeError(name)
@@ -0,0 +1,64 @@
+"""
+Stand-ins for the emotion and age/gender models, for machines without the
+real facial_emotion_detection_model.h5 / model.pkl.
+
+Outputs match the real models' shapes (emotion: (N, 7) probabilities;
+age/gender: [gender (N, 1), age (N, 1)]) and are a deterministic function
+of the input, so runs are repeatable. predict() holds a fixed per-batch plus
+per-item latency with the GIL released, as a TensorFlow forward pass does,
+so throughput numbers keep a realistic shape.
+"""
+
+import time
+
+import numpy as np
+
+
+class StubModel:
+    outputs = 1
+
+    def __init__(self, input_size, batch_ms=1.0, item_ms=2.0, seed=0):
+        self.input_shape = (None, input_size, input_size, 1)
+        self.batch_ms = batch_ms
+        self.item_ms = item_ms
+        self._projection = np.random.default_rng(seed).normal(size=(input_size * input_size, self.outputs)).astype('float32')
+
+    def _features(self, batch):
+        time.sleep((self.batch_ms + self.item_ms * len(batch)) / 1000.0)
+        return np.asarray(batch, dtype='float32').reshape(len(batch), -1) @ self._projection / self.input_shape[1]
+
+
+class EmotionStub(StubModel):
+    outputs = 7
+
+    def predict(self, batch):
+        logits = self._features(batch)
+        exp = np.exp(logits - logits.max(axis=1, keepdims=True))
+        return exp / exp.sum(axis=1, keepdims=True)
+
+
+class AgeGenderStub(StubModel):
+    outputs = 2
+
+    def predict(self, batch):
+        features = self._features(batch)
+        gender = 1.0 / (1.0 + np.exp(-features[:, :1]))
+        age = 8.0 + 60.0 / (1.0 + np.exp(-features[:, 1:]))
+        return [gender, age]
+
+
+def stub_models(emotion_ms=2.0, age_gender_ms=6.0):
+    return {
+        'emotion': EmotionStub(48, item_ms=emotion_ms, seed=1),
+        'age_gender': AgeGenderStub(128, item_ms=age_gender_ms, seed=2),
+    }
+
+
+def install(registry, force=False, **options):
+    """Register stubs for models the registry cannot load (all of them if force); returns the stubbed names"""
+    stubbed = []
+    for name, model in stub_models(**options).items():
+        if force or registry.get(name) is None:
+            registry.register(name, model, source='stub')
+            stubbed.append(name)
+    return stubbed
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the TMDB API with configurable latency and error rate.
+
+Answers every GET with a deterministic page of 20 movies (filtered to the
+requested with_genres, if any), after sleeping --latency-ms, so load tests
+exercise the real TMDB client without network access or rate limits. A
+--error-rate fraction of requests fails instead, alternating 500 and 429,
+which the client retries. Connections are kept alive (HTTP/1.1), so
+clients that pool connections reuse them. Point the backend at it with
+TMDB_BASE_URL=http://127.0.0.1:<port>.
+
+Usage (from the backend directory):
+    python benchmarks/tmdb_stub.py --port 8765 --latency-ms 200 --error-rate 0.05
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+GENRE_IDS = [12, 16, 18, 27, 28, 35, 36, 53, 80, 99, 878, 9648, 10749, 10751]
+
+
+def stub_movie(movie_id, genre_id=None):
+    genre_id = genre_id or GENRE_IDS[movie_id % len(GENRE_IDS)]
+    return {
+        'id': movie_id,
+        'title': f'Stub Movie {movie_id}',
+        'overview': f'A stub movie in genre {genre_id}.',
+        'vote_average': round(5 + (movie_id * 37 % 50) / 10, 1),
+        'popularity': float(1000 - movie_id % 1000),
+        'release_date': f'{1980 + movie_id % 45}-01-01',
+        'poster_path': f'/stub{movie_id}.jpg',
+        'genre_ids': [genre_id],
+        'backdrop_path': f'/stub{movie_id}-backdrop.jpg',
+        'vote_count': movie_id * 13 % 5000,
+        'original_title': f'Stub Movie {movie_id}',
+        'original_language': 'en',
+        'adult': False,
+        'video': False,
+    }
+
+
+def stub_page(path, params):
+    genre_id = int(params['with_genres'][0].split(',')[0]) if 'with_genres' in params else None
+    page = int(params.get('page', ['1'])[0])
+    offset = (genre_id or 0) * 1000 + (page - 1) * 20
+    return {
+        'page': page,
+        'results': [stub_movie(offset + i, genre_id) for i in range(20)],
+        'total_pages': 500,
+        'total_results': 10000,
+    }
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    latency = 0.0
+    error_rate = 0.0
+    requests = 0
+    errors = 0
+    # Statuses to answer with, in order, before serving pages (tests script failures with these)
+    statuses = deque()
+    # (host, port) of every client connection seen
+    connections = set()
+    _lock = threading.Lock()
+
+    def do_GET(self):
+        with StubHandler._lock:
+            StubHandler.requests += 1
+            StubHandler.connections.add(self.client_address)
+            status = StubHandler.statuses.popleft() if StubHandler.statuses else None
+        time.sleep(self.latency)
+        if status is None and random.random() < self.error_rate:
+            with StubHandler._lock:
+                StubHandler.errors += 1
+                status = 429 if StubHandler.errors % 2 else 500
+        if status is not None:
+            self.send_response(status)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        url = urlparse(self.path)
+        body = json.dumps(stub_page(url.path, parse_qs(url.query))).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start(port=0, latency_ms=200, error_rate=0.0, statuses=()):
+    """Serve the stub from a background thread; returns (server, base_url).
+
+    statuses are answered first, one per request, before normal pages.
+    Request counters are reset on every start.
+    """
+    StubHandler.latency = latency_ms / 1000.0
+    StubHandler.error_rate = error_rate
+    StubHandler.requests = StubHandler.errors = 0
+    StubHandler.statuses = deque(statuses)
+    StubHandler.connections = set()
+    server = ThreadingHTTPServer(('127.0.0.1', port), StubHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name='tmdb-stub', daemon=True).start()
+    return server, f'http://127.0.0.1:{server.server_address[1]}'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency-ms', type=float, default=200)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    args = parser.parse_args()
+
+    server, base_url = start(args.port, args.latency_ms, args.error_rate)
+    print(f"TMDB stub on {base_url} ({args.latency_ms:.0f} ms latency, {args.error_rate:.0%} errors)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,231 @@
+import json
+import os
+import threading
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+POSTER_BASE_URL = 'https://image.tmdb.org/t/p/w500'
+
+
+def movie_record(movie):
+    """Reduce a raw TMDB movie result to the fields recommendations are built from.
+
+    TMDB sends null for some fields; those get the same defaults as missing ones.
+    """
+    rating = movie.get('vote_average')
+    return {
+        'id': movie.get('id'),
+        'title': movie.get('title') or 'Unknown',
+        'overview': movie.get('overview') or 'No description available',
+        'rating': 7.0 if rating is None else rating,
+        'popularity': movie.get('popularity') or 0.0,
+        'release_date': movie.get('release_date') or '2023-01-01',
+        'poster_url': f"{POSTER_BASE_URL}{movie['poster_path']}" if movie.get('poster_path') else None,
+        'genre_ids': movie.get('genre_ids') or []
+    }
+
+
+class CandidateIndex:
+    """Immutable snapshot mapping genre id -> movie records ranked by TMDB popularity"""
+
+    def __init__(self, genres=None, built_at=None):
+        self.genres = genres or {}
+        self.built_at = built_at
+
+    def top(self, genre_id, k):
+        return self.genres.get(genre_id, [])[:k]
+
+    def covers(self, genre_ids):
+        return all(self.genres.get(genre_id) for genre_id in genre_ids)
+
+    def to_json(self):
+        return {
+            'built_at': self.built_at,
+            'genres': {str(genre_id): records for genre_id, records in self.genres.items()}
+        }
+
+    @classmethod
+    def from_json(cls, data):
+        return cls({int(genre_id): records for genre_id, records in data['genres'].items()}, data['built_at'])
+
+    def stats(self):
+        return {
+            'genres': len(self.genres),
+            'movies': sum(len(records) for records in self.genres.values()),
+            'built_at': self.built_at,
+            'age_seconds': round(time.time() - self.built_at, 1) if self.built_at else None
+        }
+
+
+class TMDBPageSource:
+    """Fetches discover pages from TMDB through the shared client, all pages concurrently"""
+
+    def __init__(self, get_client):
+        # Resolved per fetch so a forked worker uses its own client, not the parent's
+        self.get_client = get_client
+
+    def fetch(self, genre_ids, pages):
+        client = self.get_client()
+        pending = {
+            (genre_id, page): client.submit('/discover/movie', {
+                'with_genres': genre_id,
+                'sort_by': 'popularity.desc',
+                'page': page
+            })
+            for genre_id in genre_ids for page in range(1, pages + 1)
+        }
+        results = {}
+        for key, future in pending.items():
+            try:
+                results[key] = future.result().get('results', [])
+            except Exception as e:
+                logger.error(f"❌ Candidate index fetch failed for genre {key[0]} page {key[1]}: {str(e)}")
+        return results
+
+
+class FixturePageSource:
+    """Reads discover pages from <fixture_dir>/genre_<id>_page_<n>.json so the index builds offline"""
+
+    def __init__(self, fixture_dir):
+        self.fixture_dir = fixture_dir
+
+    def fetch(self, genre_ids, pages):
+        results = {}
+        for genre_id in genre_ids:
+            for page in range(1, pages + 1):
+                path = os.path.join(self.fixture_dir, f'genre_{genre_id}_page_{page}.json')
+                if os.path.exists(path):
+                    with open(path) as f:
+                        results[(genre_id, page)] = json.load(f).get('results', [])
+        return results
+
+
+def build_index(source, genre_ids, pages, previous=None):
+    """Build a CandidateIndex, keeping the previous records for any genre that failed to fetch"""
+    fetched = source.fetch(genre_ids, pages)
+    genres = {}
+    for genre_id in genre_ids:
+        seen = set()
+        records = []
+        for page in range(1, pages + 1):
+            for movie in fetched.get((genre_id, page), []):
+                if movie.get('id') in seen:
+                    continue
+                seen.add(movie.get('id'))
+                records.append(movie_record(movie))
+        if records:
+            genres[genre_id] = records
+        elif previous is not None and previous.genres.get(genre_id):
+            genres[genre_id] = previous.genres[genre_id]
+    return CandidateIndex(genres, time.time())
+
+
+class CandidateRefresher:
+    """Keeps a CandidateIndex current in a background thread.
+
+    Every worker loads the snapshot file, but only the worker holding the
+    snapshot lock talks to TMDB; the others pick up its snapshot when the
+    file changes. The published index is swapped in with a single reference
+    assignment, so readers never see a half-built index.
+    """
+
+    def __init__(self, source, genre_ids, pages=3, interval=1800, snapshot_path=None):
+        self.source = source
+        self.genre_ids = sorted(set(genre_ids))
+        self.pages = pages
+        self.interval = interval
+        self.snapshot_path = snapshot_path
+        self.index = CandidateIndex()
+        self.refreshes = 0
+        self.last_error = None
+        self._snapshot_mtime = None
+        self._lock_file = None
+        self._thread = None
+        self._start_lock = threading.Lock()
+
+    def ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._load_snapshot()
+                self._thread = threading.Thread(target=self._run, name='candidate-index', daemon=True)
+                self._thread.start()
+
+    def refresh(self):
+        """Rebuild the index now and publish it (and its snapshot, if configured)"""
+        start = time.perf_counter()
+        index = build_index(self.source, self.genre_ids, self.pages, previous=self.index)
+        self.index = index
+        self.refreshes += 1
+        if self.snapshot_path:
+            self._write_snapshot(index)
+        logger.info(f"✅ Candidate index built: {index.stats()['movies']} movies in "
+                    f"{len(index.genres)} genres ({(time.perf_counter() - start) * 1000:.0f} ms)")
+        return index
+
+    def stats(self):
+        stats = self.index.stats()
+        stats.update({
+            'refreshes': self.refreshes,
+            'refresh_interval_seconds': self.interval,
+            'owner': self._lock_file is not None,
+            'last_error': self.last_error
+        })
+        return stats
+
+    def _run(self):
+        while True:
+            try:
+                if self._is_owner():
+                    built_at = self.index.built_at
+                    # Retry early while any genre is still missing (e.g. TMDB was down)
+                    if (built_at is None or time.time() - built_at >= self.interval
+                            or not self.index.covers(self.genre_ids)):
+                        self.refresh()
+                else:
+                    self._load_snapshot()
+                self.last_error = None
+            except Exception as e:
+                self.last_error = str(e)
+                logger.error(f"❌ Candidate index refresh failed: {str(e)}")
+            time.sleep(min(self.interval, 30))
+
+    def _is_owner(self):
+        if not self.snapshot_path:
+            return True
+        if self._lock_file is None:
+            try:
+                import fcntl
+            except ImportError:
+                return True
+            lock_file = open(f'{self.snapshot_path}.lock', 'w')
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                lock_file.close()
+                return False
+            self._lock_file = lock_file
+        return True
+
+    def _write_snapshot(self, index):
+        tmp_path = f'{self.snapshot_path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(index.to_json(), f)
+        os.replace(tmp_path, self.snapshot_path)
+        self._snapshot_mtime = os.path.getmtime(self.snapshot_path)
+
+    def _load_snapshot(self):
+        if not self.snapshot_path or not os.path.exists(self.snapshot_path):
+            return
+        mtime = os.path.getmtime(self.snapshot_path)
+        if mtime == self._snapshot_mtime:
+            return
+        try:
+            with open(self.snapshot_path) as f:
+                self.index = CandidateIndex.from_json(json.load(f))
+            self._snapshot_mtime = mtime
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"⚠️ Could not load candidate index snapshot: {str(e)}")
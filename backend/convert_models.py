@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Convert the Keras models into compact inference artifacts for inference_backends.py.
+
+Usage (from the backend directory):
+    python convert_models.py tflite [--quantize none|dynamic|float16|int8] [--calibration-dir DIR]
+    python convert_models.py onnx
+
+Artifacts are written to compiled_models/<model>.<tflite|onnx> and selected at
+runtime with INFERENCE_BACKEND=tflite or INFERENCE_BACKEND=onnx.
+"""
+
+import argparse
+import glob
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+from model_registry import ModelRegistry, MODEL_FILES
+from inference_backends import artifact_path, write_sidecar, TFLiteBackend, ONNXBackend
+from face_detection import create_detector
+
+IMAGE_PATTERNS = ('*.jpg', '*.jpeg', '*.png')
+
+
+def load_face_crops(image_dir, limit=None):
+    """Largest-face grayscale crops from every image in image_dir (whole image if no face is found)"""
+    paths = sorted(p for pattern in IMAGE_PATTERNS for p in glob.glob(os.path.join(image_dir, pattern)))
+    detector = create_detector()
+    crops = []
+    for path in paths[:limit]:
+        gray = cv2.imread(path, cv2.IMREAD_GRAYSCALE)
+        if gray is None:
+            continue
+        faces = detector.detect(gray)
+        if len(faces):
+            x, y, w, h = max(faces, key=lambda f: f[2] * f[3])
+            gray = gray[y:y + h, x:x + w]
+        crops.append(gray)
+    return crops
+
+
+def face_batch(crops, size):
+    batch = np.empty((len(crops), size, size, 1), dtype='float32')
+    for i, crop in enumerate(crops):
+        batch[i, :, :, 0] = cv2.resize(crop, (size, size))
+    return batch / 255.0
+
+
+def input_size(model):
+    return int(model.input_shape[1])
+
+
+def output_order(keras_outputs, backend_outputs):
+    """For each Keras output, the index of the backend output that matches it"""
+    if not isinstance(keras_outputs, list):
+        keras_outputs = [keras_outputs]
+    order = []
+    for expected in keras_outputs:
+        candidates = [
+            (float(np.abs(actual - expected).mean()), i)
+            for i, actual in enumerate(backend_outputs)
+            if i not in order and actual.shape == expected.shape
+        ]
+        order.append(min(candidates)[1])
+    return order
+
+
+def convert_tflite(model, path, quantize, calibration):
+    import tensorflow as tf
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    if quantize in ('dynamic', 'float16', 'int8'):
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    if quantize == 'float16':
+        converter.target_spec.supported_types = [tf.float16]
+    elif quantize == 'int8':
+        def representative_dataset():
+            for sample in calibration:
+                yield [sample[np.newaxis]]
+        converter.representative_dataset = representative_dataset
+        converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+    with open(path, 'wb') as f:
+        f.write(converter.convert())
+
+
+def convert_onnx(model, path):
+    import tensorflow as tf
+    import tf2onnx
+    size = input_size(model)
+    spec = [tf.TensorSpec((None, size, size, 1), tf.float32, name='input')]
+    tf2onnx.convert.from_keras(model, input_signature=spec, output_path=path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('format', choices=['tflite', 'onnx'])
+    parser.add_argument('--quantize', choices=['none', 'dynamic', 'float16', 'int8'], default='none')
+    parser.add_argument('--calibration-dir', default='.', help='face images for int8 calibration')
+    parser.add_argument('--calibration-samples', type=int, default=200)
+    parser.add_argument('--out', default='compiled_models')
+    args = parser.parse_args()
+
+    registry = ModelRegistry('.')
+    os.makedirs(args.out, exist_ok=True)
+    crops = load_face_crops(args.calibration_dir, args.calibration_samples)
+    if args.quantize == 'int8' and not crops:
+        sys.exit(f"❌ int8 quantization needs calibration images in {args.calibration_dir}")
+
+    for name in MODEL_FILES:
+        model = registry.get(name)
+        if model is None or not hasattr(model, 'input_shape'):
+            print(f"⚠️  Skipping {name}: no Keras model available")
+            continue
+
+        size = input_size(model)
+        calibration = face_batch(crops, size) if crops else np.random.rand(8, size, size, 1).astype('float32')
+        path = artifact_path(args.out, name, args.format)
+
+        start = time.perf_counter()
+        if args.format == 'tflite':
+            convert_tflite(model, path, args.quantize, calibration)
+            backend = TFLiteBackend(path)
+        else:
+            convert_onnx(model, path)
+            backend = ONNXBackend(path)
+
+        # Record how backend outputs map onto Keras outputs so predict() matches model.predict
+        sample = calibration[:8]
+        backend.metadata = {}
+        raw = backend.predict(sample)
+        raw = raw if isinstance(raw, list) else [raw]
+        write_sidecar(path, {
+            'model': name,
+            'format': args.format,
+            'quantize': args.quantize if args.format == 'tflite' else 'none',
+            'input_size': size,
+            'output_order': output_order(model.predict(sample), raw),
+        })
+        print(f"✅ {name}: {path} ({os.path.getsize(path) / 1e6:.1f} MB, {time.perf_counter() - start:.1f}s)")
+
+
+if __name__ == '__main__':
+    main()
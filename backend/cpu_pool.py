@@ -0,0 +1,59 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from inference_batcher import LatencyWindow
+
+
+class Overloaded(Exception):
+    """Raised instead of queueing when a CPUPool already has max_pending calls in flight"""
+
+
+class CPUPool:
+    """Bounded thread pool for CPU-bound work (OpenCV, TensorFlow) awaited from asyncio.
+
+    Both libraries release the GIL in their heavy loops, so threads give real
+    parallelism while sharing one copy of the models. At most max_pending
+    calls may be running or queued; beyond that run() raises Overloaded so
+    the caller can shed load instead of letting latency grow without bound.
+    """
+
+    def __init__(self, max_workers=2, max_pending=16, name='cpu'):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.queue_wait_ms = LatencyWindow()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers, thread_name_prefix=name)
+
+    async def run(self, fn, *args):
+        with self._lock:
+            if self.pending >= self.max_pending:
+                self.rejected += 1
+                raise Overloaded(f'{self.pending} calls already pending')
+            self.pending += 1
+        queued_at = time.perf_counter()
+
+        def timed():
+            self.queue_wait_ms.add((time.perf_counter() - queued_at) * 1000)
+            return fn(*args)
+
+        try:
+            return await asyncio.wrap_future(self._executor.submit(timed))
+        finally:
+            with self._lock:
+                self.pending -= 1
+                self.completed += 1
+
+    def stats(self):
+        return {
+            'workers': self.max_workers,
+            'max_pending': self.max_pending,
+            'pending': self.pending,
+            'completed': self.completed,
+            'rejected': self.rejected,
+            'queue_wait_ms': self.queue_wait_ms.percentiles(50, 99),
+        }
@@ -0,0 +1,155 @@
+"""
+Face detection behind a single interface.
+
+Detectors are built once per thread instead of once per request (OpenCV
+detectors are not safe to share between threads), and FaceDetector runs
+them on a copy of the image downscaled to a bounded working resolution,
+mapping the boxes back to full-resolution coordinates.
+
+Backends:
+- haar:  OpenCV's bundled frontal-face Haar cascade (default)
+- yunet: OpenCV FaceDetectorYN with face_detection_yunet_2023mar.onnx
+- ssd:   OpenCV DNN res10 SSD (deploy.prototxt + res10_300x300_ssd_iter_140000.caffemodel)
+The DNN model files are read from FACE_DETECTOR_MODEL_DIR.
+"""
+
+import os
+import threading
+import logging
+
+import numpy as np
+
+from lazy_imports import lazy_import
+
+# OpenCV is imported on first use, keeping it off the startup path
+cv2 = lazy_import('cv2')
+
+logger = logging.getLogger(__name__)
+
+YUNET_MODEL = 'face_detection_yunet_2023mar.onnx'
+SSD_PROTOTXT = 'deploy.prototxt'
+SSD_WEIGHTS = 'res10_300x300_ssd_iter_140000.caffemodel'
+
+_NO_FACES = np.zeros((0, 4), dtype='int32')
+
+
+class HaarDetector:
+    name = 'haar'
+
+    def __init__(self, scale_factor=1.3, min_neighbors=5):
+        self.scale_factor = scale_factor
+        self.min_neighbors = min_neighbors
+        self._local = threading.local()
+
+    def detect(self, gray):
+        cascade = getattr(self._local, 'cascade', None)
+        if cascade is None:
+            cascade = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
+            self._local.cascade = cascade
+        faces = cascade.detectMultiScale(gray, self.scale_factor, self.min_neighbors)
+        return np.asarray(faces, dtype='int32').reshape(-1, 4)
+
+
+class YuNetDetector:
+    name = 'yunet'
+
+    def __init__(self, model_path, score_threshold=0.8):
+        if not os.path.exists(model_path):
+            raise FileNotFoundError(model_path)
+        self.model_path = model_path
+        self.score_threshold = score_threshold
+        self._local = threading.local()
+
+    def detect(self, gray):
+        height, width = gray.shape[:2]
+        detector = getattr(self._local, 'detector', None)
+        if detector is None:
+            detector = cv2.FaceDetectorYN.create(self.model_path, '', (width, height), self.score_threshold)
+            self._local.detector = detector
+        detector.setInputSize((width, height))
+        _, faces = detector.detect(cv2.cvtColor(gray, cv2.COLOR_GRAY2BGR))
+        if faces is None:
+            return _NO_FACES
+        return _clip_boxes(faces[:, :4], width, height)
+
+
+class SSDDetector:
+    name = 'ssd'
+
+    def __init__(self, prototxt_path, weights_path, score_threshold=0.6):
+        for path in (prototxt_path, weights_path):
+            if not os.path.exists(path):
+                raise FileNotFoundError(path)
+        self.prototxt_path = prototxt_path
+        self.weights_path = weights_path
+        self.score_threshold = score_threshold
+        self._local = threading.local()
+
+    def detect(self, gray):
+        net = getattr(self._local, 'net', None)
+        if net is None:
+            net = cv2.dnn.readNetFromCaffe(self.prototxt_path, self.weights_path)
+            self._local.net = net
+        height, width = gray.shape[:2]
+        blob = cv2.dnn.blobFromImage(cv2.cvtColor(gray, cv2.COLOR_GRAY2BGR), 1.0, (300, 300), (104.0, 177.0, 123.0))
+        net.setInput(blob)
+        detections = net.forward()[0, 0]
+        detections = detections[detections[:, 2] >= self.score_threshold]
+        if len(detections) == 0:
+            return _NO_FACES
+        corners = detections[:, 3:7] * np.array([width, height, width, height], dtype='float32')
+        boxes = np.column_stack([corners[:, :2], corners[:, 2:] - corners[:, :2]])
+        return _clip_boxes(boxes, width, height)
+
+
+def _clip_boxes(boxes, width, height):
+    boxes = np.round(boxes).astype('int32')
+    boxes[:, 0] = np.clip(boxes[:, 0], 0, width - 1)
+    boxes[:, 1] = np.clip(boxes[:, 1], 0, height - 1)
+    boxes[:, 2] = np.minimum(boxes[:, 2], width - boxes[:, 0])
+    boxes[:, 3] = np.minimum(boxes[:, 3], height - boxes[:, 1])
+    return boxes[(boxes[:, 2] > 0) & (boxes[:, 3] > 0)]
+
+
+class FaceDetector:
+    """Runs a backend on a copy downscaled to at most max_side pixels and maps boxes back"""
+
+    def __init__(self, backend, max_side=640):
+        self.backend = backend
+        self.max_side = max_side
+
+    @property
+    def name(self):
+        return self.backend.name
+
+    def detect(self, gray):
+        """Return an (N, 4) int array of (x, y, w, h) face boxes in gray's coordinates"""
+        height, width = gray.shape[:2]
+        scale = 1.0
+        if self.max_side and max(height, width) > self.max_side:
+            scale = self.max_side / float(max(height, width))
+            gray = cv2.resize(gray, (round(width * scale), round(height * scale)), interpolation=cv2.INTER_AREA)
+        boxes = self.backend.detect(gray)
+        if scale != 1.0 and len(boxes):
+            boxes = _clip_boxes(boxes / scale, width, height)
+        return boxes
+
+
+def create_backend(kind='haar', model_dir='face_models'):
+    if kind == 'yunet':
+        return YuNetDetector(os.path.join(model_dir, YUNET_MODEL))
+    if kind == 'ssd':
+        return SSDDetector(os.path.join(model_dir, SSD_PROTOTXT), os.path.join(model_dir, SSD_WEIGHTS))
+    if kind != 'haar':
+        raise ValueError(f"Unknown face detector '{kind}', expected haar, yunet or ssd")
+    return HaarDetector()
+
+
+def create_detector(kind='haar', model_dir='face_models', max_side=640):
+    """FaceDetector for kind, falling back to Haar if the DNN model files are missing"""
+    try:
+        backend = create_backend(kind, model_dir)
+    except (FileNotFoundError, cv2.error) as e:
+        logger.warning(f"⚠️ {kind} face detector unavailable ({str(e)}), using Haar cascade")
+        backend = HaarDetector()
+    return FaceDetector(backend, max_side)
@@ -0,0 +1,35 @@
+import numpy as np
+
+
+def face_weights(boxes):
+    """Share of the group each face gets: its area over the total, so nearer faces count more"""
+    areas = np.array([w * h for _, _, w, h in boxes], dtype='float64')
+    return areas / areas.sum()
+
+
+def group_profile(faces, boxes, emotion_probs, labels):
+    """Combine per-face analyses into one profile that drives a single recommendation query.
+
+    The emotion is the argmax of the face-area-weighted mix of the emotion
+    probability vectors (one-hot per face when the model gave none), the age
+    is the youngest face's so the strictest age filter applies, and gender
+    is 'mixed' when the faces disagree.
+    """
+    weights = face_weights(boxes)
+    if emotion_probs is None:
+        emotion_probs = np.zeros((len(faces), len(labels)))
+        for i, face in enumerate(faces):
+            if face['emotion'] in labels:
+                emotion_probs[i, labels.index(face['emotion'])] = face['confidence']
+    mix = weights @ np.asarray(emotion_probs, dtype='float64')
+    top = int(np.argmax(mix))
+
+    genders = {face['gender'] for face in faces} - {'unknown'}
+    return {
+        'emotion': labels[top],
+        'age': min(face['age'] for face in faces),
+        'gender': genders.pop() if len(genders) == 1 else ('mixed' if genders else 'unknown'),
+        'confidence': round(float(mix[top]), 4),
+        'emotion_mix': {label: round(float(p), 4) for label, p in zip(labels, mix)},
+        'faces': len(faces)
+    }
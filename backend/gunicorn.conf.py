@@ -0,0 +1,28 @@
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '5000')}"
+workers = int(os.getenv('WEB_CONCURRENCY', '2'))
+threads = int(os.getenv('GUNICORN_THREADS', '1'))
+timeout = int(os.getenv('GUNICORN_TIMEOUT', '60'))
+
+# Import app.py (and, in MODEL_LOAD_MODE=preload, load the models) once in the
+# master so workers share the model pages copy-on-write instead of each
+# loading their own copy
+preload_app = os.getenv('MODEL_LOAD_MODE', 'preload') == 'preload'
+
+
+def when_ready(server):
+    from model_registry import process_memory
+    server.log.info(f"Master memory after preload: {process_memory()}")
+
+
+def post_fork(server, worker):
+    from model_registry import process_memory
+    server.log.info(f"Worker {worker.pid} memory after fork: {process_memory()}")
+
+
+def post_worker_init(worker):
+    # Warm models, the face detector and the candidate index in the background;
+    # /api/ready reports 503 until this worker is done
+    import app
+    app.warmup.ensure_started()
@@ -0,0 +1,64 @@
+"""
+Compact, cacheable JSON responses.
+
+json_response() serializes without whitespace, tags the body with a strong
+ETag and answers a matching If-None-Match with an empty 304. Bodies above
+COMPRESS_MIN_BYTES are brotli- (when the brotli package is installed) or
+gzip-compressed according to Accept-Encoding; each encoding gets its own
+ETag so caches never confuse the representations.
+"""
+
+import gzip
+import hashlib
+import json
+
+from flask import Response, request
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESS_MIN_BYTES = 512
+
+
+def _encoders():
+    encoders = {}
+    if brotli is not None:
+        encoders['br'] = lambda body: brotli.compress(body, quality=5)
+    encoders['gzip'] = lambda body: gzip.compress(body, compresslevel=6)
+    return encoders
+
+
+ENCODERS = _encoders()
+
+
+def negotiate_encoding(accept_encoding):
+    """Preferred supported content coding from an Accept-Encoding header, or None"""
+    for coding in ENCODERS:
+        if accept_encoding[coding] > 0:
+            return coding
+    return None
+
+
+def json_response(payload, max_age=0, status=200):
+    body = json.dumps(payload, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+    digest = hashlib.blake2b(body, digest_size=12).hexdigest()
+    coding = negotiate_encoding(request.accept_encodings) if len(body) >= COMPRESS_MIN_BYTES else None
+    etag = f'{digest}-{coding}' if coding else digest
+
+    headers = {
+        'Cache-Control': f'public, max-age={max_age}' if max_age else 'no-cache',
+        'Vary': 'Accept-Encoding',
+    }
+    if request.if_none_match.contains(etag):
+        response = Response(status=304, headers=headers)
+        response.set_etag(etag)
+        return response
+
+    if coding:
+        body = ENCODERS[coding](body)
+        headers['Content-Encoding'] = coding
+    response = Response(body, status=status, mimetype='application/json', headers=headers)
+    response.set_etag(etag)
+    return response
@@ -0,0 +1,108 @@
+import os
+import queue
+import random
+import struct
+import threading
+import time
+import logging
+
+import numpy as np
+
+from lazy_imports import lazy_import
+
+# OpenCV is imported on first use, keeping it off the startup path
+cv2 = lazy_import('cv2')
+
+logger = logging.getLogger(__name__)
+
+# JPEG start-of-frame markers that carry the image dimensions
+_SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+_REDUCED_GRAYSCALE = {1: 'IMREAD_GRAYSCALE', 2: 'IMREAD_REDUCED_GRAYSCALE_2',
+                      4: 'IMREAD_REDUCED_GRAYSCALE_4', 8: 'IMREAD_REDUCED_GRAYSCALE_8'}
+
+
+def jpeg_size(data):
+    """(width, height) from a JPEG header without decoding it, or None for other formats"""
+    if data[:2] != b'\xff\xd8':
+        return None
+    offset = 2
+    length = len(data)
+    while offset + 4 <= length:
+        if data[offset] != 0xFF:
+            return None
+        marker = data[offset + 1]
+        if marker == 0xFF:
+            offset += 1
+            continue
+        if marker in _SOF_MARKERS:
+            if offset + 9 > length:
+                return None
+            height, width = struct.unpack('>HH', data[offset + 5:offset + 9])
+            return width, height
+        segment_length = struct.unpack('>H', data[offset + 2:offset + 4])[0]
+        offset += 2 + segment_length
+    return None
+
+
+def reduction_factor(data, max_side):
+    """Largest JPEG DCT scale (1, 2, 4 or 8) that keeps the longer side >= max_side"""
+    size = jpeg_size(data) if max_side else None
+    if size is None:
+        return 1
+    factor = 1
+    while factor < 8 and max(size) / (factor * 2) >= max_side:
+        factor *= 2
+    return factor
+
+
+def decode_grayscale(data, max_side=None):
+    """Decode upload bytes straight to grayscale, letting libjpeg downscale large JPEGs.
+
+    Returns (gray_image, reduction_factor); gray_image is None if the bytes
+    are not a readable image.
+    """
+    factor = reduction_factor(data, max_side)
+    buffer = np.frombuffer(data, dtype=np.uint8)
+    return cv2.imdecode(buffer, getattr(cv2, _REDUCED_GRAYSCALE[factor])), factor
+
+
+class DebugSink:
+    """Opt-in, sampled dump of raw uploads, written by a background thread.
+
+    Requests only pay for a random draw and a non-blocking queue put; when
+    the queue is full the sample is dropped rather than slowing the request.
+    Every dump gets a unique name, so concurrent workers never overwrite
+    each other.
+    """
+
+    def __init__(self, directory, sample_rate=0.01, max_pending=32):
+        self.directory = directory
+        self.sample_rate = sample_rate
+        self.dumped = 0
+        self.dropped = 0
+        self._counter = 0
+        self._queue = queue.Queue(maxsize=max_pending)
+        os.makedirs(directory, exist_ok=True)
+        self._thread = threading.Thread(target=self._run, name='debug-sink', daemon=True)
+        self._thread.start()
+
+    def maybe_dump(self, data):
+        if random.random() >= self.sample_rate:
+            return
+        try:
+            self._queue.put_nowait(data)
+        except queue.Full:
+            self.dropped += 1
+
+    def _run(self):
+        while True:
+            data = self._queue.get()
+            self._counter += 1
+            path = os.path.join(self.directory, f'upload-{int(time.time() * 1000)}-{os.getpid()}-{self._counter}.jpg')
+            try:
+                with open(path, 'wb') as f:
+                    f.write(data)
+                self.dumped += 1
+            except OSError as e:
+                logger.warning(f"⚠️ Debug dump failed: {str(e)}")
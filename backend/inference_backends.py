@@ -0,0 +1,141 @@
+"""
+Pluggable inference backends for the emotion and age/gender models.
+
+Every backend exposes predict(batch) with the same return shape as Keras
+model.predict: one array for single-output models and a list of arrays for
+multi-output models. Compiled artifacts are produced by convert_models.py
+and live next to a <artifact>.json sidecar recording the Keras output order.
+"""
+
+import json
+import os
+import threading
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+BACKENDS = ('keras', 'tflite', 'onnx')
+
+
+def read_sidecar(artifact_path):
+    sidecar = f'{artifact_path}.json'
+    if os.path.exists(sidecar):
+        with open(sidecar) as f:
+            return json.load(f)
+    return {}
+
+
+def write_sidecar(artifact_path, metadata):
+    with open(f'{artifact_path}.json', 'w') as f:
+        json.dump(metadata, f, indent=2)
+
+
+def _ordered(outputs, output_order):
+    """Reorder backend outputs into Keras output order; unwrap single outputs"""
+    if output_order:
+        outputs = [outputs[i] for i in output_order]
+    return outputs[0] if len(outputs) == 1 else outputs
+
+
+class KerasBackend:
+    name = 'keras'
+
+    def __init__(self, model):
+        self.model = model
+
+    def predict(self, batch):
+        return self.model.predict(batch)
+
+
+class TFLiteBackend:
+    """TFLite interpreter per thread (interpreters are not thread-safe), resized to each batch size"""
+
+    name = 'tflite'
+
+    def __init__(self, path):
+        self.path = path
+        self.metadata = read_sidecar(path)
+        with open(path, 'rb') as f:
+            self._model_content = f.read()
+        self._local = threading.local()
+        try:
+            from tflite_runtime.interpreter import Interpreter
+        except ImportError:
+            from tensorflow.lite import Interpreter
+        self._interpreter_class = Interpreter
+        self.num_threads = int(os.getenv('TFLITE_NUM_THREADS', '1'))
+
+    def _interpreter(self, batch_size):
+        interpreter = getattr(self._local, 'interpreter', None)
+        if interpreter is None:
+            interpreter = self._interpreter_class(model_content=self._model_content, num_threads=self.num_threads)
+            self._local.interpreter = interpreter
+            self._local.batch_size = None
+        if self._local.batch_size != batch_size:
+            input_detail = interpreter.get_input_details()[0]
+            interpreter.resize_tensor_input(input_detail['index'], [batch_size, *input_detail['shape'][1:]])
+            interpreter.allocate_tensors()
+            self._local.batch_size = batch_size
+        return interpreter
+
+    def predict(self, batch):
+        interpreter = self._interpreter(len(batch))
+        input_detail = interpreter.get_input_details()[0]
+        if input_detail['dtype'] in (np.int8, np.uint8):
+            scale, zero_point = input_detail['quantization']
+            batch = np.clip(np.round(batch / scale + zero_point),
+                            np.iinfo(input_detail['dtype']).min, np.iinfo(input_detail['dtype']).max)
+        interpreter.set_tensor(input_detail['index'], batch.astype(input_detail['dtype']))
+        interpreter.invoke()
+
+        outputs = []
+        for detail in interpreter.get_output_details():
+            output = interpreter.get_tensor(detail['index'])
+            if detail['dtype'] in (np.int8, np.uint8):
+                scale, zero_point = detail['quantization']
+                output = (output.astype('float32') - zero_point) * scale
+            outputs.append(output)
+        return _ordered(outputs, self.metadata.get('output_order'))
+
+
+class ONNXBackend:
+    name = 'onnx'
+
+    def __init__(self, path):
+        import onnxruntime as ort
+        self.path = path
+        self.metadata = read_sidecar(path)
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = int(os.getenv('ONNX_NUM_THREADS', '1'))
+        self.session = ort.InferenceSession(path, options, providers=['CPUExecutionProvider'])
+        self.input_name = self.session.get_inputs()[0].name
+
+    def predict(self, batch):
+        outputs = self.session.run(None, {self.input_name: batch.astype('float32')})
+        return _ordered(outputs, self.metadata.get('output_order'))
+
+
+def artifact_path(compiled_dir, model_name, backend):
+    extension = {'tflite': 'tflite', 'onnx': 'onnx'}[backend]
+    return os.path.join(compiled_dir, f'{model_name}.{extension}')
+
+
+def create_backend(backend, model_name, compiled_dir, load_keras_model):
+    """Build the requested backend, falling back to Keras when its artifact or runtime is missing"""
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown inference backend '{backend}', expected one of {BACKENDS}")
+    if backend != 'keras':
+        path = artifact_path(compiled_dir, model_name, backend)
+        if os.path.exists(path):
+            try:
+                instance = TFLiteBackend(path) if backend == 'tflite' else ONNXBackend(path)
+                logger.info(f"✅ {model_name} using {backend} backend ({path})")
+                return instance
+            except ImportError as e:
+                logger.warning(f"⚠️ {backend} runtime unavailable for {model_name}: {str(e)}")
+        else:
+            logger.warning(f"⚠️ No {backend} artifact for {model_name} at {path}, run convert_models.py")
+    model = load_keras_model()
+    return KerasBackend(model) if model is not None else None
@@ -0,0 +1,164 @@
+import threading
+import time
+import queue
+import logging
+from collections import Counter, deque
+from concurrent.futures import Future
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class LatencyWindow:
+    """Keeps the most recent samples and reports percentiles over them"""
+
+    def __init__(self, size=10000):
+        self._samples = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def add(self, value):
+        with self._lock:
+            self._samples.append(value)
+
+    def percentiles(self, *pcts):
+        with self._lock:
+            samples = np.fromiter(self._samples, dtype='float64')
+        if samples.size == 0:
+            return {f'p{p}': None for p in pcts}
+        values = np.percentile(samples, pcts)
+        return {f'p{p}': round(float(v), 3) for p, v in zip(pcts, values)}
+
+
+class BatcherClosed(RuntimeError):
+    """Raised for items submitted to, or still queued on, a closed batcher"""
+
+
+class MicroBatcher:
+    """Coalesces items submitted from concurrent threads into batched calls.
+
+    The worker thread blocks for the first item, then keeps collecting until
+    either max_batch_size items are queued or max_wait_ms has elapsed, and
+    hands the whole batch to predict_fn (a list in, a same-length list out).
+    Once the batcher is closed, or its worker exits, every future still
+    queued fails with BatcherClosed instead of never resolving.
+    """
+
+    def __init__(self, predict_fn, max_batch_size=32, max_wait_ms=5.0, name='batcher'):
+        self.predict_fn = predict_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.name = name
+
+        self._queue = queue.Queue()
+        self._stopped = threading.Event()
+        self._submit_lock = threading.Lock()
+        self._latency_ms = LatencyWindow()
+        self._predict_ms = LatencyWindow()
+        self._batch_sizes = Counter()
+        self._stats_lock = threading.Lock()
+
+        self._thread = threading.Thread(target=self._run, name=f'{name}-worker', daemon=True)
+        self._thread.start()
+
+    def submit(self, item):
+        """Queue one item and return a Future for its result"""
+        future = Future()
+        with self._submit_lock:
+            if self._stopped.is_set():
+                raise BatcherClosed(f'{self.name} is closed')
+            self._queue.put((item, future, time.perf_counter()))
+        return future
+
+    def submit_many(self, items):
+        return [self.submit(item) for item in items]
+
+    def close(self):
+        with self._submit_lock:
+            self._stopped.set()
+            self._queue.put(None)
+        self._thread.join(timeout=1.0)
+        if not self._thread.is_alive():
+            self._fail_pending()
+
+    def _fail_pending(self):
+        """Fail the futures of every item left on the queue"""
+        while True:
+            try:
+                entry = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            if entry is not None and not entry[1].done():
+                entry[1].set_exception(BatcherClosed(f'{self.name} is closed'))
+
+    def stats(self):
+        with self._stats_lock:
+            histogram = dict(sorted(self._batch_sizes.items()))
+        batches = sum(histogram.values())
+        items = sum(size * count for size, count in histogram.items())
+        return {
+            'max_batch_size': self.max_batch_size,
+            'max_wait_ms': self.max_wait * 1000.0,
+            'batches': batches,
+            'items': items,
+            'mean_batch_size': round(items / batches, 2) if batches else 0.0,
+            'batch_size_histogram': histogram,
+            'latency_ms': self._latency_ms.percentiles(50, 99),
+            'predict_ms': self._predict_ms.percentiles(50, 99),
+        }
+
+    def _collect(self):
+        first = self._queue.get()
+        if first is None:
+            return []
+        batch = [first]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                entry = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if entry is None:
+                self._stopped.set()
+                break
+            batch.append(entry)
+        return batch
+
+    def _run(self):
+        try:
+            self._loop()
+        except Exception as e:
+            logger.error(f"❌ {self.name} worker died: {str(e)}")
+        finally:
+            with self._submit_lock:
+                self._stopped.set()
+            self._fail_pending()
+
+    def _loop(self):
+        while not self._stopped.is_set():
+            batch = self._collect()
+            if not batch:
+                continue
+
+            items = [item for item, _, _ in batch]
+            start = time.perf_counter()
+            try:
+                outputs = self.predict_fn(items)
+                if len(outputs) != len(items):
+                    raise ValueError(f'{self.name}: expected {len(items)} outputs, got {len(outputs)}')
+            except Exception as e:
+                logger.error(f"❌ {self.name} batch of {len(items)} failed: {str(e)}")
+                for _, future, _ in batch:
+                    future.set_exception(e)
+                continue
+
+            done = time.perf_counter()
+            self._predict_ms.add((done - start) * 1000.0)
+            with self._stats_lock:
+                self._batch_sizes[len(items)] += 1
+            for (_, future, queued_at), output in zip(batch, outputs):
+                self._latency_ms.add((done - queued_at) * 1000.0)
+                future.set_result(output)
@@ -0,0 +1,459 @@
+#!/usr/bin/env python3
+"""
+Dedicated multi-process inference service, decoupled from the HTTP workers.
+
+    python inference_pool.py serve [--workers 2] [--cores-per-worker N] [--intra-op-threads N]
+
+The server spawns N worker processes, each pinned to its own set of cores
+with its own intra/inter-op thread counts, and each loading the models once
+through ModelRegistry. HTTP processes set INFERENCE_POOL_ADDRESS and talk to
+it through InferenceClient: face batches are written into a per-thread
+multiprocessing.shared_memory segment and only the segment name and shape
+cross the socket, so image arrays are never pickled. Jobs go to the worker
+with the fewest outstanding jobs; dead workers are restarted and their
+in-flight jobs failed.
+"""
+
+import argparse
+import atexit
+import itertools
+import multiprocessing
+import os
+import queue
+import secrets
+import threading
+import time
+import logging
+from concurrent.futures import Future
+from multiprocessing import AuthenticationError, resource_tracker
+from multiprocessing.connection import Client, Listener
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ADDRESS = 'inference_pool.sock'
+
+
+def authkey_from_env():
+    authkey = os.getenv('INFERENCE_POOL_AUTHKEY')
+    return authkey.encode() if authkey else None
+
+
+def key_path(address):
+    return f'{address}.key'
+
+
+def server_authkey(address):
+    """INFERENCE_POOL_AUTHKEY, or a fresh random key written (mode 0600) next to the socket
+    for clients running as the same user to read"""
+    authkey = authkey_from_env()
+    if authkey is None:
+        authkey = secrets.token_hex(32).encode()
+        fd = os.open(key_path(address), os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        os.fchmod(fd, 0o600)
+        with os.fdopen(fd, 'wb') as f:
+            f.write(authkey)
+    return authkey
+
+
+def client_authkey(address):
+    """INFERENCE_POOL_AUTHKEY, or the key the server wrote next to its socket"""
+    authkey = authkey_from_env()
+    if authkey is None:
+        with open(key_path(address), 'rb') as f:
+            authkey = f.read()
+    return authkey
+
+
+def _attach(name):
+    """Attach to a segment owned by a client without letting this process's tracker unlink it"""
+    shm = SharedMemory(name)
+    # Python < 3.13 registers attached segments with the resource tracker, which
+    # would unlink (and warn about) the client's segment when this worker exits
+    resource_tracker.unregister(shm._name, 'shared_memory')
+    return shm
+
+
+def _worker_main(worker_id, cores, intra_op_threads, inter_op_threads, base_dir, backend, tasks, results):
+    if cores and hasattr(os, 'sched_setaffinity'):
+        os.sched_setaffinity(0, cores)
+    for variable in ('TFLITE_NUM_THREADS', 'ONNX_NUM_THREADS', 'OMP_NUM_THREADS'):
+        os.environ[variable] = str(intra_op_threads)
+    if backend == 'keras':
+        try:
+            import tensorflow as tf
+            tf.config.threading.set_intra_op_parallelism_threads(intra_op_threads)
+            tf.config.threading.set_inter_op_parallelism_threads(inter_op_threads)
+        except (ImportError, RuntimeError) as e:
+            logger.warning(f"⚠️ Could not configure TensorFlow threads: {str(e)}")
+
+    from model_registry import ModelRegistry, MODEL_FILES
+    registry = ModelRegistry(base_dir, backend=backend)
+    registry.load()
+    results.put(('ready', worker_id, None, {name: registry.is_loaded(name) for name in MODEL_FILES}, 0, 0.0))
+
+    while True:
+        job = tasks.get()
+        if job is None:
+            break
+        job_id, name, shm_name, shape = job
+        start = time.perf_counter()
+        try:
+            predictor = registry.predictor(name)
+            if predictor is None:
+                raise RuntimeError(f'{name} model is not loaded')
+            shm = _attach(shm_name)
+            try:
+                batch = np.ndarray(shape, dtype='float32', buffer=shm.buf)
+                outputs = predictor.predict(batch)
+                del batch
+            finally:
+                shm.close()
+            results.put(('done', worker_id, job_id, outputs, shape[0], time.perf_counter() - start))
+        except Exception as e:
+            results.put(('error', worker_id, job_id, str(e), 0, time.perf_counter() - start))
+
+
+class _Worker:
+    def __init__(self, worker_id, cores):
+        self.worker_id = worker_id
+        self.cores = cores
+        self.process = None
+        self.tasks = None
+        self.outstanding = {}
+        self.models = {}
+        self.ready = False
+        self.started_at = None
+        self.restarts = 0
+        self.jobs = 0
+        self.items = 0
+        self.errors = 0
+        self.busy_seconds = 0.0
+
+    def stats(self):
+        uptime = time.time() - self.started_at if self.started_at else 0.0
+        return {
+            'pid': self.process.pid if self.process else None,
+            'alive': bool(self.process and self.process.is_alive()),
+            'ready': self.ready,
+            'cores': sorted(self.cores) if self.cores else None,
+            'queue_depth': len(self.outstanding),
+            'jobs': self.jobs,
+            'items': self.items,
+            'errors': self.errors,
+            'restarts': self.restarts,
+            'busy_fraction': round(self.busy_seconds / uptime, 3) if uptime else 0.0,
+            'items_per_second': round(self.items / uptime, 2) if uptime else 0.0,
+            'items_per_busy_second': round(self.items / self.busy_seconds, 2) if self.busy_seconds else None,
+        }
+
+
+class InferencePool:
+    """Server side: owns the worker processes and dispatches jobs to them"""
+
+    def __init__(self, base_dir='.', workers=2, cores_per_worker=None, intra_op_threads=None,
+                 inter_op_threads=1, backend='keras', job_timeout=30.0):
+        self.base_dir = base_dir
+        self.backend = backend
+        self.job_timeout = job_timeout
+        cpu_count = os.cpu_count() or 1
+        cores_per_worker = cores_per_worker or max(1, cpu_count // workers)
+        self.intra_op_threads = intra_op_threads or cores_per_worker
+        self.inter_op_threads = inter_op_threads
+        self._workers = [
+            _Worker(i, {(i * cores_per_worker + c) % cpu_count for c in range(cores_per_worker)})
+            for i in range(workers)
+        ]
+        self._context = multiprocessing.get_context('spawn')
+        self._results = self._context.Queue()
+        self._job_ids = itertools.count()
+        self._lock = threading.Lock()
+        self._stopping = False
+
+    def start(self):
+        for worker in self._workers:
+            self._spawn(worker)
+        threading.Thread(target=self._collect, name='inference-pool-results', daemon=True).start()
+
+    def _spawn(self, worker):
+        worker.tasks = self._context.Queue()
+        worker.ready = False
+        worker.started_at = time.time()
+        worker.process = self._context.Process(
+            target=_worker_main,
+            args=(worker.worker_id, worker.cores, self.intra_op_threads, self.inter_op_threads,
+                  self.base_dir, self.backend, worker.tasks, self._results),
+            name=f'inference-worker-{worker.worker_id}',
+            daemon=True
+        )
+        worker.process.start()
+        logger.info(f"🚀 Inference worker {worker.worker_id} started (pid {worker.process.pid}, cores {sorted(worker.cores)})")
+
+    def submit(self, name, shm_name, shape):
+        """Queue a job on the least-loaded worker; returns a Future of the model outputs"""
+        future = Future()
+        with self._lock:
+            candidates = [w for w in self._workers if w.ready] or self._workers
+            worker = min(candidates, key=lambda w: len(w.outstanding))
+            job_id = next(self._job_ids)
+            worker.outstanding[job_id] = future
+            worker.tasks.put((job_id, name, shm_name, tuple(shape)))
+        return future
+
+    def models(self):
+        with self._lock:
+            ready = [w.models for w in self._workers if w.ready]
+        return {name: all(m.get(name) for m in ready) for name in (ready[0] if ready else {})}
+
+    def stats(self):
+        with self._lock:
+            workers = [w.stats() for w in self._workers]
+        return {
+            'workers': workers,
+            'queue_depth': sum(w['queue_depth'] for w in workers),
+            'models': self.models(),
+            'backend': self.backend,
+            'intra_op_threads': self.intra_op_threads,
+            'inter_op_threads': self.inter_op_threads,
+        }
+
+    def _collect(self):
+        checked_at = time.time()
+        while not self._stopping:
+            if time.time() - checked_at >= 1.0:
+                self._restart_dead_workers()
+                checked_at = time.time()
+            try:
+                kind, worker_id, job_id, payload, items, seconds = self._results.get(timeout=1.0)
+            except queue.Empty:
+                continue
+            with self._lock:
+                worker = self._workers[worker_id]
+                if kind == 'ready':
+                    worker.ready = True
+                    worker.models = payload
+                    continue
+                future = worker.outstanding.pop(job_id, None)
+                worker.jobs += 1
+                worker.items += items
+                worker.busy_seconds += seconds
+                if kind == 'error':
+                    worker.errors += 1
+            if future is None:
+                continue
+            if kind == 'done':
+                future.set_result(payload)
+            else:
+                future.set_exception(RuntimeError(payload))
+
+    def _restart_dead_workers(self):
+        for worker in self._workers:
+            if self._stopping or worker.process.is_alive():
+                continue
+            logger.error(f"❌ Inference worker {worker.worker_id} died (exit code {worker.process.exitcode}), restarting")
+            with self._lock:
+                failed, worker.outstanding = worker.outstanding, {}
+                worker.restarts += 1
+                self._spawn(worker)
+            for future in failed.values():
+                future.set_exception(RuntimeError('inference worker died'))
+
+    def stop(self):
+        self._stopping = True
+        for worker in self._workers:
+            worker.tasks.put(None)
+        for worker in self._workers:
+            worker.process.join(timeout=5)
+
+    def serve(self, address, authkey):
+        """Accept InferenceClient connections on a Unix socket, one thread per connection.
+
+        Messages are unpickled, so connections must authenticate with authkey
+        and the socket is only accessible to the owning user.
+        """
+        if not authkey:
+            raise ValueError('the inference pool needs an authkey')
+        if os.path.exists(address):
+            os.unlink(address)
+        umask = os.umask(0o177)
+        try:
+            listener = Listener(address, family='AF_UNIX', authkey=authkey)
+        finally:
+            os.umask(umask)
+        with listener:
+            logger.info(f"✅ Inference pool listening on {address}")
+            while True:
+                try:
+                    connection = listener.accept()
+                except (OSError, EOFError, AuthenticationError) as e:
+                    logger.warning(f"⚠️ Rejected inference client: {str(e)}")
+                    continue
+                threading.Thread(target=self._handle, args=(connection,), daemon=True).start()
+
+    def _handle(self, connection):
+        with connection:
+            while True:
+                try:
+                    message = connection.recv()
+                except (EOFError, OSError):
+                    return
+                try:
+                    if message[0] == 'predict':
+                        _, name, shm_name, shape = message
+                        try:
+                            reply = ('ok', self.submit(name, shm_name, shape).result(timeout=self.job_timeout))
+                        except TimeoutError:
+                            reply = ('error', f'{name} inference did not finish within {self.job_timeout}s')
+                    elif message[0] == 'status':
+                        reply = ('ok', self.stats())
+                    else:
+                        reply = ('error', f'unknown request {message[0]!r}')
+                except Exception as e:
+                    reply = ('error', str(e))
+                connection.send(reply)
+
+
+class RemotePredictor:
+    """predict(batch) like the in-process backends, executed by the inference pool"""
+
+    name = 'pool'
+
+    def __init__(self, client, model_name):
+        self.client = client
+        self.model_name = model_name
+
+    def predict(self, batch):
+        return self.client.predict(self.model_name, batch)
+
+
+class InferenceClient:
+    """HTTP-side handle on an InferencePool server.
+
+    Each thread gets its own connection and its own shared-memory segment
+    (reused across calls and grown when a batch does not fit); both are
+    recreated after a fork so gunicorn workers never share them.
+    """
+
+    def __init__(self, address=DEFAULT_ADDRESS, authkey=None, timeout=30.0, status_ttl=5.0):
+        self.address = address
+        self.authkey = authkey
+        self.timeout = timeout
+        self.status_ttl = status_ttl
+        self._local = threading.local()
+        self._status = (0.0, None)
+        self._segments = {}
+        self._segments_lock = threading.Lock()
+        atexit.register(self.close)
+
+    def _state(self):
+        local = self._local
+        if getattr(local, 'pid', None) != os.getpid():
+            local.pid = os.getpid()
+            local.connection = None
+            local.segment = None
+        return local
+
+    def _call(self, message):
+        local = self._state()
+        if local.connection is None:
+            authkey = self.authkey or client_authkey(self.address)
+            local.connection = Client(self.address, family='AF_UNIX', authkey=authkey)
+        try:
+            local.connection.send(message)
+            if not local.connection.poll(self.timeout):
+                raise TimeoutError(f'inference pool did not answer within {self.timeout}s')
+            status, payload = local.connection.recv()
+        except BaseException:
+            # The connection may hold a late reply now; never reuse it
+            local.connection.close()
+            local.connection = None
+            raise
+        if status != 'ok':
+            raise RuntimeError(f'Inference pool error: {payload}')
+        return payload
+
+    def _segment(self, nbytes):
+        local = self._state()
+        if local.segment is None or local.segment.size < nbytes:
+            if local.segment is not None:
+                self._release(local.segment)
+            local.segment = SharedMemory(create=True, size=max(nbytes, 1 << 20))
+            with self._segments_lock:
+                self._segments[local.segment.name] = (os.getpid(), local.segment)
+        return local.segment
+
+    def _release(self, segment):
+        with self._segments_lock:
+            self._segments.pop(segment.name, None)
+        segment.close()
+        try:
+            segment.unlink()
+        except FileNotFoundError:
+            pass
+
+    def close(self):
+        """Unlink the segments this process created (segments inherited across a fork are left alone)"""
+        with self._segments_lock:
+            owned = [segment for pid, segment in self._segments.values() if pid == os.getpid()]
+        for segment in owned:
+            self._release(segment)
+
+    def predict(self, model_name, batch):
+        batch = np.ascontiguousarray(batch, dtype='float32')
+        segment = self._segment(batch.nbytes)
+        np.ndarray(batch.shape, dtype='float32', buffer=segment.buf)[...] = batch
+        try:
+            return self._call(('predict', model_name, segment.name, batch.shape))
+        except BaseException:
+            # A worker may still read this segment after a timeout; don't reuse it
+            self._state().segment = None
+            self._release(segment)
+            raise
+
+    def status(self):
+        return self._call(('status',))
+
+    def predictor(self, model_name):
+        """RemotePredictor if the pool has the model loaded, else None (re-checked every status_ttl)"""
+        checked_at, models = self._status
+        if time.time() - checked_at > self.status_ttl:
+            try:
+                models = self.status()['models']
+            except (OSError, RuntimeError) as e:
+                logger.warning(f"⚠️ Inference pool unavailable: {str(e)}")
+                models = None
+            self._status = (time.time(), models)
+        if not models or not models.get(model_name):
+            return None
+        return RemotePredictor(self, model_name)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    serve = subparsers.add_parser('serve', help='run the inference pool server')
+    serve.add_argument('--address', default=os.getenv('INFERENCE_POOL_ADDRESS', DEFAULT_ADDRESS))
+    serve.add_argument('--base-dir', default=os.path.dirname(os.path.abspath(__file__)))
+    serve.add_argument('--workers', type=int, default=int(os.getenv('INFERENCE_POOL_WORKERS', '2')))
+    serve.add_argument('--cores-per-worker', type=int, default=int(os.getenv('INFERENCE_POOL_CORES_PER_WORKER', '0')))
+    serve.add_argument('--intra-op-threads', type=int, default=int(os.getenv('INFERENCE_POOL_INTRA_OP_THREADS', '0')))
+    serve.add_argument('--inter-op-threads', type=int, default=int(os.getenv('INFERENCE_POOL_INTER_OP_THREADS', '1')))
+    serve.add_argument('--backend', default=os.getenv('INFERENCE_BACKEND', 'keras'))
+    serve.add_argument('--job-timeout', type=float, default=float(os.getenv('INFERENCE_POOL_JOB_TIMEOUT', '30')),
+                       help='seconds a connection waits for one inference job before replying with an error')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    pool = InferencePool(args.base_dir, args.workers, args.cores_per_worker or None,
+                         args.intra_op_threads or None, args.inter_op_threads, args.backend, args.job_timeout)
+    pool.start()
+    try:
+        pool.serve(args.address, server_authkey(args.address))
+    except KeyboardInterrupt:
+        pool.stop()
+
+
+if __name__ == '__main__':
+    main()
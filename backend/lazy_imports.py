@@ -0,0 +1,37 @@
+import importlib
+import threading
+import types
+
+
+class LazyModule(types.ModuleType):
+    """Stands in for a module and imports it on first attribute access.
+
+    After the import the real module's namespace is copied onto this object,
+    so later attribute lookups are ordinary dict hits. Safe to trigger from
+    several threads at once.
+    """
+
+    def __init__(self, name):
+        super().__init__(name)
+        self.__dict__['_lazy_lock'] = threading.Lock()
+        self.__dict__['_lazy_module'] = None
+
+    def _load(self):
+        with self._lazy_lock:
+            if self._lazy_module is None:
+                module = importlib.import_module(self.__name__)
+                self.__dict__.update(vars(module))
+                self.__dict__['_lazy_module'] = module
+        return self._lazy_module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    @property
+    def loaded(self):
+        return self._lazy_module is not None
+
+
+def lazy_import(name):
+    """Module proxy for name whose (slow) import is deferred until it is first used"""
+    return LazyModule(name)
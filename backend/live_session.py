@@ -0,0 +1,244 @@
+import threading
+import time
+import uuid
+import logging
+
+import numpy as np
+
+from lazy_imports import lazy_import
+
+# OpenCV is imported on first use, keeping it off the startup path
+cv2 = lazy_import('cv2')
+
+logger = logging.getLogger(__name__)
+
+
+class LiveSession:
+    """Per-webcam state that lets consecutive frames reuse earlier work.
+
+    - Frames that barely differ from the last analysed frame are skipped.
+    - The face box is tracked with template matching; full-frame detection
+      only runs every detect_every frames or when tracking is lost.
+    - Emotion probabilities are smoothed with an exponential moving average
+      and age/gender only refresh on detection frames.
+    - Recommendations are recomputed only when the smoothed emotion, age
+      bracket or gender changes.
+
+    Frames are analysed one at a time, and a frame that arrives while the
+    previous one is still in flight is skipped. Detection, inference and
+    recommendations (which may wait on TMDB) run outside self.lock, which
+    only guards the published state, so state readers never wait on them.
+    """
+
+    def __init__(self, session_id, pipeline, detect_every=10, delta_threshold=4.0,
+                 ema_alpha=0.3, track_threshold=0.6):
+        self.session_id = session_id
+        self.pipeline = pipeline
+        self.detect_every = detect_every
+        self.delta_threshold = delta_threshold
+        self.ema_alpha = ema_alpha
+        self.track_threshold = track_threshold
+
+        self.lock = threading.Lock()
+        self.updated = threading.Condition(self.lock)
+        self._frame_lock = threading.Lock()
+        self.version = 0
+        self.last_seen = time.time()
+        self.counters = dict.fromkeys(['frames', 'skipped', 'detections', 'tracked', 'inferences', 'recommendations'], 0)
+
+        self._previous_thumbnail = None
+        self._box = None
+        self._template = None
+        self._frames_since_detect = 0
+        self._emotion_ema = None
+        self._age_ema = None
+        self._recommendation_key = None
+
+        self.analysis = {'emotion': 'unknown', 'age': 0, 'gender': 'unknown', 'confidence': 0.0}
+        self.recommendations = []
+
+    def process(self, gray):
+        """Analyse one grayscale frame; returns (state, recommendations_changed)"""
+        if not self._frame_lock.acquire(blocking=False):
+            with self.lock:
+                self.last_seen = time.time()
+                self.counters['frames'] += 1
+                self.counters['skipped'] += 1
+                return self._state(skipped=True), False
+        try:
+            return self._process(gray)
+        finally:
+            self._frame_lock.release()
+
+    def _process(self, gray):
+        # Only the thread holding _frame_lock touches the tracking state; the
+        # published fields (analysis, recommendations, box, counters) change under self.lock
+        with self.lock:
+            self.last_seen = time.time()
+            self.counters['frames'] += 1
+
+        thumbnail = cv2.resize(gray, (64, 48), interpolation=cv2.INTER_AREA).astype('int16')
+        if (self._previous_thumbnail is not None and self._box is not None
+                and np.abs(thumbnail - self._previous_thumbnail).mean() < self.delta_threshold):
+            with self.lock:
+                self.counters['skipped'] += 1
+                return self._state(skipped=True), False
+        self._previous_thumbnail = thumbnail
+
+        detected = self._locate_face(gray)
+        if self._box is None:
+            with self.lock:
+                return self._state(skipped=False), False
+
+        x, y, w, h = self._box
+        face = gray[y:y + h, x:x + w]
+        analysis = dict(self.analysis)
+        self._update_emotion(analysis, self.pipeline.predict_emotion_probs([face]))
+        if detected or self._age_ema is None:
+            self._update_age_gender(analysis, self.pipeline.predict_age_gender([face]))
+        recommendations = self._new_recommendations(analysis)
+
+        with self.lock:
+            self.counters['inferences'] += 1
+            self.analysis = analysis
+            if recommendations is not None:
+                self.counters['recommendations'] += 1
+                self.recommendations = recommendations
+            self.version += 1
+            self.updated.notify_all()
+            return self._state(skipped=False), recommendations is not None
+
+    def state(self, skipped=False):
+        with self.lock:
+            return self._state(skipped)
+
+    def _state(self, skipped=False):
+        return {
+            'session_id': self.session_id,
+            'analysis': dict(self.analysis),
+            'recommendations': self.recommendations,
+            'version': self.version,
+            'skipped': skipped,
+            'face_box': [int(v) for v in self._box] if self._box is not None else None,
+            'stats': dict(self.counters),
+        }
+
+    def wait_for_update(self, version, timeout):
+        """Block until the state moves past version (or timeout); returns the current state"""
+        with self.lock:
+            self.updated.wait_for(lambda: self.version > version, timeout=timeout)
+            return self._state()
+
+    def _locate_face(self, gray):
+        """Track the previous face box, falling back to full detection; returns True if detection ran"""
+        self._frames_since_detect += 1
+        if self._box is not None and self._frames_since_detect < self.detect_every:
+            box = self._track(gray)
+            if box is not None:
+                with self.lock:
+                    self.counters['tracked'] += 1
+                    self._box = box
+                return False
+
+        self._frames_since_detect = 0
+        boxes = self.pipeline.detect_faces(gray)
+        box = None
+        if len(boxes) > 0:
+            box = tuple(int(v) for v in max(boxes, key=lambda b: b[2] * b[3]))
+        with self.lock:
+            self.counters['detections'] += 1
+            self._box = box
+        if box is None:
+            self._template = None
+        else:
+            x, y, w, h = box
+            self._template = gray[y:y + h, x:x + w].copy()
+        return True
+
+    def _track(self, gray):
+        """The face box matched near its previous position, or None if tracking is lost"""
+        x, y, w, h = self._box
+        pad_x, pad_y = w // 2, h // 2
+        x0, y0 = max(x - pad_x, 0), max(y - pad_y, 0)
+        x1, y1 = min(x + w + pad_x, gray.shape[1]), min(y + h + pad_y, gray.shape[0])
+        window = gray[y0:y1, x0:x1]
+        if window.shape[0] < h or window.shape[1] < w:
+            return None
+        scores = cv2.matchTemplate(window, self._template, cv2.TM_CCOEFF_NORMED)
+        _, best, _, (dx, dy) = cv2.minMaxLoc(scores)
+        if best < self.track_threshold:
+            return None
+        return (x0 + dx, y0 + dy, w, h)
+
+    def _update_emotion(self, analysis, probabilities):
+        if probabilities is None:
+            analysis.update(emotion='neutral', confidence=0.85)
+            return
+        probabilities = np.asarray(probabilities[0], dtype='float32')
+        if self._emotion_ema is None:
+            self._emotion_ema = probabilities
+        else:
+            self._emotion_ema = self.ema_alpha * probabilities + (1 - self.ema_alpha) * self._emotion_ema
+        idx = int(np.argmax(self._emotion_ema))
+        analysis['emotion'] = self.pipeline.emotion_labels[idx]
+        analysis['confidence'] = float(self._emotion_ema[idx])
+
+    def _update_age_gender(self, analysis, predictions):
+        if predictions is None:
+            analysis.update(age=25, gender='unknown')
+            return
+        gender, age = predictions[0]
+        self._age_ema = age if self._age_ema is None else self.ema_alpha * age + (1 - self.ema_alpha) * self._age_ema
+        analysis['gender'] = gender
+        analysis['age'] = int(round(self._age_ema))
+
+    def _new_recommendations(self, analysis):
+        """Recommendations for analysis, or None while its recommendation key is unchanged"""
+        key = self.pipeline.recommendation_key(analysis)
+        if key == self._recommendation_key:
+            return None
+        recommendations = self.pipeline.recommend(analysis['emotion'], analysis['age'], analysis['gender'])
+        self._recommendation_key = key
+        return recommendations
+
+
+class SessionStore:
+    """Live sessions keyed by id, evicted after idle_seconds or beyond max_sessions"""
+
+    def __init__(self, pipeline, idle_seconds=60, max_sessions=256, **session_options):
+        self.pipeline = pipeline
+        self.idle_seconds = idle_seconds
+        self.max_sessions = max_sessions
+        self.session_options = session_options
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    def get_or_create(self, session_id=None):
+        with self._lock:
+            self._evict()
+            session_id = session_id or uuid.uuid4().hex
+            session = self._sessions.get(session_id)
+            if session is None:
+                if len(self._sessions) >= self.max_sessions:
+                    oldest = min(self._sessions.values(), key=lambda s: s.last_seen)
+                    del self._sessions[oldest.session_id]
+                session = LiveSession(session_id, self.pipeline, **self.session_options)
+                self._sessions[session_id] = session
+            return session
+
+    def get(self, session_id):
+        with self._lock:
+            self._evict()
+            return self._sessions.get(session_id)
+
+    def stop(self, session_id):
+        with self._lock:
+            return self._sessions.pop(session_id, None) is not None
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def _evict(self):
+        cutoff = time.time() - self.idle_seconds
+        for session_id in [sid for sid, s in self._sessions.items() if s.last_seen < cutoff]:
+            del self._sessions[session_id]
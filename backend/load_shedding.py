@@ -0,0 +1,146 @@
+"""
+Overload controller for /api/recommend.
+
+Each request is admitted at a quality tier. Tiers are cumulative:
+
+    0 full            full pipeline
+    1 no_age_gender   skip the age/gender model
+    2 reuse_emotion   reuse the client's recent analysis instead of running the models
+    3 no_tmdb         recommendations from the precomputed table / candidate index only
+    4 reject          503 with Retry-After
+
+The tier is the higher of two signals. The in-flight signal is how many
+inflight_limits the number of requests currently being served has reached,
+and it reacts immediately. The latency signal rises one tier (up to no_tmdb)
+per adjust interval while the p95 of recent request latencies exceeds
+target_ms. It falls one tier once p95 is back under half the target and
+cooldown_seconds have passed since it last rose.
+
+Each worker process has its own controller, so in-flight counts and limits
+are per worker. They only take effect when a worker serves requests
+concurrently: the async (ASGI) worker, or sync workers with more
+GUNICORN_THREADS than the lowest limit. A sync worker with threads=1 serves
+one request at a time (the rest wait in the listen backlog, unmeasured), so
+only the latency signal can move its tier.
+"""
+
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+
+import numpy as np
+
+FULL, NO_AGE_GENDER, REUSE_EMOTION, NO_TMDB, REJECT = range(5)
+TIER_NAMES = ['full', 'no_age_gender', 'reuse_emotion', 'no_tmdb', 'reject']
+
+
+class OverloadController:
+    def __init__(self, inflight_limits=(4, 8, 12, 16), target_ms=1000.0, window_seconds=10.0,
+                 adjust_seconds=1.0, cooldown_seconds=5.0, enabled=True):
+        self.inflight_limits = sorted(inflight_limits)[:REJECT]
+        self.target_ms = target_ms
+        self.window_seconds = window_seconds
+        self.adjust_seconds = adjust_seconds
+        self.cooldown_seconds = cooldown_seconds
+        self.enabled = enabled
+        self.in_flight = 0
+        self.latency_tier = FULL
+        self.tier = FULL
+        self.tier_counts = dict.fromkeys(TIER_NAMES, 0)
+        self._samples = deque()
+        self._last_adjust = 0.0
+        self._last_raise = 0.0
+        self._lock = threading.Lock()
+
+    def _recent_p95(self, now):
+        cutoff = now - self.window_seconds
+        while self._samples and self._samples[0][0] < cutoff:
+            self._samples.popleft()
+        if not self._samples:
+            return None
+        return float(np.percentile([ms for _, ms in self._samples], 95))
+
+    def _adjust_latency_tier(self, now):
+        if now - self._last_adjust < self.adjust_seconds:
+            return
+        self._last_adjust = now
+        p95 = self._recent_p95(now)
+        if p95 is not None and p95 > self.target_ms:
+            if self.latency_tier < NO_TMDB:
+                self.latency_tier += 1
+                self._last_raise = now
+        elif (self.latency_tier > FULL and now - self._last_raise >= self.cooldown_seconds
+              and (p95 is None or p95 < self.target_ms / 2)):
+            self.latency_tier -= 1
+
+    def admit(self):
+        """Quality tier for a new request; anything below REJECT counts as in flight until release()"""
+        if not self.enabled:
+            return FULL
+        now = time.perf_counter()
+        with self._lock:
+            self._adjust_latency_tier(now)
+            inflight_tier = sum(self.in_flight >= limit for limit in self.inflight_limits)
+            tier = max(inflight_tier, self.latency_tier)
+            self.tier = tier
+            self.tier_counts[TIER_NAMES[tier]] += 1
+            if tier != REJECT:
+                self.in_flight += 1
+        return tier
+
+    def release(self, tier, started):
+        if not self.enabled or tier == REJECT:
+            return
+        now = time.perf_counter()
+        with self._lock:
+            self.in_flight -= 1
+            self._samples.append((now, (now - started) * 1000))
+
+    @contextmanager
+    def request(self):
+        """Admit a request for the duration of the block; yields its tier"""
+        started = time.perf_counter()
+        tier = self.admit()
+        try:
+            yield tier
+        finally:
+            self.release(tier, started)
+
+    def stats(self):
+        with self._lock:
+            p95 = self._recent_p95(time.perf_counter())
+            return {
+                'enabled': self.enabled,
+                'tier': TIER_NAMES[self.tier],
+                'latency_tier': TIER_NAMES[self.latency_tier],
+                'in_flight': self.in_flight,
+                'inflight_limits': self.inflight_limits,
+                'recent_p95_ms': round(p95, 1) if p95 is not None else None,
+                'target_ms': self.target_ms,
+                'requests_by_tier': dict(self.tier_counts),
+            }
+
+
+class RecentAnalyses:
+    """Last analysis per client, keyed by a server-issued token, reused while the service is shedding load"""
+
+    def __init__(self, max_entries=4096, ttl_seconds=60.0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, token):
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None or time.time() - entry[1] > self.ttl_seconds:
+                return None
+            return dict(entry[0])
+
+    def put(self, token, analysis):
+        with self._lock:
+            self._entries[token] = (dict(analysis), time.time())
+            self._entries.move_to_end(token)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
@@ -0,0 +1,177 @@
+"""
+Low-overhead counters and histograms rendered in the Prometheus text format.
+
+Histograms use fixed buckets, so observe() is a bisect plus two additions
+under a per-series lock. Metrics live in the process that records them; under
+gunicorn every worker exposes its own numbers on /metrics.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+
+# Seconds; covers sub-millisecond stages up to slow TMDB round trips
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _format_labels(names, values, extra=''):
+    pairs = [f'{name}="{value}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Timer:
+    __slots__ = ('series', 'start')
+
+    def __init__(self, series):
+        self.series = series
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.series.observe(time.perf_counter() - self.start)
+        return False
+
+
+class _NullTimer:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class _CounterSeries:
+    def __init__(self, registry):
+        self.registry = registry
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1):
+        if self.registry.enabled:
+            with self._lock:
+                self.value += amount
+
+
+class _HistogramSeries:
+    def __init__(self, registry, buckets):
+        self.registry = registry
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        if self.registry.enabled:
+            index = bisect_left(self.buckets, value)
+            with self._lock:
+                self.counts[index] += 1
+                self.sum += value
+
+    def time(self):
+        return _Timer(self) if self.registry.enabled else _NULL_TIMER
+
+
+class _Family:
+    kind = None
+
+    def __init__(self, registry, name, help, labelnames):
+        self.registry = registry
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values):
+        series = self._series.get(values)
+        if series is None:
+            with self._lock:
+                series = self._series.get(values)
+                if series is None:
+                    series = self._series[values] = self._new_series()
+        return series
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} {self.kind}']
+        for values, series in sorted(self._series.items()):
+            lines.extend(self._render_series(values, series))
+        return lines
+
+
+class CounterFamily(_Family):
+    kind = 'counter'
+
+    def _new_series(self):
+        return _CounterSeries(self.registry)
+
+    def inc(self, *values, amount=1):
+        self.labels(*values).inc(amount)
+
+    def _render_series(self, values, series):
+        return [f'{self.name}{_format_labels(self.labelnames, values)} {_format_value(series.value)}']
+
+
+class HistogramFamily(_Family):
+    kind = 'histogram'
+
+    def __init__(self, registry, name, help, labelnames, buckets):
+        super().__init__(registry, name, help, labelnames)
+        self.buckets = tuple(buckets)
+
+    def _new_series(self):
+        return _HistogramSeries(self.registry, self.buckets)
+
+    def observe(self, *values, value):
+        self.labels(*values).observe(value)
+
+    def time(self, *values):
+        """Context manager recording the elapsed seconds of its block"""
+        return self.labels(*values).time()
+
+    def _render_series(self, values, series):
+        with series._lock:
+            counts = list(series.counts)
+            total = series.sum
+        lines = []
+        cumulative = 0
+        for bound, count in zip((*self.buckets, '+Inf'), counts):
+            cumulative += count
+            le = 'le="+Inf"' if bound == '+Inf' else f'le="{bound}"'
+            lines.append(f'{self.name}_bucket{_format_labels(self.labelnames, values, le)} {cumulative}')
+        labels = _format_labels(self.labelnames, values)
+        lines.append(f'{self.name}_sum{labels} {_format_value(total)}')
+        lines.append(f'{self.name}_count{labels} {cumulative}')
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self._families = []
+
+    def counter(self, name, help, labelnames=()):
+        family = CounterFamily(self, name, help, labelnames)
+        self._families.append(family)
+        return family
+
+    def histogram(self, name, help, labelnames=(), buckets=DEFAULT_BUCKETS):
+        family = HistogramFamily(self, name, help, labelnames, buckets)
+        self._families.append(family)
+        return family
+
+    def render(self):
+        lines = []
+        for family in self._families:
+            lines.extend(family.render())
+        return '\n'.join(lines) + '\n'
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Model registry shared by the Flask app, benchmarks and CLIs.
+
+Models are loaded at most once per process. In 'preload' mode app.py loads
+them at import time, so under gunicorn with preload_app the master process
+holds the weights and forked workers share those pages copy-on-write. In
+'lazy' mode each model is loaded on first use for a fast cold start.
+
+Exported models (architecture JSON plus one .npy file per weight tensor)
+are preferred over the original .h5/.pkl files: the .npy weights are read
+through a memory map rather than unpickled, so loading does not build a
+second in-memory copy of the 61 MB pickle. set_weights still copies them
+into TensorFlow variables, so the loaded weights are private to the
+process that loaded them; only preload mode shares them between workers
+(copy-on-write after fork). Export them once with:
+    python model_registry.py export
+
+Inference goes through predictor(name), which wraps the model in the
+configured backend (keras, tflite or onnx; see inference_backends.py).
+Non-Keras backends load their compiled artifact and never touch the Keras
+model, so TensorFlow's Keras stack is not loaded for them.
+"""
+
+import argparse
+import glob
+import os
+import pickle
+import threading
+import time
+import logging
+
+import numpy as np
+
+from inference_backends import create_backend
+
+logger = logging.getLogger(__name__)
+
+MODEL_FILES = {
+    'emotion': 'facial_emotion_detection_model.h5',
+    'age_gender': 'model.pkl',
+}
+
+
+def process_memory():
+    """Memory of the current process in MB; Pss/shared figures are Linux-only"""
+    try:
+        fields = {}
+        with open('/proc/self/smaps_rollup') as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) >= 2 and parts[0].endswith(':') and parts[1].isdigit():
+                    fields[parts[0][:-1]] = int(parts[1]) / 1024.0
+        return {
+            'rss_mb': round(fields.get('Rss', 0.0), 1),
+            'pss_mb': round(fields.get('Pss', 0.0), 1),
+            'shared_mb': round(fields.get('Shared_Clean', 0.0) + fields.get('Shared_Dirty', 0.0), 1),
+            'private_mb': round(fields.get('Private_Clean', 0.0) + fields.get('Private_Dirty', 0.0), 1),
+        }
+    except OSError:
+        import resource
+        maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is in KB on Linux and bytes on macOS
+        return {'max_rss_mb': round(maxrss / (1024.0 * 1024.0 if maxrss > 1 << 30 else 1024.0), 1)}
+
+
+def _load_original(path):
+    if path.endswith('.pkl'):
+        with open(path, 'rb') as f:
+            return pickle.load(f)
+    from tensorflow.keras.models import load_model
+    return load_model(path)
+
+
+def _load_exported(export_path):
+    from tensorflow.keras.models import model_from_json
+    with open(os.path.join(export_path, 'architecture.json')) as f:
+        model = model_from_json(f.read())
+    weight_files = sorted(glob.glob(os.path.join(export_path, 'weight_*.npy')))
+    # The mapping only avoids a temporary copy while loading: set_weights copies into TF variables
+    model.set_weights([np.load(path, mmap_mode='r') for path in weight_files])
+    return model
+
+
+def export_model(model, export_path):
+    """Write a Keras model as architecture.json + weight_<i>.npy"""
+    os.makedirs(export_path, exist_ok=True)
+    with open(os.path.join(export_path, 'architecture.json'), 'w') as f:
+        f.write(model.to_json())
+    for i, weights in enumerate(model.get_weights()):
+        np.save(os.path.join(export_path, f'weight_{i:04d}.npy'), weights)
+
+
+class ModelRegistry:
+    """Loads each model once per process, eagerly via load() or on first access"""
+
+    def __init__(self, base_dir='.', export_dir='exported_models', backend='keras', compiled_dir='compiled_models'):
+        self.base_dir = base_dir
+        self.export_dir = os.path.join(base_dir, export_dir)
+        self.backend = backend
+        self.compiled_dir = os.path.join(base_dir, compiled_dir)
+        self._models = {}
+        self._predictors = {}
+        self._lock = threading.RLock()
+        self.load_seconds = {}
+        self.sources = {}
+        self.loaded_by_pid = None
+        self.memory_before_load = None
+        self.memory_after_load = None
+
+    @property
+    def emotion(self):
+        return self.get('emotion')
+
+    @property
+    def age_gender(self):
+        return self.get('age_gender')
+
+    def get(self, name):
+        if name not in self._models:
+            with self._lock:
+                if name not in self._models:
+                    self._models[name] = self._load(name)
+        return self._models[name]
+
+    def register(self, name, model, source='registered'):
+        """Use an already built model (e.g. a benchmark stub) instead of loading one from disk"""
+        with self._lock:
+            self._models[name] = model
+            self._predictors.pop(name, None)
+            self.sources[name] = source
+        self.predictor(name)
+
+    def predictor(self, name):
+        """Inference backend for a model, or None if the model is unavailable"""
+        if name not in self._predictors:
+            with self._lock:
+                if name not in self._predictors:
+                    self._predictors[name] = create_backend(
+                        self.backend, name, self.compiled_dir, lambda: self.get(name)
+                    )
+        return self._predictors[name]
+
+    def load(self):
+        """Load every model now, recording process memory before and after"""
+        if self.memory_before_load is None:
+            self.memory_before_load = process_memory()
+        for name in MODEL_FILES:
+            self.predictor(name)
+        self.memory_after_load = process_memory()
+        self.loaded_by_pid = os.getpid()
+
+    def is_loaded(self, name):
+        return self._predictors.get(name) is not None
+
+    def status(self):
+        return {
+            'models': {
+                name: {
+                    'loaded': self.is_loaded(name),
+                    'backend': getattr(self._predictors.get(name), 'name', None),
+                    'source': self.sources.get(name),
+                    'load_seconds': self.load_seconds.get(name)
+                } for name in MODEL_FILES
+            },
+            'loaded_by_pid': self.loaded_by_pid,
+            'shared_with_parent': self.loaded_by_pid is not None and self.loaded_by_pid != os.getpid(),
+            'memory_before_load': self.memory_before_load,
+            'memory_after_load': self.memory_after_load,
+        }
+
+    def _load(self, name):
+        export_path = os.path.join(self.export_dir, name)
+        original_path = os.path.join(self.base_dir, MODEL_FILES[name])
+        start = time.perf_counter()
+        try:
+            if os.path.exists(os.path.join(export_path, 'architecture.json')):
+                model = _load_exported(export_path)
+                self.sources[name] = export_path
+            elif os.path.exists(original_path):
+                model = _load_original(original_path)
+                self.sources[name] = original_path
+            else:
+                logger.warning(f"⚠️ {name} model file not found: {original_path}")
+                return None
+        except Exception as e:
+            logger.error(f"❌ Error loading {name} model: {str(e)}")
+            return None
+        self.load_seconds[name] = round(time.perf_counter() - start, 3)
+        logger.info(f"✅ {name} model loaded from {self.sources[name]} in {self.load_seconds[name]:.2f}s")
+        return model
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Model registry tools')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    export = subparsers.add_parser('export', help='export models as architecture JSON + .npy weights')
+    export.add_argument('--base-dir', default='.')
+    export.add_argument('--out', default='exported_models')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    for name, filename in MODEL_FILES.items():
+        path = os.path.join(args.base_dir, filename)
+        if not os.path.exists(path):
+            print(f"⚠️  Skipping {name}: {path} not found")
+            continue
+        model = _load_original(path)
+        if not hasattr(model, 'to_json'):
+            print(f"⚠️  Skipping {name}: {type(model).__name__} is not a Keras model")
+            continue
+        export_model(model, os.path.join(args.base_dir, args.out, name))
+        print(f"✅ Exported {name} to {os.path.join(args.base_dir, args.out, name)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+"""
+Sampling profiler for a single request thread.
+
+A background thread snapshots the target thread's Python stack every
+interval via sys._current_frames() and counts identical stacks. write()
+emits the collapsed-stack format ("outer;inner;leaf count" per line) read
+by flamegraph.pl, speedscope and inferno. Time spent inside native code
+(OpenCV, TensorFlow) is attributed to the Python frame that called it.
+"""
+
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+
+def _frame_label(frame):
+    code = frame.f_code
+    return f'{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})'
+
+
+class SamplingProfiler:
+    def __init__(self, thread_id, interval=0.002):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name='sampling-profiler', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        return self.stacks
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            labels = []
+            while frame is not None:
+                labels.append(_frame_label(frame))
+                frame = frame.f_back
+            self.stacks[';'.join(reversed(labels))] += 1
+            self.samples += 1
+
+    def write(self, path):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'w') as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f'{stack} {count}\n')
+        return path
+
+
+def profile_path(directory, name):
+    safe = ''.join(c if c.isalnum() or c in '-_' else '_' for c in name).strip('_') or 'request'
+    return os.path.join(directory, f'{int(time.time() * 1000)}-{os.getpid()}-{safe}.folded')
@@ -0,0 +1,134 @@
+import math
+import time
+import logging
+from datetime import date
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# TMDB movie genre ids; row order of the genre block
+GENRE_VOCAB = [28, 12, 16, 35, 80, 99, 18, 10751, 14, 36, 27, 10402, 9648, 10749, 878, 10770, 53, 10752, 37]
+GENRE_ROW = {genre_id: i for i, genre_id in enumerate(GENRE_VOCAB)}
+
+# Non-genre features and their weight in every user vector
+QUALITY_FEATURES = ['rating', 'popularity', 'recency']
+QUALITY_WEIGHTS = np.array([0.6, 0.4, 0.2], dtype='float32')
+
+# Overview vocabulary matched against the TF-IDF model when text scoring is on
+EMOTION_KEYWORDS = {
+    'happy': 'fun comedy friends family laugh adventure celebration',
+    'sad': 'love loss hope family journey heart friendship',
+    'angry': 'revenge fight justice battle war chase',
+    'fear': 'mystery secret haunted survive dark killer',
+    'surprise': 'discover world space future adventure secret',
+    'disgust': 'true story history real documentary',
+    'neutral': 'story life journey world',
+}
+
+RECENCY_HALF_LIFE_YEARS = 10.0
+
+
+def _recency(release_date, today):
+    try:
+        year = int(str(release_date)[:4])
+    except ValueError:
+        return 0.0
+    return 0.5 ** (max(today.year - year, 0) / RECENCY_HALF_LIFE_YEARS)
+
+
+class MovieCatalog:
+    """Feature matrix over a list of movie records, scored with one mat-vec product.
+
+    Features are a multi-hot genre block plus normalized rating, log-scaled
+    popularity and a recency decay, stored feature-major so each feature is
+    one contiguous row. The quality weights are the same for every user, so
+    their contribution is folded into base_scores once at build time and a
+    query only multiplies the handful of genre rows its user vector selects.
+    With use_text, overviews are also embedded with TF-IDF and matched
+    against per-emotion keywords.
+    """
+
+    def __init__(self, records, use_text=False):
+        self.records = records
+        today = date.today()
+
+        genre_matrix = np.zeros((len(GENRE_VOCAB), len(records)), dtype='float32')
+        quality = np.zeros((len(QUALITY_FEATURES), len(records)), dtype='float32')
+        for i, record in enumerate(records):
+            for genre_id in record.get('genre_ids') or []:
+                row = GENRE_ROW.get(genre_id)
+                if row is not None:
+                    genre_matrix[row, i] = 1.0
+            quality[0, i] = (record.get('rating') or 0.0) / 10.0
+            quality[1, i] = math.log1p(max(record.get('popularity') or 0.0, 0.0))
+            quality[2, i] = _recency(record.get('release_date') or '', today)
+        if len(records):
+            quality[1] /= max(float(quality[1].max()), 1e-6)
+        self.genre_matrix = genre_matrix
+        self.quality = quality
+        self.base_scores = QUALITY_WEIGHTS @ quality
+
+        self.text_matrix = None
+        self.vectorizer = None
+        if use_text and records:
+            from sklearn.feature_extraction.text import TfidfVectorizer
+            self.vectorizer = TfidfVectorizer(stop_words='english', max_features=20000, dtype=np.float32)
+            try:
+                self.text_matrix = self.vectorizer.fit_transform(r.get('overview') or '' for r in records).tocsr()
+            except ValueError as e:
+                # Every overview empty or stop words only: rank on genres and quality alone
+                logger.warning(f"⚠️ Skipping text features: {str(e)}")
+                self.vectorizer = None
+        if self.vectorizer is not None:
+            # Keyword queries are fixed per emotion, so each similarity column is computed up front
+            queries = self.vectorizer.transform(list(EMOTION_KEYWORDS.values()))
+            similarities = (self.text_matrix @ queries.T).toarray().astype('float32')
+            self.emotion_text_scores = {
+                emotion: np.ascontiguousarray(similarities[:, i]) for i, emotion in enumerate(EMOTION_KEYWORDS)
+            }
+
+    def __len__(self):
+        return len(self.records)
+
+    def user_vector(self, genres):
+        """Genre preference vector: the rule-selected genres with decreasing weight"""
+        vector = np.zeros(len(GENRE_VOCAB), dtype='float32')
+        for rank, genre_id in enumerate(genres):
+            row = GENRE_ROW.get(genre_id)
+            if row is not None:
+                vector[row] = max(1.0 - 0.2 * rank, 0.2)
+        return vector
+
+    def scores(self, vector, emotion=None, required_genres=None):
+        rows = np.flatnonzero(vector)
+        scores = self.base_scores + vector[rows] @ self.genre_matrix[rows]
+        if self.text_matrix is not None and emotion in EMOTION_KEYWORDS:
+            scores += self.emotion_text_scores[emotion]
+        if required_genres:
+            rows = [GENRE_ROW[g] for g in required_genres if g in GENRE_ROW]
+            allowed = self.genre_matrix[rows].any(axis=0)
+            scores = np.where(allowed, scores, -np.inf)
+        return scores
+
+    def top_k(self, genres, k=10, emotion=None, required_genres=None):
+        """Return the k best records for a user, best first"""
+        if not self.records:
+            return []
+        scores = self.scores(self.user_vector(genres), emotion, required_genres)
+        k = min(k, len(scores))
+        candidates = np.argpartition(scores, -k)[-k:]
+        ranked = candidates[np.argsort(-scores[candidates], kind='stable')]
+        return [self.records[i] for i in ranked if np.isfinite(scores[i])]
+
+
+def catalog_from_index(index, use_text=False):
+    """Build a MovieCatalog over every distinct movie in a CandidateIndex"""
+    start = time.perf_counter()
+    records = {}
+    for genre_records in index.genres.values():
+        for record in genre_records:
+            records.setdefault(record['id'], record)
+    catalog = MovieCatalog(list(records.values()), use_text=use_text)
+    logger.info(f"✅ Ranking catalog built: {len(catalog)} movies ({(time.perf_counter() - start) * 1000:.0f} ms)")
+    return catalog
@@ -0,0 +1,191 @@
+"""
+Materialized recommendation table.
+
+Recommendations depend only on the detected emotion and age bracket, so
+every reachable answer is computed ahead of time from the candidate index
+and stored as ready-to-send JSON bytes. The table file is
+
+    b'RTB1' | header length (uint32, big-endian) | header JSON | values
+
+where the header maps "emotion|bracket" to (offset, length) in the values
+section. Workers mmap the file, so they share one copy of the pages, and a
+lookup is a dict hit plus a slice. A rebuilt table is written to a
+temporary file and moved into place with os.replace, and readers swap to
+the new table with a single attribute assignment, so nobody ever sees a
+half-built table.
+"""
+
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b'RTB1'
+_HEADER_LENGTH = struct.Struct('>I')
+
+
+def _key(emotion, bracket):
+    return f'{emotion}|{bracket}'
+
+
+def encode_table(entries, source_built_at, build_seconds):
+    """Serialize {(emotion, bracket): recommendations} to the table format"""
+    values = bytearray()
+    offsets = {}
+    for (emotion, bracket), recommendations in entries.items():
+        value = json.dumps(recommendations, separators=(',', ':')).encode('utf-8')
+        offsets[_key(emotion, bracket)] = (len(values), len(value))
+        values += value
+    header = json.dumps({
+        'built_at': time.time(),
+        'source_built_at': source_built_at,
+        'build_seconds': round(build_seconds, 4),
+        'offsets': offsets,
+    }).encode('utf-8')
+    return MAGIC + _HEADER_LENGTH.pack(len(header)) + header + bytes(values)
+
+
+class RecommendationTable:
+    """Read-only view over an encoded table (bytes or an mmapped file)"""
+
+    def __init__(self, buffer, path=None):
+        if buffer[:4] != MAGIC:
+            raise ValueError('not a recommendation table')
+        header_length = _HEADER_LENGTH.unpack(buffer[4:8])[0]
+        header = json.loads(bytes(buffer[8:8 + header_length]))
+        self._buffer = buffer
+        self._base = 8 + header_length
+        self._offsets = header['offsets']
+        self.built_at = header['built_at']
+        self.source_built_at = header['source_built_at']
+        self.build_seconds = header['build_seconds']
+        self.path = path
+        self.size_bytes = len(buffer)
+
+    @classmethod
+    def open(cls, path):
+        with open(path, 'rb') as f:
+            # The mapping outlives the file object; a replaced file keeps its old pages until unmapped
+            return cls(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ), path)
+
+    def get_json(self, emotion, bracket):
+        """Serialized recommendation list for a key, or None if the table has no entry"""
+        entry = self._offsets.get(_key(emotion, bracket))
+        if entry is None:
+            return None
+        offset, length = entry
+        start = self._base + offset
+        return self._buffer[start:start + length]
+
+    def __len__(self):
+        return len(self._offsets)
+
+
+class RecommendationTableRefresher:
+    """Keeps a table in sync with the candidate index, rebuilding it whenever the index changes.
+
+    keys are (emotion, bracket, age) triples, age being any age in the
+    bracket; recommend(emotion, age) returns the recommendation list or None
+    while the index can't answer. Processes sharing path load a table
+    another process already built for the same index instead of rebuilding.
+    """
+
+    def __init__(self, keys, recommend, source_built_at, path=None, interval=5):
+        self.keys = keys
+        self.recommend = recommend
+        self.source_built_at = source_built_at
+        self.path = path
+        self.interval = interval
+        self.table = None
+        self.builds = 0
+        self.last_error = None
+        self._thread = None
+        self._start_lock = threading.Lock()
+
+    def ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='recommendation-table', daemon=True)
+                self._thread.start()
+
+    def get_json(self, emotion, bracket):
+        table = self.table
+        if table is None or table.source_built_at != self.source_built_at():
+            return None
+        return table.get_json(emotion, bracket)
+
+    def refresh(self):
+        """Bring the table up to date with the current index; returns it (or None if the index isn't ready)"""
+        source = self.source_built_at()
+        if source is None:
+            return None
+        if self.table is not None and self.table.source_built_at == source:
+            return self.table
+        shared = self._load_shared(source)
+        if shared is not None:
+            self.table = shared
+            return shared
+
+        start = time.perf_counter()
+        entries = {}
+        for emotion, bracket, age in self.keys:
+            recommendations = self.recommend(emotion, age)
+            if recommendations is None:
+                return None
+            entries[(emotion, bracket)] = recommendations
+        data = encode_table(entries, source, time.perf_counter() - start)
+
+        if self.path:
+            tmp_path = f'{self.path}.{os.getpid()}.tmp'
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, self.path)
+            table = RecommendationTable.open(self.path)
+        else:
+            table = RecommendationTable(data)
+        self.table = table
+        self.builds += 1
+        logger.info(f"✅ Recommendation table built: {len(table)} keys, {table.size_bytes} bytes "
+                    f"in {table.build_seconds * 1000:.1f} ms")
+        return table
+
+    def _load_shared(self, source):
+        if not self.path or not os.path.exists(self.path):
+            return None
+        try:
+            table = RecommendationTable.open(self.path)
+        except (OSError, ValueError) as e:
+            logger.warning(f"⚠️ Could not load recommendation table: {str(e)}")
+            return None
+        return table if table.source_built_at == source else None
+
+    def stats(self):
+        table = self.table
+        return {
+            'keys': len(table) if table is not None else 0,
+            'current': table is not None and table.source_built_at == self.source_built_at(),
+            'built_at': table.built_at if table is not None else None,
+            'age_seconds': round(time.time() - table.built_at, 1) if table is not None else None,
+            'build_seconds': table.build_seconds if table is not None else None,
+            'size_bytes': table.size_bytes if table is not None else None,
+            'builds': self.builds,
+            'path': self.path,
+            'last_error': self.last_error
+        }
+
+    def _run(self):
+        while True:
+            try:
+                self.refresh()
+                self.last_error = None
+            except Exception as e:
+                self.last_error = str(e)
+                logger.error(f"❌ Recommendation table refresh failed: {str(e)}")
+            time.sleep(self.interval)
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+"More like this" vector index over movie records.
+
+Movies are embedded as a weighted multi-hot genre vector concatenated with
+an SVD-reduced TF-IDF embedding of the overview, L2-normalized so a dot
+product is cosine similarity. Search is either exact (one mat-vec product
+over every movie) or approximate via an inverted-file (IVF) index: spherical
+k-means clusters the embeddings, vectors are stored grouped by cluster, and
+a query only scans the nprobe clusters whose centroids are closest.
+
+Build a persisted index from a candidate index snapshot (from the backend directory):
+    python similarity.py build candidate_index.json similarity_index/
+"""
+
+import argparse
+import json
+import os
+import time
+import logging
+
+import numpy as np
+
+from ranking import GENRE_VOCAB, GENRE_ROW
+
+logger = logging.getLogger(__name__)
+
+ARRAYS = ('embeddings', 'ids', 'centroids', 'offsets')
+
+
+def _normalize_rows(matrix):
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def embed_records(records, text_dims=64, genre_weight=1.0):
+    """Return an (N, D) float32 matrix of unit-length movie embeddings"""
+    genres = np.zeros((len(records), len(GENRE_VOCAB)), dtype='float32')
+    for i, record in enumerate(records):
+        for genre_id in record.get('genre_ids') or []:
+            row = GENRE_ROW.get(genre_id)
+            if row is not None:
+                genres[i, row] = 1.0
+    blocks = [_normalize_rows(genres) * genre_weight]
+
+    overviews = [record.get('overview') or '' for record in records]
+    if text_dims and len(records) > 2 and any(overviews):
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        from sklearn.decomposition import TruncatedSVD
+        try:
+            tfidf = TfidfVectorizer(stop_words='english', max_features=50000, dtype=np.float32).fit_transform(overviews)
+        except ValueError:
+            tfidf = None  # every overview was stop words only
+        if tfidf is not None:
+            dims = min(text_dims, tfidf.shape[1] - 1, len(records) - 1)
+            if dims >= 1:
+                text = TruncatedSVD(n_components=dims, random_state=0).fit_transform(tfidf)
+                blocks.append(_normalize_rows(text.astype('float32')))
+
+    return np.ascontiguousarray(_normalize_rows(np.hstack(blocks)), dtype='float32')
+
+
+def spherical_kmeans(vectors, n_clusters, iterations=10, seed=0):
+    """Cluster unit vectors by cosine similarity; returns (centroids, assignments)"""
+    rng = np.random.default_rng(seed)
+    centroids = vectors[rng.choice(len(vectors), size=n_clusters, replace=False)].copy()
+    for _ in range(iterations):
+        assignments = np.argmax(vectors @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignments, vectors)
+        empty = ~sums.any(axis=1)
+        if empty.any():
+            sums[empty] = vectors[rng.choice(len(vectors), size=int(empty.sum()), replace=False)]
+        centroids = _normalize_rows(sums)
+    return centroids, np.argmax(vectors @ centroids.T, axis=1)
+
+
+class SimilarityIndex:
+    """Exact and IVF search over movie embeddings, persisted as .npy files for mmap loading"""
+
+    def __init__(self, embeddings, ids, centroids, offsets, records):
+        # embeddings/ids are stored grouped by cluster: cluster c owns rows offsets[c]:offsets[c + 1]
+        self.embeddings = embeddings
+        self.ids = ids
+        self.centroids = centroids
+        self.offsets = offsets
+        self.records = records
+        self._rows = {int(movie_id): row for row, movie_id in enumerate(ids)}
+
+    @classmethod
+    def build(cls, records, n_clusters=None, text_dims=64, seed=0):
+        start = time.perf_counter()
+        records = {record['id']: record for record in records if record.get('id') is not None}
+        ordered = list(records.values())
+        embeddings = embed_records(ordered, text_dims=text_dims)
+        ids = np.array([record['id'] for record in ordered], dtype='int64')
+
+        n_clusters = n_clusters or max(1, int(np.sqrt(len(ordered))))
+        n_clusters = min(n_clusters, max(len(ordered), 1))
+        if len(ordered):
+            centroids, assignments = spherical_kmeans(embeddings, n_clusters, seed=seed)
+        else:
+            centroids, assignments = np.zeros((0, embeddings.shape[1]), dtype='float32'), np.zeros(0, dtype='int64')
+        order = np.argsort(assignments, kind='stable')
+        offsets = np.zeros(len(centroids) + 1, dtype='int64')
+        np.cumsum(np.bincount(assignments, minlength=len(centroids)), out=offsets[1:])
+
+        index = cls(embeddings[order], ids[order], centroids.astype('float32'), offsets, records)
+        logger.info(f"✅ Similarity index built: {len(ids)} movies, {len(centroids)} clusters "
+                    f"({(time.perf_counter() - start) * 1000:.0f} ms)")
+        return index
+
+    def __contains__(self, movie_id):
+        return movie_id in self._rows
+
+    def __len__(self):
+        return len(self.ids)
+
+    def search(self, query, k=10, mode='exact', nprobe=8):
+        """Return (rows, scores) of the k embeddings most similar to query, best first"""
+        if mode == 'exact' or len(self.centroids) <= nprobe:
+            rows = np.arange(len(self.ids))
+            scores = self.embeddings @ query
+        else:
+            probe = np.argpartition(self.centroids @ query, -nprobe)[-nprobe:]
+            slices = [slice(self.offsets[c], self.offsets[c + 1]) for c in probe]
+            rows = np.concatenate([np.arange(s.start, s.stop) for s in slices])
+            scores = np.concatenate([self.embeddings[s] @ query for s in slices])
+
+        k = min(k, len(scores))
+        if k == 0:
+            return rows[:0], scores[:0]
+        top = np.argpartition(scores, -k)[-k:]
+        top = top[np.argsort(-scores[top], kind='stable')]
+        return rows[top], scores[top]
+
+    def similar(self, movie_id, k=10, mode='exact', nprobe=8):
+        """Return [(record, similarity)] for the k movies most like movie_id, excluding itself"""
+        query = np.asarray(self.embeddings[self._rows[movie_id]])
+        rows, scores = self.search(query, k + 1, mode, nprobe)
+        results = []
+        for row, score in zip(rows, scores):
+            other_id = int(self.ids[row])
+            if other_id != movie_id:
+                results.append((self.records[other_id], float(score)))
+        return results[:k]
+
+    def save(self, path):
+        os.makedirs(path, exist_ok=True)
+        for name in ARRAYS:
+            np.save(os.path.join(path, f'{name}.npy'), getattr(self, name))
+        with open(os.path.join(path, 'records.json'), 'w') as f:
+            json.dump(list(self.records.values()), f)
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        """Load a saved index; with mmap the arrays are mapped read-only instead of copied"""
+        arrays = {
+            name: np.load(os.path.join(path, f'{name}.npy'), mmap_mode='r' if mmap else None)
+            for name in ARRAYS
+        }
+        with open(os.path.join(path, 'records.json')) as f:
+            records = {record['id']: record for record in json.load(f)}
+        return cls(records=records, **arrays)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build a persisted similarity index')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    build = subparsers.add_parser('build', help='build from a candidate index snapshot')
+    build.add_argument('snapshot', help='candidate index JSON snapshot (CANDIDATE_INDEX_PATH)')
+    build.add_argument('out', help='output directory')
+    build.add_argument('--clusters', type=int, default=None)
+    build.add_argument('--text-dims', type=int, default=64)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    with open(args.snapshot) as f:
+        snapshot = json.load(f)
+    records = [record for records in snapshot['genres'].values() for record in records]
+    SimilarityIndex.build(records, args.clusters, args.text_dims).save(args.out)
+    print(f"✅ Similarity index written to {args.out}")
+
+
+if __name__ == '__main__':
+    main()
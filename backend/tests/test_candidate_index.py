@@ -0,0 +1,143 @@
+import os
+import time
+
+from candidate_index import CandidateRefresher, build_index, movie_record
+from ranking import catalog_from_index
+from similarity import SimilarityIndex
+
+
+class StaticPageSource:
+    """Page source serving fixed discover results, counting fetches"""
+
+    def __init__(self, pages):
+        self.pages = pages
+        self.fetches = 0
+
+    def fetch(self, genre_ids, pages):
+        self.fetches += 1
+        return {key: results for key, results in self.pages.items() if key[0] in genre_ids and key[1] <= pages}
+
+
+def tmdb_movie(movie_id, genre_id, **fields):
+    movie = {
+        'id': movie_id,
+        'title': f'Movie {movie_id}',
+        'overview': f'An adventure about movie number {movie_id}.',
+        'vote_average': 7.5,
+        'popularity': 100.0 - movie_id,
+        'release_date': '2020-05-01',
+        'poster_path': f'/{movie_id}.jpg',
+        'genre_ids': [genre_id],
+    }
+    movie.update(fields)
+    return movie
+
+
+NULL_FIELDS = {'title': None, 'overview': None, 'vote_average': None, 'popularity': None,
+               'release_date': None, 'poster_path': None, 'genre_ids': None}
+
+
+def test_movie_record_defaults_null_fields():
+    record = movie_record(tmdb_movie(1, 35, **NULL_FIELDS))
+
+    assert record == {
+        'id': 1,
+        'title': 'Unknown',
+        'overview': 'No description available',
+        'rating': 7.0,
+        'popularity': 0.0,
+        'release_date': '2023-01-01',
+        'poster_url': None,
+        'genre_ids': [],
+    }
+
+
+def test_movie_record_keeps_zero_rating():
+    assert movie_record(tmdb_movie(1, 35, vote_average=0))['rating'] == 0
+
+
+def test_index_with_null_fields_feeds_ranking_and_similarity():
+    source = StaticPageSource({
+        (35, 1): [tmdb_movie(1, 35), tmdb_movie(2, 35, **NULL_FIELDS), tmdb_movie(3, 35)],
+        (18, 1): [tmdb_movie(4, 18), tmdb_movie(5, 18, genre_ids=None, popularity=None)],
+    })
+    index = build_index(source, [18, 35], pages=1)
+    records = [record for genre_records in index.genres.values() for record in genre_records]
+
+    catalog = catalog_from_index(index)
+    similarity = SimilarityIndex.build(records, n_clusters=2)
+
+    assert len(catalog) == 5
+    assert [record['id'] for record in catalog.top_k({35: 1.0}, k=2)] == [1, 3]
+    assert len(similarity) == 5
+    assert 2 in similarity
+
+
+def test_refresh_keeps_previous_records_for_failed_genres():
+    source = StaticPageSource({(18, 1): [tmdb_movie(1, 18)], (35, 1): [tmdb_movie(2, 35)]})
+    refresher = CandidateRefresher(source, [18, 35], pages=1)
+    refresher.refresh()
+
+    del source.pages[(35, 1)]
+    source.pages[(18, 1)] = [tmdb_movie(3, 18)]
+    index = refresher.refresh()
+
+    assert [record['id'] for record in index.top(18, 5)] == [3]
+    assert [record['id'] for record in index.top(35, 5)] == [2]
+    assert refresher.index is index
+    assert refresher.refreshes == 2
+    assert source.fetches == 2
+
+
+def test_snapshot_is_loaded_offline(tmp_path):
+    snapshot = str(tmp_path / 'candidate_index.json')
+    owner = CandidateRefresher(StaticPageSource({(18, 1): [tmdb_movie(1, 18, genre_ids=None)]}), [18],
+                               pages=1, snapshot_path=snapshot)
+    owner.refresh()
+
+    offline = StaticPageSource({})
+    reader = CandidateRefresher(offline, [18], pages=1, snapshot_path=snapshot)
+    reader._load_snapshot()
+
+    assert reader.index.covers([18])
+    assert reader.index.top(18, 5) == owner.index.top(18, 5)
+    assert reader.index.built_at == owner.index.built_at
+    assert offline.fetches == 0
+    assert len(catalog_from_index(reader.index)) == 1
+
+
+def test_reader_picks_up_new_snapshots_and_survives_corrupt_ones(tmp_path):
+    snapshot = str(tmp_path / 'candidate_index.json')
+    source = StaticPageSource({(18, 1): [tmdb_movie(1, 18)]})
+    owner = CandidateRefresher(source, [18], pages=1, snapshot_path=snapshot)
+    owner.refresh()
+    reader = CandidateRefresher(StaticPageSource({}), [18], pages=1, snapshot_path=snapshot)
+    reader._load_snapshot()
+
+    source.pages[(18, 1)] = [tmdb_movie(2, 18)]
+    owner.refresh()
+    os.utime(snapshot, (time.time() + 10, time.time() + 10))
+    reader._load_snapshot()
+    assert [record['id'] for record in reader.index.top(18, 5)] == [2]
+
+    with open(snapshot, 'w') as f:
+        f.write('{"genres": ')
+    os.utime(snapshot, (time.time() + 20, time.time() + 20))
+    reader._load_snapshot()
+    assert [record['id'] for record in reader.index.top(18, 5)] == [2]
+
+
+def test_snapshot_lock_hands_ownership_over(tmp_path):
+    snapshot = str(tmp_path / 'candidate_index.json')
+    first = CandidateRefresher(StaticPageSource({}), [18], snapshot_path=snapshot)
+    second = CandidateRefresher(StaticPageSource({}), [18], snapshot_path=snapshot)
+
+    assert first._is_owner()
+    assert not second._is_owner()
+    assert first.stats()['owner'] and not second.stats()['owner']
+
+    # The owner's worker exits: its lock file is closed and the lock released
+    first._lock_file.close()
+    assert second._is_owner()
+    assert second.stats()['owner']
+
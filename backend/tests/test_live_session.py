@@ -0,0 +1,77 @@
+import threading
+
+import numpy as np
+
+from live_session import LiveSession
+
+
+class BlockingPipeline:
+    """Finds one fixed face and blocks in recommend() until released, like a slow TMDB call"""
+
+    emotion_labels = ['angry', 'disgust', 'fear', 'happy', 'sad', 'surprise', 'neutral']
+
+    def __init__(self):
+        self.recommending = threading.Event()
+        self.release = threading.Event()
+
+    def detect_faces(self, gray):
+        return [(40, 30, 48, 48)]
+
+    def predict_emotion_probs(self, face_imgs):
+        return np.array([[0, 0, 0, 1, 0, 0, 0]], dtype='float32')
+
+    def predict_age_gender(self, face_imgs):
+        return [('female', 30)]
+
+    def recommendation_key(self, analysis):
+        return analysis['emotion'], analysis['gender']
+
+    def recommend(self, emotion, age, gender):
+        self.recommending.set()
+        self.release.wait(timeout=5)
+        return [{'title': f'{emotion} movie'}]
+
+
+def frame(seed):
+    return np.random.default_rng(seed).integers(0, 255, (120, 160), dtype='uint8')
+
+
+def test_state_readers_and_new_frames_do_not_wait_on_recommendations():
+    pipeline = BlockingPipeline()
+    session = LiveSession('s', pipeline)
+    results = []
+    worker = threading.Thread(target=lambda: results.append(session.process(frame(0))))
+    worker.start()
+    assert pipeline.recommending.wait(timeout=5)
+
+    # While the first frame waits on recommend(), readers get the last published state
+    # and a second frame is skipped instead of queueing behind it
+    assert session.state()['version'] == 0
+    assert session.wait_for_update(-1, timeout=0.1)['recommendations'] == []
+    state, changed = session.process(frame(1))
+    assert state['skipped'] and not changed
+
+    pipeline.release.set()
+    worker.join(timeout=5)
+    state, changed = results[0]
+    assert changed
+    assert state['version'] == 1
+    assert state['analysis']['emotion'] == 'happy'
+    assert state['analysis']['age'] == 30
+    assert state['recommendations'] == [{'title': 'happy movie'}]
+    assert state['face_box'] == [40, 30, 48, 48]
+    assert state['stats']['frames'] == 2 and state['stats']['skipped'] == 1
+
+
+def test_unchanged_analysis_keeps_recommendations():
+    pipeline = BlockingPipeline()
+    pipeline.release.set()
+    session = LiveSession('s', pipeline, delta_threshold=0)
+
+    first, first_changed = session.process(frame(0))
+    second, second_changed = session.process(frame(1))
+
+    assert first_changed and not second_changed
+    assert second['recommendations'] == first['recommendations']
+    assert second['stats']['recommendations'] == 1
+    assert second['version'] == 2
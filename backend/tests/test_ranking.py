@@ -0,0 +1,18 @@
+from ranking import MovieCatalog
+
+# Records as stored by snapshots written before movie_record defaulted TMDB nulls
+NULL_RECORD = {'id': 2, 'title': None, 'overview': None, 'rating': None, 'popularity': None,
+               'release_date': None, 'poster_url': None, 'genre_ids': None}
+
+
+def record(movie_id, genre_id, rating=7.0, popularity=10.0):
+    return {'id': movie_id, 'title': f'Movie {movie_id}', 'overview': f'A comedy about {movie_id} friends.',
+            'rating': rating, 'popularity': popularity, 'release_date': '2021-01-01',
+            'poster_url': None, 'genre_ids': [genre_id]}
+
+
+def test_catalog_tolerates_null_fields():
+    catalog = MovieCatalog([record(1, 35), NULL_RECORD, record(3, 35, rating=9.0)], use_text=True)
+
+    assert [r['id'] for r in catalog.top_k({35: 1.0}, k=2)] == [3, 1]
+    assert len(catalog.top_k({35: 1.0}, k=3)) == 3
@@ -0,0 +1,23 @@
+from similarity import SimilarityIndex, embed_records
+
+NULL_RECORD = {'id': 2, 'title': None, 'overview': None, 'rating': None, 'popularity': None,
+               'release_date': None, 'poster_url': None, 'genre_ids': None}
+
+
+def record(movie_id, genre_id):
+    return {'id': movie_id, 'title': f'Movie {movie_id}', 'overview': f'A heist across {movie_id} cities.',
+            'rating': 7.0, 'popularity': 10.0, 'release_date': '2021-01-01',
+            'poster_url': None, 'genre_ids': [genre_id]}
+
+
+def test_embeddings_tolerate_null_fields():
+    embeddings = embed_records([record(1, 80), NULL_RECORD, record(3, 80)])
+
+    assert embeddings.shape[0] == 3
+
+
+def test_index_tolerates_null_fields():
+    index = SimilarityIndex.build([record(1, 80), NULL_RECORD, record(3, 80), record(4, 35)], n_clusters=2)
+
+    assert len(index) == 4
+    assert [movie['id'] for movie, _ in index.similar(1, k=1)] == [3]
@@ -0,0 +1,94 @@
+import pytest
+import requests
+
+import tmdb_stub
+from tmdb_client import TMDBClient
+
+
+@pytest.fixture
+def stub():
+    servers = []
+
+    def start(**kwargs):
+        kwargs.setdefault('latency_ms', 0)
+        server, base_url = tmdb_stub.start(**kwargs)
+        servers.append(server)
+        return base_url
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setenv('TMDB_CACHE', 'off')
+    clients = []
+
+    def build(base_url, **kwargs):
+        kwargs.setdefault('backoff_factor', 0)
+        tmdb = TMDBClient(bearer_token='test', base_url=base_url, **kwargs)
+        clients.append(tmdb)
+        return tmdb
+
+    yield build
+    for tmdb in clients:
+        tmdb.close()
+
+
+@pytest.mark.parametrize('status', [429, 500, 502, 503, 504])
+def test_retries_throttling_and_server_errors(stub, client, status):
+    tmdb = client(stub(statuses=[status, status]), max_retries=3)
+
+    page = tmdb.get('/discover/movie', {'with_genres': 35, 'page': 1})
+
+    assert len(page['results']) == 20
+    assert page['results'][0]['genre_ids'] == [35]
+    assert tmdb_stub.StubHandler.requests == 3
+
+
+def test_gives_up_after_retry_budget(stub, client):
+    tmdb = client(stub(statuses=[503] * 10), max_retries=2)
+
+    with pytest.raises(requests.HTTPError) as excinfo:
+        tmdb.get('/discover/movie', {'with_genres': 35})
+
+    assert excinfo.value.response.status_code == 503
+    assert tmdb_stub.StubHandler.requests == 3
+
+
+def test_does_not_retry_client_errors(stub, client):
+    tmdb = client(stub(statuses=[404]), max_retries=3)
+
+    with pytest.raises(requests.HTTPError):
+        tmdb.get('/movie/1')
+
+    assert tmdb_stub.StubHandler.requests == 1
+
+
+def test_times_out_slow_responses(stub, client):
+    tmdb = client(stub(latency_ms=500), max_retries=0, timeout=0.1)
+
+    with pytest.raises(requests.RequestException):
+        tmdb.get('/discover/movie')
+
+    assert tmdb_stub.StubHandler.requests == 1
+
+
+def test_reuses_one_connection(stub, client):
+    tmdb = client(stub())
+
+    for page in range(1, 6):
+        tmdb.get('/discover/movie', {'page': page})
+
+    assert tmdb_stub.StubHandler.requests == 5
+    assert len(tmdb_stub.StubHandler.connections) == 1
+
+
+def test_submit_fans_out_on_the_pool(stub, client):
+    tmdb = client(stub(latency_ms=50))
+
+    futures = [tmdb.submit('/discover/movie', {'with_genres': genre}) for genre in (18, 35, 28)]
+
+    assert [f.result(timeout=5)['results'][0]['genre_ids'] for f in futures] == [[18], [35], [28]]
@@ -1,66 +1,74 @@
 import requests
-import os
-from dotenv import load_dotenv
+from candidate_index import POSTER_BASE_URL
+from tmdb_client import get_client
 
-load_dotenv()
+BACKDROP_BASE_URL = 'https://image.tmdb.org/t/p/w1280'
+
+# TMDB serves at most this many pages of any list
+MAX_PAGE = 500
 
 class TMDBApi:
-    def __init__(self):
-        self.bearer_token = os.getenv('TMDB_BEARER_TOKEN')
-        self.base_url = 'https://api.themoviedb.org/3'
-        self.headers = {
-            'Authorization': f'Bearer {self.bearer_token}',
-            'Content-Type': 'application/json'
-        }
-    
-    def search_multi(self, query):
-        """Search for movies and TV shows"""
+    def __init__(self, client=None):
+        self.client = client or get_client()
+        self.bearer_token = self.client.bearer_token
+        self.base_url = self.client.base_url
+
+    def _get(self, path, params=None):
         try:
-            response = requests.get(
-                f'{self.base_url}/search/multi',
-                headers=self.headers,
-                params={'query': query}
-            )
-            response.raise_for_status()
-            return response.json()
+            return self.client.get(path, params)
         except requests.exceptions.RequestException as e:
             raise Exception(f'TMDB API error: {str(e)}')
     
-    def get_trending(self, media_type='all', time_window='week'):
+    def search_multi(self, query, page=1):
+        """Search for movies and TV shows"""
+        return self._get('/search/multi', {'query': query, 'page': page})
+    
+    def search_movies(self, query, page=1):
+        """Search for movies only"""
+        return self._get('/search/movie', {'query': query, 'page': page})
+    
+    def get_trending(self, media_type='all', time_window='week', page=1):
         """Get trending movies and TV shows"""
-        try:
-            response = requests.get(
-                f'{self.base_url}/trending/{media_type}/{time_window}',
-                headers=self.headers
-            )
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
-            raise Exception(f'TMDB API error: {str(e)}')
+        return self._get(f'/trending/{media_type}/{time_window}', {'page': page} if page > 1 else None)
+    
+    def get_popular(self, page=1):
+        """Get popular movies"""
+        return self._get('/movie/popular', {'page': page} if page > 1 else None)
     
     def get_movie_recommendations(self, movie_id):
         """Get movie recommendations"""
-        try:
-            response = requests.get(
-                f'{self.base_url}/movie/{movie_id}/recommendations',
-                headers=self.headers
-            )
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
-            raise Exception(f'TMDB API error: {str(e)}')
+        return self._get(f'/movie/{movie_id}/recommendations')
     
     def get_movie_details(self, movie_id):
         """Get detailed movie information"""
-        try:
-            response = requests.get(
-                f'{self.base_url}/movie/{movie_id}',
-                headers=self.headers
-            )
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
-            raise Exception(f'TMDB API error: {str(e)}')
+        return self._get(f'/movie/{movie_id}')
+
+
+def ui_movie(movie):
+    """Reduce a raw TMDB movie to the fields the frontend renders, with full image URLs"""
+    return {
+        'id': movie.get('id'),
+        'title': movie.get('title') or movie.get('name', 'Unknown'),
+        'overview': movie.get('overview', ''),
+        'poster_path': f"{POSTER_BASE_URL}{movie['poster_path']}" if movie.get('poster_path') else None,
+        'backdrop_path': f"{BACKDROP_BASE_URL}{movie['backdrop_path']}" if movie.get('backdrop_path') else None,
+        'release_date': movie.get('release_date') or movie.get('first_air_date', ''),
+        'vote_average': round(movie.get('vote_average') or 0.0, 1),
+        'vote_count': movie.get('vote_count') or 0,
+        'genre_ids': movie.get('genre_ids') or []
+    }
+
+
+def movie_page(data):
+    """A TMDB result page as {page, total_pages, total_results, results} of UI movies"""
+    return {
+        'page': data.get('page', 1),
+        'total_pages': min(data.get('total_pages') or 1, MAX_PAGE),
+        'total_results': data.get('total_results', 0),
+        'results': [ui_movie(movie) for movie in data.get('results', [])
+                    if movie.get('media_type', 'movie') == 'movie']
+    }
+
 
 
 
@@ -0,0 +1,200 @@
+import json
+import re
+import sqlite3
+import threading
+import time
+import logging
+from collections import OrderedDict
+from concurrent.futures import Future
+from urllib.parse import urlencode
+
+logger = logging.getLogger(__name__)
+
+# (path pattern, fresh TTL in seconds); first match wins, unmatched paths are not cached
+DEFAULT_TTLS = [
+    (r'^/discover/', 30 * 60),
+    (r'^/trending/', 15 * 60),
+    (r'^/movie/popular', 30 * 60),
+    (r'^/movie/\d+/recommendations', 6 * 60 * 60),
+    (r'^/movie/\d+$', 24 * 60 * 60),
+    (r'^/search/', 10 * 60),
+]
+
+
+def cache_key(path, params=None):
+    if not params:
+        return path
+    return f'{path}?{urlencode(sorted(params.items()))}'
+
+
+class MemoryBackend:
+    """In-process LRU store of key -> (value, stored_at)"""
+
+    def __init__(self, max_entries=2048):
+        self.max_entries = max_entries
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key, value, stored_at):
+        with self._lock:
+            self._entries[key] = (value, stored_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class SQLiteBackend:
+    """On-disk LRU store shared by every worker on the host and kept across restarts"""
+
+    def __init__(self, path, max_entries=2048):
+        self.path = path
+        self.max_entries = max_entries
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS tmdb_cache ('
+            'key TEXT PRIMARY KEY, value TEXT NOT NULL, stored_at REAL NOT NULL, accessed_at REAL NOT NULL)'
+        )
+
+    def get(self, key):
+        with self._lock:
+            row = self._conn.execute('SELECT value, stored_at FROM tmdb_cache WHERE key = ?', (key,)).fetchone()
+            if row is None:
+                return None
+            self._conn.execute('UPDATE tmdb_cache SET accessed_at = ? WHERE key = ?', (time.time(), key))
+        return json.loads(row[0]), row[1]
+
+    def set(self, key, value, stored_at):
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO tmdb_cache (key, value, stored_at, accessed_at) VALUES (?, ?, ?, ?)',
+                (key, json.dumps(value), stored_at, time.time())
+            )
+            overflow = len(self) - self.max_entries
+            if overflow > 0:
+                self._conn.execute(
+                    'DELETE FROM tmdb_cache WHERE key IN '
+                    '(SELECT key FROM tmdb_cache ORDER BY accessed_at LIMIT ?)', (overflow,)
+                )
+                self.evictions += overflow
+
+    def __len__(self):
+        return self._conn.execute('SELECT COUNT(*) FROM tmdb_cache').fetchone()[0]
+
+
+class TTLCache:
+    """Response cache with per-endpoint TTLs, stale-while-revalidate and request coalescing.
+
+    Entries younger than their TTL are served directly. Entries past the TTL
+    but within stale_seconds are served immediately while a single background
+    refresh runs. Misses are coalesced: concurrent callers for the same key
+    wait on the one upstream fetch already in flight.
+    """
+
+    def __init__(self, backend=None, ttls=None, stale_seconds=3600):
+        self.backend = backend if backend is not None else MemoryBackend()
+        self.ttls = [(re.compile(pattern), ttl) for pattern, ttl in (ttls or DEFAULT_TTLS)]
+        self.stale_seconds = stale_seconds
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self._counters = dict.fromkeys(
+            ['hits', 'stale_hits', 'misses', 'coalesced', 'refreshes', 'errors', 'uncached'], 0
+        )
+
+    def ttl_for(self, path):
+        for pattern, ttl in self.ttls:
+            if pattern.search(path):
+                return ttl
+        return None
+
+    def get(self, path, params, fetch):
+        """Return the cached response for (path, params), calling fetch() when needed"""
+        ttl = self.ttl_for(path)
+        if ttl is None:
+            self._count('uncached')
+            return fetch()
+
+        key = cache_key(path, params)
+        entry = self.backend.get(key)
+        if entry is not None:
+            value, stored_at = entry
+            age = time.time() - stored_at
+            if age < ttl:
+                self._count('hits')
+                return value
+            if age < ttl + self.stale_seconds:
+                self._count('stale_hits')
+                self._refresh_in_background(key, fetch)
+                return value
+
+        self._count('misses')
+        future, leader = self._claim(key)
+        if leader:
+            self._fetch_and_store(key, fetch, future)
+        else:
+            self._count('coalesced')
+        return future.result()
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._counters)
+        lookups = stats['hits'] + stats['stale_hits'] + stats['misses']
+        stats['hit_rate'] = round((stats['hits'] + stats['stale_hits']) / lookups, 4) if lookups else 0.0
+        stats['evictions'] = self.backend.evictions
+        stats['entries'] = len(self.backend)
+        stats['max_entries'] = self.backend.max_entries
+        stats['backend'] = type(self.backend).__name__
+        return stats
+
+    def _count(self, name):
+        with self._lock:
+            self._counters[name] += 1
+
+    def _claim(self, key):
+        """Return (future, True) if the caller must fetch key, or the in-flight (future, False)"""
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is not None:
+                return future, False
+            future = Future()
+            self._inflight[key] = future
+            return future, True
+
+    def _fetch_and_store(self, key, fetch, future):
+        try:
+            value = fetch()
+            self.backend.set(key, value, time.time())
+            future.set_result(value)
+        except Exception as e:
+            self._count('errors')
+            future.set_exception(e)
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def _refresh_in_background(self, key, fetch):
+        future, leader = self._claim(key)
+        if not leader:
+            return
+        self._count('refreshes')
+
+        def refresh():
+            self._fetch_and_store(key, fetch, future)
+            if future.exception() is not None:
+                logger.warning(f"⚠️ Background refresh failed for {key}: {future.exception()}")
+
+        threading.Thread(target=refresh, name='tmdb-cache-refresh', daemon=True).start()
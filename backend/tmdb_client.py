@@ -0,0 +1,118 @@
+import os
+import threading
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from dotenv import load_dotenv
+
+from tmdb_cache import TTLCache, MemoryBackend, SQLiteBackend
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class TMDBClient:
+    """Shared TMDB HTTP client.
+
+    Keeps one pooled requests.Session so connections (and TLS sessions) are
+    reused across calls, retries 429/5xx with exponential backoff, and fans
+    independent queries out over a small thread pool via submit().
+    Cacheable endpoints go through a TTLCache; cached responses are shared
+    between callers and must be treated as read-only.
+    """
+
+    def __init__(self, bearer_token=None, base_url=None, pool_size=None,
+                 max_retries=None, backoff_factor=None, timeout=None, cache=None):
+        self.bearer_token = bearer_token or os.getenv('TMDB_BEARER_TOKEN')
+        self.base_url = (base_url or os.getenv('TMDB_BASE_URL', 'https://api.themoviedb.org/3')).rstrip('/')
+        self.pool_size = pool_size or int(os.getenv('TMDB_POOL_SIZE', '10'))
+        self.timeout = timeout or float(os.getenv('TMDB_TIMEOUT', '10'))
+        if max_retries is None:
+            max_retries = int(os.getenv('TMDB_MAX_RETRIES', '3'))
+        if backoff_factor is None:
+            backoff_factor = float(os.getenv('TMDB_BACKOFF_FACTOR', '0.3'))
+
+        retry = Retry(
+            total=max_retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=frozenset(['GET']),
+            respect_retry_after_header=True,
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size, max_retries=retry)
+
+        self.session = requests.Session()
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.session.headers.update({
+            'Authorization': f'Bearer {self.bearer_token}',
+            'Content-Type': 'application/json'
+        })
+
+        self.cache = cache if cache is not None else build_cache()
+        self._executor = ThreadPoolExecutor(max_workers=self.pool_size, thread_name_prefix='tmdb')
+
+    def get(self, path, params=None):
+        """GET a TMDB endpoint (e.g. '/discover/movie') and return the decoded JSON"""
+        if self.cache is not None:
+            return self.cache.get(path, params, lambda: self._fetch(path, params))
+        return self._fetch(path, params)
+
+    def _fetch(self, path, params=None):
+        response = self.session.get(f'{self.base_url}{path}', params=params, timeout=self.timeout)
+        logger.info(f"TMDB {path} {params or ''}: {response.status_code}")
+        response.raise_for_status()
+        return response.json()
+
+    def submit(self, path, params=None):
+        """Run get() on the client's thread pool and return a Future"""
+        return self._executor.submit(self.get, path, params)
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+        self.session.close()
+
+
+def build_cache():
+    """Cache configured by TMDB_CACHE: 'memory' (default), 'disk' or 'off'"""
+    mode = os.getenv('TMDB_CACHE', 'memory').lower()
+    if mode == 'off':
+        return None
+    max_entries = int(os.getenv('TMDB_CACHE_MAX_ENTRIES', '2048'))
+    stale_seconds = float(os.getenv('TMDB_CACHE_STALE_SECONDS', '3600'))
+    if mode == 'disk':
+        backend = SQLiteBackend(os.getenv('TMDB_CACHE_PATH', 'tmdb_cache.sqlite3'), max_entries)
+    else:
+        backend = MemoryBackend(max_entries)
+    return TTLCache(backend, stale_seconds=stale_seconds)
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def _reset_client():
+    # Pool threads and sockets don't survive fork; children build their own client
+    global _client
+    _client = None
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_client)
+
+
+def get_client():
+    """Process-wide TMDBClient, created on first use"""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = TMDBClient()
+    return _client
@@ -0,0 +1,79 @@
+import threading
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class Warmup:
+    """Runs named start-up steps once, in a background thread, and tracks readiness.
+
+    Steps are (name, fn) pairs run in order; a failing step is logged and
+    recorded but does not stop the others, so the process still finishes
+    warming up but reports itself degraded. Started per process, after any
+    gunicorn fork, because the steps create threads and TensorFlow state.
+    """
+
+    def __init__(self, steps, enabled=True):
+        self.steps = steps
+        self.enabled = enabled
+        self.created_at = time.time()
+        self.started_at = None
+        self.ready_at = None
+        self.current = None
+        self.step_seconds = {}
+        self.errors = {}
+        self._done = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+        if not enabled:
+            self.ready_at = self.created_at
+            self._done.set()
+
+    @property
+    def ready(self):
+        return self._done.is_set()
+
+    @property
+    def healthy(self):
+        """Warm-up finished and every step succeeded"""
+        return self.ready and not self.errors
+
+    def ensure_started(self):
+        if self._thread is not None or not self.enabled:
+            return
+        with self._lock:
+            if self._thread is None:
+                self.started_at = time.time()
+                self._thread = threading.Thread(target=self._run, name='warmup', daemon=True)
+                self._thread.start()
+
+    def wait(self, timeout=None):
+        return self._done.wait(timeout)
+
+    def _run(self):
+        for name, fn in self.steps:
+            self.current = name
+            start = time.perf_counter()
+            try:
+                fn()
+            except Exception as e:
+                self.errors[name] = str(e)
+                logger.error(f"❌ Warm-up step {name} failed: {str(e)}")
+            self.step_seconds[name] = round(time.perf_counter() - start, 3)
+        self.current = None
+        self.ready_at = time.time()
+        self._done.set()
+        logger.info(f"✅ Ready {self.ready_at - self.created_at:.2f}s after start-up "
+                    f"(warm-up {self.ready_at - self.started_at:.2f}s: {self.step_seconds})")
+
+    def stats(self):
+        return {
+            'ready': self.ready,
+            'status': ('degraded' if self.errors else 'ready') if self.ready else 'starting',
+            'current_step': self.current,
+            'step_seconds': dict(self.step_seconds),
+            'errors': dict(self.errors),
+            'seconds_to_ready': round(self.ready_at - self.created_at, 3) if self.ready_at else None,
+            'seconds_since_start': round(time.time() - self.created_at, 3),
+        }
@@ -36,6 +36,15 @@ api.interceptors.response.use(
   }
 );
 
+// Webcam frames from this tab share one backend live session, so the server can
+// track the face and smooth emotion across frames
+const liveSessionId = Math.random().toString(36).slice(2) + Date.now().toString(36);
+
+// The backend hands out an X-Analysis-Token with each analysis; sending it back lets an
+// overloaded server reuse this tab's last analysis (and known age) instead of rerunning the models
+const ANALYSIS_TOKEN_KEY = 'analysisToken';
+let analysisToken: string | null = sessionStorage.getItem(ANALYSIS_TOKEN_KEY);
+
 // API service functions
 export const apiService = {
   // Check if backend is available
@@ -60,9 +69,16 @@ export const apiService = {
     const response = await api.post('/api/recommend', formData, {
       headers: {
         'Content-Type': 'multipart/form-data',
+        ...(analysisToken ? { 'X-Analysis-Token': analysisToken } : {}),
       },
     });
 
+    const token = response.headers['x-analysis-token'];
+    if (token) {
+      analysisToken = token;
+      sessionStorage.setItem(ANALYSIS_TOKEN_KEY, token);
+    }
+
     // Transform Flask response to match frontend expectations
     return transformFlaskResponse(response.data);
   },
@@ -74,7 +90,7 @@ export const apiService = {
     const formData = new FormData();
     formData.append('file', imageBlob, 'webcam-capture.jpg');
 
-    const response = await api.post('/api/recommend', formData, {
+    const response = await api.post(`/api/stream/${liveSessionId}/frame`, formData, {
       headers: {
         'Content-Type': 'multipart/form-data',
       },
@@ -90,7 +106,7 @@ export const apiService = {
     age: number | null;
     recommendations: any[];
   }> {
-    const response = await api.get('/live_data');
+    const response = await api.get(`/live_data?session_id=${liveSessionId}`);
     return response.data;
   },
 
@@ -144,7 +160,7 @@ export const apiService = {
 
   // Stop camera feed
   async stopCamera(): Promise<void> {
-    await api.get('/stop_camera');
+    await api.get(`/stop_camera?session_id=${liveSessionId}`);
   },
 };
 
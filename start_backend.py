@@ -5,8 +5,10 @@ Flask Backend Startup Script for MovieDB AI Recommendations
 
 import os
 import sys
+import re
 import subprocess
 import platform
+from importlib import metadata
 
 def check_python_version():
     """Check if Python version is compatible"""
@@ -25,8 +27,32 @@ def check_backend_directory():
     print("✅ Backend directory found")
     return True
 
+def missing_requirements(path='backend/requirements.txt'):
+    """Requirements not installed, or installed at a different version than pinned"""
+    missing = []
+    with open(path) as f:
+        for line in f:
+            line = line.split('#', 1)[0].strip()
+            if not line:
+                continue
+            name = re.split(r'[\s\[=<>!~;]', line, maxsplit=1)[0]
+            try:
+                installed = metadata.version(name)
+            except metadata.PackageNotFoundError:
+                missing.append(line)
+                continue
+            if '==' in line and installed != line.split('==', 1)[1].split(';', 1)[0].strip():
+                missing.append(f"{line} (found {installed})")
+    return missing
+
 def install_dependencies():
-    """Install Python dependencies"""
+    """Install Python dependencies, skipping pip when they are already satisfied"""
+    if '--install' not in sys.argv:
+        missing = missing_requirements()
+        if not missing:
+            print("✅ Dependencies already installed (pass --install to reinstall)")
+            return True
+        print(f"📦 Missing or mismatched: {', '.join(missing)}")
     print("📦 Installing Python dependencies...")
     try:
         subprocess.run([